@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from .models import Competition, Opponent, Game, GameType
+from .models import CircuitBreakerState, Competition, Opponent, Game, GameEvent, GameType, PollSchedule, ScoreUpdateRun, UpdaterLock, Venue
 
 
 @admin.register(Opponent)
@@ -12,10 +12,17 @@ class OpponentAdmin(admin.ModelAdmin):
     ]
 
 
+@admin.register(Venue)
+class VenueAdmin(admin.ModelAdmin):
+    search_fields = ["name", "short_name"]
+    list_display = ["name", "short_name", "is_home"]
+    list_filter = ["is_home"]
+
+
 @admin.register(Game)
 class GameAdmin(admin.ModelAdmin):
     date_hierarchy = "date"
-    list_filter = ["team", "season", "opponent", "location", "competition", "game_type"]
+    list_filter = ["team", "season", "opponent", "venue", "competition", "game_type"]
     search_fields = ["team__name", "opponent__name", "location"]
     list_display = ["date", "team", "opponent", "season", "location", "competition", "game_id", "game_type"]
     fieldsets = [
@@ -25,5 +32,38 @@ class GameAdmin(admin.ModelAdmin):
     list_editable = ["competition", "game_id"]
 
 
+@admin.register(PollSchedule)
+class PollScheduleAdmin(admin.ModelAdmin):
+    list_display = ["game", "state", "interval", "next_poll", "modified"]
+    list_filter = ["state"]
+    readonly_fields = ["game"]
+
+
+@admin.register(CircuitBreakerState)
+class CircuitBreakerStateAdmin(admin.ModelAdmin):
+    list_display = ["host", "state", "failures", "opened_at", "modified"]
+    list_filter = ["state"]
+
+
+@admin.register(GameEvent)
+class GameEventAdmin(admin.ModelAdmin):
+    list_display = ["game", "sequence", "event_type", "period", "time", "for_team", "description"]
+    list_filter = ["event_type"]
+    list_select_related = ["game__team", "game__opponent"]
+    raw_id_fields = ["game"]
+
+
+@admin.register(ScoreUpdateRun)
+class ScoreUpdateRunAdmin(admin.ModelAdmin):
+    date_hierarchy = "started"
+    list_display = ["started", "duration", "games_polled", "games_changed", "errors", "latency", "holder"]
+    list_filter = ["holder"]
+
+
+@admin.register(UpdaterLock)
+class UpdaterLockAdmin(admin.ModelAdmin):
+    list_display = ["name", "holder", "expires_at"]
+
+
 admin.site.register(Competition)
 admin.site.register(GameType)
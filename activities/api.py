@@ -1,15 +1,48 @@
-from django.db.models import Q
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Max, Min, Q
+from django.db.models.functions import Coalesce, Greatest
+from django.http import Http404
+from django.shortcuts import get_object_or_404
 from django.utils import timezone
-from rest_framework import viewsets
+from rest_framework import permissions, status, viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
 
-from .models import Game
-from .serializers import GameSerializer
+from api.cache import CachedResponseMixin, seconds_until
+
+from .models import Game, GameEvent
+from .scoreboard import get_scoreboard_games, publish_scoreboard, read_scoreboard
+from .serializers import (
+    GameEventSerializer,
+    GameSerializer,
+    RinksideGameSerializer,
+    RinksideGoalSerializer,
+    RinksideLiveSerializer,
+    RinksideScoreSerializer,
+)
+from .signals import scores_changed
 from teams.models import Season
 from datetime import timedelta
 
 
-class GameViewSet(viewsets.ReadOnlyModelViewSet):
+class GameViewSet(CachedResponseMixin, viewsets.ReadOnlyModelViewSet):
     serializer_class = GameSerializer
+    cache_resources = ["games"]
+
+    def get_cache_timeout(self) -> float:
+        # Responses change when the next game starts (passed) and when a game leaves the window of games that started in the last 3 hours
+        now = timezone.now()
+        next_start = Game.objects.filter(date__gt=now).aggregate(next=Min("date"))["next"]
+        next_end = Game.objects.filter(date__gt=now - timedelta(hours=3)).aggregate(next=Min("date"))["next"]
+        boundaries = [boundary for boundary in [next_start, next_end + timedelta(hours=3) if next_end is not None else None] if boundary is not None]
+
+        return seconds_until(min(boundaries, default=None))
+
+    def get_last_modified_aggregates(self) -> dict:
+        # Games move in and out of the window of upcoming and recent games as time passes, without being modified
+        return {"modified": Max("modified"), "first": Min("date"), "last": Max("date"), "started": Max("date", filter=Q(date__lte=timezone.now()))}
 
     def get_queryset(self):
         queryset = Game.objects.all()
@@ -27,9 +60,174 @@ class GameViewSet(viewsets.ReadOnlyModelViewSet):
             queryset = queryset.filter(team__slug=team)
 
         if home_games_only:
-            queryset = queryset.filter(Q(location__iexact="ice skating center mechelen") | Q(location__iexact="iscm"))
+            queryset = queryset.filter(venue__is_home=True)
 
         if all_games_for_season:
             return queryset
 
         return queryset[:count]
+
+    @action(detail=False)
+    def live(self, request):
+        """
+        Returns the live state and scores of all live and recent games from the live scoreboard, without querying the database.
+
+        When the scoreboard is missing or older than `CLUB_SCOREBOARD_MAX_AGE` seconds (the score updater is not running), the games are loaded from the
+        database instead, `source` tells which one was used.
+        """
+        scoreboard = read_scoreboard(max_age=settings.CLUB_SCOREBOARD_MAX_AGE)
+
+        if scoreboard is not None:
+            version, published, source, games = scoreboard.version, scoreboard.published, "scoreboard", scoreboard.games.values()
+        else:
+            version, published, source, games = None, None, "database", get_scoreboard_games()
+
+        return Response(
+            {
+                "version": version,
+                "published": published,
+                "source": source,
+                "games": [
+                    {"id": game.id, "team": game.team, "live": game.live, "score_team": game.score_team, "score_opponent": game.score_opponent}
+                    for game in games
+                ],
+            }
+        )
+
+    @action(detail=True)
+    def events(self, request, pk=None):
+        """
+        Returns the events of a game, oldest first.
+
+        Pass the `cursor` and `generation` of the previous response as `since` and `generation` to only receive the events added after it, at most
+        `limit` events (default and maximum 500) are returned per request. When the timeline was rewritten in the meantime (events were changed or
+        removed) the generation has changed: `reset` is true and all events are returned again, clients replace the events they have.
+        """
+        current_generation = Game.objects.filter(pk=pk).values_list("event_generation", flat=True).first()
+
+        if current_generation is None:
+            raise Http404
+
+        parameters = {}
+
+        for name, default in [("since", 0), ("limit", 500), ("generation", current_generation)]:
+            try:
+                parameters[name] = int(request.query_params.get(name, default))
+            except ValueError:
+                raise ValidationError({name: "%s should be an integer" % name})
+
+        reset = parameters["generation"] != current_generation
+        since = 0 if reset else parameters["since"]
+        limit = min(500, max(1, parameters["limit"]))
+
+        events = list(GameEvent.objects.filter(game_id=pk, id__gt=since).order_by("id")[:limit])
+
+        return Response(
+            {
+                "generation": current_generation,
+                "reset": reset,
+                "cursor": events[-1].id if len(events) > 0 else since,
+                "events": GameEventSerializer(events, many=True).data,
+            }
+        )
+
+
+class CanScoreGame(permissions.IsAuthenticated):
+    """Only team admins of the game and organization admins can keep the score"""
+
+    def has_object_permission(self, request, view, obj: Game) -> bool:
+        return request.user.has_perm("activities.change_game", obj)
+
+
+class RinksideViewSet(viewsets.GenericViewSet):
+    """
+    Live scoring for games without a competition website, e.g. by a scorekeeper next to the rink.
+
+    Every change is a single conditional update of the game: it has to include the `version` the client last received and is refused with a 409 (and
+    the current state of the game) when the game changed in the meantime, so two scorekeepers never overwrite each other. The live scoreboard is
+    published right after every change, see `activities.scoreboard`.
+    """
+
+    queryset = Game.objects.all()
+    serializer_class = RinksideGameSerializer
+    permission_classes = [CanScoreGame]
+
+    def get_object(self) -> Game:
+        game = get_object_or_404(self.get_queryset(), pk=self.kwargs["pk"])
+        self.check_object_permissions(self.request, game)
+
+        if game.competition_id is not None:
+            raise ValidationError({"game": "The score of this game is updated from its competition website"})
+
+        return game
+
+    def retrieve(self, request, pk=None):
+        return Response(self.get_serializer(self.get_object()).data)
+
+    @action(detail=True, methods=["post"])
+    def score(self, request, pk=None):
+        """Adds `delta` (1 or -1) to the score of `side` (team or opponent), scores never go below 0"""
+        game = self.get_object()
+        data = self.validate(RinksideScoreSerializer)
+        field = "score_%s" % data["side"]
+
+        return self.apply(game, data["version"], **{field: Greatest(Coalesce(F(field), 0) + data["delta"], 0)})
+
+    @action(detail=True, methods=["post"])
+    def live(self, request, pk=None):
+        game = self.get_object()
+        data = self.validate(RinksideLiveSerializer)
+
+        return self.apply(game, data["version"], live=data["live"])
+
+    @action(detail=True, methods=["post"])
+    def goal(self, request, pk=None):
+        """Adds a goal for `side` (team or opponent) and records it as a game event, numbered with the new version of the game"""
+        game = self.get_object()
+        data = self.validate(RinksideGoalSerializer)
+        field = "score_%s" % data["side"]
+
+        def record(game: Game) -> None:
+            GameEvent.objects.create(
+                game=game,
+                sequence=game.version,
+                event_type=GameEvent.EventTypeChoices.GOAL,
+                period=data["period"],
+                time=data["time"],
+                for_team=data["side"] == "team",
+                description=data["description"],
+            )
+
+        return self.apply(game, data["version"], record=record, **{field: Coalesce(F(field), 0) + 1})
+
+    def validate(self, serializer_class) -> dict:
+        serializer = serializer_class(data=self.request.data)
+        serializer.is_valid(raise_exception=True)
+
+        return serializer.validated_data
+
+    def apply(self, game: Game, version: int, record=None, **changes) -> Response:
+        """Applies `changes` if the game is still at `version`, `record(game)` stores related rows in the same transaction"""
+        with transaction.atomic():
+            updated = Game.objects.filter(pk=game.pk, version=version).update(version=F("version") + 1, modified=timezone.now(), **changes)
+            game.refresh_from_db(fields=["live", "score_team", "score_opponent", "version", "modified"])
+
+            if updated == 0:
+                return Response(self.get_serializer(game).data, status=status.HTTP_409_CONFLICT)
+
+            if record is not None:
+                record(game)
+
+            # Nothing is announced for a change that is rolled back
+            transaction.on_commit(lambda: self.publish(game))
+
+        return Response(self.get_serializer(game).data)
+
+    def publish(self, game: Game) -> None:
+        scores_changed.send(sender=Game, games=[game])
+
+        try:
+            publish_scoreboard()
+        except OSError:
+            # The change is stored, the score updater publishes the scoreboard again on its next run
+            pass
@@ -1,18 +1,210 @@
+import threading
+import time
+from concurrent.futures import Executor, Future
 from typing import TypedDict
-from ..models import Game
+from urllib.parse import urlsplit
 
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from ..models import Game, GameEvent, PollSchedule
+from .breaker import CircuitBreaker, CircuitOpen, RateLimiter, get_breaker, get_rate_limiter
+
+_sessions: dict[type, requests.Session] = {}
+_sessions_lock = threading.Lock()
+
+
+class GameInformation(TypedDict, total=False):
+    """Game data as returned by a competition website, keys are only present when they could be fetched"""
 
-class GameInformation(TypedDict):
     live: bool
     scoreA: int
     scoreB: int
+    # New timeline events (see `GameEventData`), the number and hash of the timeline entries seen so far and whether the timeline was rewritten since the
+    # last fetch
+    events: list["GameEventData"]
+    event_cursor: int
+    event_digest: str
+    events_reset: bool
+
+
+class GameEventData(TypedDict, total=False):
+    """A single timeline event, `sequence` is its position in the timeline starting at 1 and `team` is A (home) or B (away)"""
+
+    sequence: int
+    event_type: str
+    period: str
+    time: str
+    team: str
+    description: str
+    data: dict
 
 
 class CompetitionBaseClass:
     url: str
+    timeout: float = 10
+
+    # Settings for the HTTP session shared by all instances of a competition class
+    headers: dict[str, str] = {}
+    pool_size: int = 16
+    retries = Retry(total=2, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504], allowed_methods=["GET"], raise_on_status=False)
+
+    # Protection of the competition website, shared by all competitions on the same host, see `activities.competition.breaker`
+    failure_threshold: int = 5
+    reset_timeout: float = 60
+    rate_limit: float = 5
+    rate_burst: int = 10
 
     def __init__(self):
         self.url = "http://localhost"
 
-    def update_game_information(self, game: Game) -> None:
+    @classmethod
+    def get_session(cls) -> requests.Session:
+        """
+        Returns the HTTP session for this competition class, the session is created once per process and reused by all instances.
+
+        The session keeps connections to the competition website open (up to `pool_size` per host), retries failed requests according to `retries`
+        and sends `headers` with every request.
+        """
+        with _sessions_lock:
+            if cls not in _sessions:
+                session = requests.Session()
+                session.headers.update(cls.headers)
+
+                adapter = HTTPAdapter(pool_connections=4, pool_maxsize=cls.pool_size, max_retries=cls.retries)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+
+                _sessions[cls] = session
+
+            return _sessions[cls]
+
+    @property
+    def session(self) -> requests.Session:
+        return self.get_session()
+
+    @property
+    def host(self) -> str:
+        return urlsplit(self.url).netloc
+
+    @property
+    def breaker(self) -> CircuitBreaker:
+        return get_breaker(self.host, failure_threshold=self.failure_threshold, reset_timeout=self.reset_timeout)
+
+    @property
+    def rate_limiter(self) -> RateLimiter:
+        return get_rate_limiter(self.host, self.rate_limit, self.rate_burst)
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        """
+        Sends a GET request with the shared session, limited to `rate_limit` requests per second to the host.
+
+        Raises `CircuitOpen` without sending anything while the circuit breaker of the host is open. Connection errors, timeouts and server errors
+        count as failures for the circuit breaker.
+        """
+        breaker = self.breaker
+
+        if not breaker.allow_request():
+            raise CircuitOpen("circuit breaker for %s is open" % self.host)
+
+        self.rate_limiter.acquire()
+
+        try:
+            response = self.session.get(url, timeout=self.timeout, **kwargs)
+        except requests.RequestException:
+            breaker.record_failure()
+            raise
+
+        if response.status_code >= 500:
+            breaker.record_failure()
+        else:
+            breaker.record_success()
+
+        return response
+
+    def fetch_game_information(self, game: Game) -> GameInformation:
+        """
+        Fetches the current state of the game from the competition website.
+
+        Only performs network access, this is safe to run outside of the main thread as long as `game` was loaded with its season.
+        """
         raise NotImplementedError
+
+    def fetch_games(self, games: list[Game], executor: Executor) -> dict[Future, Game]:
+        """
+        Starts fetching all `games` of this competition on `executor`, every future results in the game information and the fetch duration in seconds.
+
+        The updater passes all games of a run at once, override this to fetch a batch of games together.
+        """
+        return {executor.submit(self.timed_fetch_game_information, game): game for game in games}
+
+    def timed_fetch_game_information(self, game: Game) -> tuple[GameInformation, float]:
+        start = time.monotonic()
+        game_data = self.fetch_game_information(game)
+
+        return game_data, time.monotonic() - start
+
+    def apply_game_information(self, game: Game, game_data: GameInformation) -> bool:
+        """
+        Sets the fetched game data on the game, `scoreA` is always the home team.
+
+        Returns whether anything changed, the game is not saved.
+        """
+        previous = (game.live, game.score_team, game.score_opponent)
+
+        if "live" in game_data:
+            game.live = game_data["live"]
+
+        if "scoreA" in game_data and "scoreB" in game_data:
+            if game.is_home_game:
+                game.score_team = game_data["scoreA"]
+                game.score_opponent = game_data["scoreB"]
+            else:
+                game.score_team = game_data["scoreB"]
+                game.score_opponent = game_data["scoreA"]
+
+        return (game.live, game.score_team, game.score_opponent) != previous
+
+    def get_event_cursor(self, game: Game) -> int:
+        """Returns the number of timeline entries already stored for `game`, the game should be loaded with its poll schedule"""
+        try:
+            return game.poll_schedule.event_cursor
+        except PollSchedule.DoesNotExist:
+            return 0
+
+    def get_event_digest(self, game: Game) -> str:
+        """Returns the hash of the timeline entries already stored for `game`, the game should be loaded with its poll schedule"""
+        try:
+            return game.poll_schedule.event_digest
+        except PollSchedule.DoesNotExist:
+            return ""
+
+    def get_game_events(self, game: Game, game_data: GameInformation) -> list[GameEvent]:
+        """Returns the new events in the game data as unsaved game events, like the scores A is the home team"""
+        events = []
+
+        for event in game_data.get("events", []):
+            for_team = None
+
+            if event.get("team") in ["A", "B"]:
+                for_team = (event["team"] == "A") == game.is_home_game
+
+            events.append(
+                GameEvent(
+                    game=game,
+                    sequence=event["sequence"],
+                    event_type=event.get("event_type", GameEvent.EventTypeChoices.OTHER),
+                    period=event.get("period", ""),
+                    time=event.get("time", ""),
+                    for_team=for_team,
+                    description=event.get("description", "")[:250],
+                    data=event.get("data", {}),
+                )
+            )
+
+        return events
+
+    def update_game_information(self, game: Game) -> None:
+        if self.apply_game_information(game, self.fetch_game_information(game)):
+            game.save(update_fields=["live", "score_team", "score_opponent", "modified"])
@@ -0,0 +1,157 @@
+import datetime
+import threading
+import time
+
+from django.utils import timezone
+
+from ..models import CircuitBreakerState
+
+_breakers: dict[str, "CircuitBreaker"] = {}
+_limiters: dict[str, "RateLimiter"] = {}
+_registry_lock = threading.Lock()
+
+
+class CircuitOpen(Exception):
+    """Raised instead of sending a request to a competition website whose circuit breaker is open"""
+
+    pass
+
+
+class CircuitBreaker:
+    """
+    Stops sending requests to a host after `failure_threshold` consecutive failures.
+
+    Once open, the first request after `reset_timeout` seconds is let through as a probe (half open), if it succeeds the breaker closes again,
+    otherwise it stays open for another `reset_timeout` seconds. The state lives in memory and is stored in `CircuitBreakerState` by `save_breakers`.
+    """
+
+    def __init__(self, host: str, failure_threshold: int = 5, reset_timeout: float = 60):
+        self.host = host
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+
+        self.state = CircuitBreakerState.StateChoices.CLOSED
+        self.failures = 0
+        self.opened_at = None
+        self.probing = False
+        self.changed = False
+        self.loaded = False
+        self.lock = threading.Lock()
+
+    def allow_request(self) -> bool:
+        with self.lock:
+            if self.state == CircuitBreakerState.StateChoices.CLOSED:
+                return True
+
+            if self.state == CircuitBreakerState.StateChoices.OPEN and timezone.now() >= self.opened_at + datetime.timedelta(seconds=self.reset_timeout):
+                self.set_state(CircuitBreakerState.StateChoices.HALF_OPEN)
+
+            if self.state == CircuitBreakerState.StateChoices.HALF_OPEN and not self.probing:
+                self.probing = True
+                return True
+
+            return False
+
+    def record_success(self) -> None:
+        with self.lock:
+            self.probing = False
+
+            if self.failures > 0 or self.state != CircuitBreakerState.StateChoices.CLOSED:
+                self.failures = 0
+                self.opened_at = None
+                self.set_state(CircuitBreakerState.StateChoices.CLOSED)
+
+    def record_failure(self) -> None:
+        with self.lock:
+            self.probing = False
+            self.failures += 1
+            self.changed = True
+
+            if self.state == CircuitBreakerState.StateChoices.HALF_OPEN or self.failures >= self.failure_threshold:
+                self.opened_at = timezone.now()
+                self.set_state(CircuitBreakerState.StateChoices.OPEN)
+
+    def set_state(self, state: str) -> None:
+        self.state = state
+        self.changed = True
+
+
+class RateLimiter:
+    """A token bucket allowing `rate` requests per second on average with bursts of up to `burst` requests, `acquire` blocks until a request is allowed"""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self) -> None:
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+
+                wait = (1 - self.tokens) / self.rate
+
+            time.sleep(wait)
+
+
+def get_breaker(host: str, failure_threshold: int = 5, reset_timeout: float = 60) -> CircuitBreaker:
+    """Returns the circuit breaker for `host`, created on first use, the breaker is shared by all competitions using the same host"""
+    with _registry_lock:
+        if host not in _breakers:
+            _breakers[host] = CircuitBreaker(host, failure_threshold=failure_threshold, reset_timeout=reset_timeout)
+
+        return _breakers[host]
+
+
+def get_rate_limiter(host: str, rate: float, burst: int) -> RateLimiter:
+    """Returns the rate limiter for `host`, created on first use, the limiter is shared by all competitions using the same host"""
+    with _registry_lock:
+        if host not in _limiters:
+            _limiters[host] = RateLimiter(rate, burst)
+
+        return _limiters[host]
+
+
+def load_breakers(breakers: list[CircuitBreaker]) -> None:
+    """Restores the stored state of `breakers` that were not loaded before, runs on the main thread before fetching"""
+    pending = {breaker.host: breaker for breaker in breakers if not breaker.loaded}
+
+    if len(pending) == 0:
+        return
+
+    for stored in CircuitBreakerState.objects.filter(host__in=pending.keys()):
+        breaker = pending[stored.host]
+
+        with breaker.lock:
+            breaker.state = stored.state
+            breaker.failures = stored.failures
+            breaker.opened_at = stored.opened_at
+
+    for breaker in pending.values():
+        breaker.loaded = True
+
+
+def save_breakers() -> None:
+    """Stores the state of all breakers that changed since the last save with a single query"""
+    states = []
+
+    with _registry_lock:
+        breakers = list(_breakers.values())
+
+    for breaker in breakers:
+        with breaker.lock:
+            if breaker.changed:
+                states.append(CircuitBreakerState(host=breaker.host, state=breaker.state, failures=breaker.failures, opened_at=breaker.opened_at, modified=timezone.now()))
+                breaker.changed = False
+
+    if len(states) > 0:
+        CircuitBreakerState.objects.bulk_create(states, update_conflicts=True, unique_fields=["host"], update_fields=["state", "failures", "opened_at", "modified"])
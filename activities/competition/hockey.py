@@ -1,54 +1,65 @@
-from activities.models import Game
-from .base import CompetitionBaseClass, GameInformation
+from activities.models import Game, GameEvent
+from .base import CompetitionBaseClass, GameEventData, GameInformation
+from concurrent.futures import ThreadPoolExecutor
 from urllib.parse import urljoin
-from bs4 import BeautifulSoup
-import requests
+import hashlib
 import json
-from requests.adapters import HTTPAdapter
+
+
+def get_timeline_digest(entries: list) -> str:
+    return hashlib.sha256(json.dumps(entries, sort_keys=True, default=str).encode()).hexdigest()
 
 
 class RBIHF(CompetitionBaseClass):
+    headers = {
+        "Cookie": "language=en",
+        "Postman-Token": "clubmanager",
+        "Host": "www.rbihf.be",
+        "User-Agent": "PostmanRuntime/7.37.0",
+        "Accept": "application/json",
+        "Accept-Encoding": "gzip,deflate,br",
+        "Connection": "keep-alive",
+        "X-Requested-With": "XMLHttpRequest",
+    }
+
     def __init__(self):
         self.url = "https://rbihf.be/modules/league/ajax/time.php"
 
-    def update_game_information(self, game: Game) -> None:
+    def fetch_game_information(self, game: Game) -> GameInformation:
         season = "{start}{end}".format(start=game.season.start_date.strftime("%y"), end=game.season.end_date.strftime("%y"))
 
         payload = {"gameNr": game.game_id, "season": season}
-        headers = {
-            "Cookie": "language=en",
-            "Postman-Token": "clubmanager",
-            "Host": "www.rbihf.be",
-            "User-Agent": "PostmanRuntime/7.37.0",
-            "Accept": "application/json",
-            "Accept-Encoding": "gzip,deflate,br",
-            "Connection": "keep-alive",
-            "Referer": "https://rbihf.be/game/{gameNr}".format(gameNr=game.game_id),
-            "X-Requested-With": "XMLHttpRequest",
-        }
+        headers = {"Referer": "https://rbihf.be/game/{gameNr}".format(gameNr=game.game_id)}
 
-        req = requests.get(self.url, params=payload, headers=headers)
+        req = self.get(self.url, params=payload, headers=headers)
 
         if req.status_code == 200:
             game_data = req.json()
 
-            game.live = game_data["live"]
+            return {"live": game_data["live"], "scoreA": game_data["scoreA"], "scoreB": game_data["scoreB"]}
 
-            if game.is_home_game:
-                game.score_team = game_data["scoreA"]
-                game.score_opponent = game_data["scoreB"]
-            else:
-                game.score_team = game_data["scoreB"]
-                game.score_opponent = game_data["scoreA"]
-
-            game.save(update_fields=["live", "score_team", "score_opponent"])
+        return {}
 
 
 class CEHL(CompetitionBaseClass):
+    # Timeline and score are fetched at the same time, shared by all instances
+    executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix="cehl")
+
+    headers = {
+        "Cookie": "language=en",
+        "Postman-Token": "clubmanager",
+        "Host": "www.cehl.eu",
+        "User-Agent": "PostmanRuntime/7.37.0",
+        "Accept": "*/*",
+        "Accept-Encoding": "gzip,deflate,br",
+        "Connection": "keep-alive",
+        "X-Requested-With": "XMLHttpRequest",
+    }
+
     def __init__(self):
         self.url = "https://www.cehl.eu/ajax/"
 
-    def update_game_information(self, game: Game) -> None:
+    def fetch_game_information(self, game: Game) -> GameInformation:
         season = "{start}{end}".format(start=game.season.start_date.strftime("%y"), end=game.season.end_date.strftime("%y"))
 
         referer_url = urljoin("https://www.cehl.eu", "game/%s/%s" % (season, game.game_id))
@@ -56,34 +67,80 @@ class CEHL(CompetitionBaseClass):
         score_url = urljoin(self.url, "score.php")
 
         payload = {"nr": game.game_id, "season": season}
-        headers = {
-            "Cookie": "language=en",
-            "Postman-Token": "clubmanager",
-            "Host": "www.cehl.eu",
-            "User-Agent": "PostmanRuntime/7.37.0",
-            "Accept": "*/*",
-            "Accept-Encoding": "gzip,deflate,br",
-            "Connection": "close",
-            "Referer": referer_url,
-            "X-Requested-With": "XMLHttpRequest",
-        }
+        headers = {"Referer": referer_url}
+
+        timeline_future = self.executor.submit(self.fetch_timeline, timeline_url, payload, headers, self.get_event_cursor(game), self.get_event_digest(game))
+        score_future = self.executor.submit(self.fetch_score, score_url, payload, headers)
 
-        timeline_req = requests.get(timeline_url, params=payload, headers=headers)
-        score_req = requests.get(score_url, params=payload, headers=headers)
+        game_data = {}
+        errors = []
 
-        if timeline_req.status_code == 200:
-            game.live = timeline_req.json()["live"] == 1
+        for future in [timeline_future, score_future]:
+            try:
+                game_data.update(future.result())
+            except Exception as e:
+                errors.append(e)
 
-        if score_req.status_code == 200:
-            game_data = score_req.json()
+        # Keep whatever came back, only fail when both requests failed
+        if len(errors) == 2:
+            raise errors[0]
 
-            if game.is_home_game:
-                game.score_team = game_data["scoreA"]
-                game.score_opponent = game_data["scoreB"]
+        return game_data
+
+    def fetch_timeline(self, url: str, payload: dict[str, str], headers: dict[str, str], cursor: int = 0, digest: str = "") -> GameInformation:
+        """
+        Fetches the live state and the timeline entries after `cursor`.
+
+        Events are numbered by their position in the timeline, so when any of the first `cursor` entries changed (their hash no longer matches `digest`,
+        e.g. a disallowed goal or a late entry for an earlier period) the timeline is read again from the start.
+        """
+        req = self.get(url, params=payload, headers=headers)
+
+        if req.status_code == 200:
+            timeline_data = req.json()
+            entries = timeline_data.get("timeline") or []
+            reset = len(entries) < cursor or (cursor > 0 and get_timeline_digest(entries[:cursor]) != digest)
+
+            if reset:
+                cursor = 0
+
+            return {
+                "live": timeline_data["live"] == 1,
+                "events": [self.parse_event(sequence, entry) for sequence, entry in enumerate(entries[cursor:], start=cursor + 1) if isinstance(entry, dict)],
+                "event_cursor": len(entries),
+                "event_digest": get_timeline_digest(entries),
+                "events_reset": reset,
+            }
+
+        return {}
+
+    @staticmethod
+    def parse_event(sequence: int, entry: dict) -> GameEventData:
+        event_type = str(entry.get("type", "")).lower()
+
+        if event_type.startswith("goal"):
+            event_type = GameEvent.EventTypeChoices.GOAL
+        elif event_type.startswith("pen"):
+            event_type = GameEvent.EventTypeChoices.PENALTY
+        else:
+            event_type = GameEvent.EventTypeChoices.OTHER
+
+        return {
+            "sequence": sequence,
+            "event_type": event_type,
+            "period": str(entry.get("period", "")),
+            "time": str(entry.get("time", "")),
+            "team": str(entry.get("team", "")).upper(),
+            "description": " ".join(str(entry[key]) for key in ["player", "description"] if entry.get(key)),
+            "data": entry,
+        }
+
+    def fetch_score(self, url: str, payload: dict[str, str], headers: dict[str, str]) -> GameInformation:
+        req = self.get(url, params=payload, headers=headers)
+
+        if req.status_code == 200:
+            score_data = req.json()
 
-            else:
-                game.score_team = game_data["scoreB"]
-                game.score_opponent = game_data["scoreA"]
+            return {"scoreA": score_data["scoreA"], "scoreB": score_data["scoreB"]}
 
-        if timeline_req.status_code == 200 or score_req.status_code == 200:
-            game.save(update_fields=["live", "score_team", "score_opponent"])
+        return {}
@@ -0,0 +1,80 @@
+import importlib
+import threading
+
+from ..models import Competition, Game
+from .base import CompetitionBaseClass
+
+_providers: dict[int, tuple[str, str, CompetitionBaseClass]] = {}
+_providers_lock = threading.Lock()
+
+
+class InvalidCompetition(Exception):
+    """Raised when the module and name of a competition do not point to a competition class"""
+
+    pass
+
+
+def get_provider_class(module: str, name: str) -> type[CompetitionBaseClass]:
+    """Returns the competition class `name` from `module`, raises `InvalidCompetition` if it can not be found or is no competition class"""
+    try:
+        provider_module = importlib.import_module(module)
+    except ImportError as e:
+        raise InvalidCompetition('Module "%s" could not be imported: %s' % (module, e))
+
+    provider_class = getattr(provider_module, name, None)
+
+    if not isinstance(provider_class, type) or not issubclass(provider_class, CompetitionBaseClass):
+        raise InvalidCompetition('"%s" in module "%s" is not a competition class' % (name, module))
+
+    return provider_class
+
+
+def get_provider(competition: Competition) -> CompetitionBaseClass:
+    """Returns the provider for `competition`, there is a single instance per competition that is reused until the competition changes"""
+    with _providers_lock:
+        cached = _providers.get(competition.pk)
+
+        if cached is None or cached[:2] != (competition.module, competition.name):
+            cached = (competition.module, competition.name, get_provider_class(competition.module, competition.name)())
+            _providers[competition.pk] = cached
+
+        return cached[2]
+
+
+def load_providers() -> dict[Competition, str]:
+    """Resolves the providers of all competitions up front, returns an error message for each competition that is not valid"""
+    errors = {}
+
+    for competition in Competition.objects.all():
+        try:
+            get_provider(competition)
+        except InvalidCompetition as e:
+            errors[competition] = str(e)
+
+    return errors
+
+
+def clear_provider(competition_id: int) -> None:
+    with _providers_lock:
+        _providers.pop(competition_id, None)
+
+
+def group_games(games: list[Game]) -> tuple[dict[CompetitionBaseClass, list[Game]], dict[Game, str]]:
+    """
+    Groups `games` by the provider of their competition, games without competition are left out.
+
+    Returns the groups and an error message for every game whose competition is not valid.
+    """
+    groups = {}
+    errors = {}
+
+    for game in games:
+        if game.competition is None:
+            continue
+
+        try:
+            groups.setdefault(get_provider(game.competition), []).append(game)
+        except InvalidCompetition as e:
+            errors[game] = str(e)
+
+    return groups, errors
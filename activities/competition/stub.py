@@ -0,0 +1,206 @@
+import json
+import random
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlsplit
+
+from requests.adapters import HTTPAdapter
+
+# Fixtures hold the recorded responses per endpoint (last part of the URL path) and game number, in the order they were received:
+# {"score.php": {"1234": [{"status": 200, "body": {"scoreA": 1, "scoreB": 0}}, ...]}}
+Fixtures = dict[str, dict[str, list[dict]]]
+
+# Query parameters holding the game number, per competition website
+GAME_PARAMETERS = ["gameNr", "nr"]
+
+
+def load_fixtures(path: str | Path) -> Fixtures:
+    with open(path) as fixture_file:
+        return json.load(fixture_file)
+
+
+def save_fixtures(fixtures: Fixtures, path: str | Path) -> None:
+    with open(path, "w") as fixture_file:
+        json.dump(fixtures, fixture_file, indent=2)
+
+
+class RecordingAdapter(HTTPAdapter):
+    """An HTTP adapter that stores every JSON response it receives in `fixtures`, mount it on a competition session to record fixtures"""
+
+    def __init__(self, *args, **kwargs):
+        super(RecordingAdapter, self).__init__(*args, **kwargs)
+
+        self.fixtures: Fixtures = {}
+        self.fixtures_lock = threading.Lock()
+
+    def send(self, request, *args, **kwargs):
+        response = super(RecordingAdapter, self).send(request, *args, **kwargs)
+
+        url = urlsplit(request.url)
+        params = parse_qs(url.query)
+        game_id = next((params[parameter][0] for parameter in GAME_PARAMETERS if parameter in params), "")
+
+        try:
+            body = response.json()
+        except ValueError:
+            body = None
+
+        with self.fixtures_lock:
+            self.fixtures.setdefault(url.path.rsplit("/", 1)[-1], {}).setdefault(game_id, []).append({"status": response.status_code, "body": body})
+
+        return response
+
+
+class StubRequestHandler(BaseHTTPRequestHandler):
+    """Answers every GET request with the same game information, supports keep-alive connections"""
+
+    protocol_version = "HTTP/1.1"
+
+    def setup(self) -> None:
+        super(StubRequestHandler, self).setup()
+
+        # Headers and body are written separately, without this delayed ACKs add ~40ms to every response on a reused connection
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def do_GET(self) -> None:
+        self.server.count_request()
+        self.send_json(200, {"live": 1, "scoreA": 0, "scoreB": 0})
+
+    def send_json(self, status: int, data) -> None:
+        body = json.dumps(data).encode()
+
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args) -> None:
+        pass
+
+
+class StubServer(ThreadingHTTPServer):
+    """
+    A local HTTP server standing in for a competition website, keeps track of the number of connections and requests it received.
+
+    Use as a context manager, the server listens on a random free port on localhost (unless `port` is given) and runs in a background thread.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, handler_class: type = StubRequestHandler, port: int = 0):
+        super(StubServer, self).__init__(("127.0.0.1", port), handler_class)
+
+        self.connections = 0
+        self.requests = 0
+        self.counter_lock = threading.Lock()
+
+    @property
+    def url(self) -> str:
+        return "http://%s:%s/" % self.server_address[:2]
+
+    def get_request(self) -> tuple:
+        with self.counter_lock:
+            self.connections += 1
+
+        return super(StubServer, self).get_request()
+
+    def count_request(self) -> None:
+        with self.counter_lock:
+            self.requests += 1
+
+    def reset_counters(self) -> None:
+        with self.counter_lock:
+            self.connections = 0
+            self.requests = 0
+
+    def __enter__(self) -> "StubServer":
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.shutdown()
+        self.server_close()
+
+
+class ReplayRequestHandler(StubRequestHandler):
+    def do_GET(self) -> None:
+        url = urlsplit(self.path)
+        params = parse_qs(url.query)
+        game_id = next((params[parameter][0] for parameter in GAME_PARAMETERS if parameter in params), "")
+
+        self.server.count_request()
+        time.sleep(self.server.get_delay())
+        self.send_json(*self.server.get_response(url.path.rsplit("/", 1)[-1], game_id))
+
+
+class ReplayServer(StubServer):
+    """
+    A stub competition website replaying recorded fixtures, for games without fixtures a live game is simulated.
+
+    * `fixtures` recorded responses, every request for a game returns the next recorded response, the last one is repeated once all are used
+    * `latency` and `jitter` the delay in seconds before every response is `latency` plus or minus a random value up to `jitter`
+    * `error_rate` the fraction of requests that is answered with a 503 error
+    * `goal_rate` the chance that a simulated game has a new goal on every score request
+
+    Serves the endpoints of both RBIHF (`time.php`) and CEHL (`timeline.php` and `score.php`).
+    """
+
+    def __init__(
+        self, fixtures: Fixtures | None = None, latency: float = 0, jitter: float = 0, error_rate: float = 0, goal_rate: float = 0.05, seed: int | None = None, port: int = 0
+    ):
+        super(ReplayServer, self).__init__(ReplayRequestHandler, port=port)
+
+        self.fixtures = fixtures or {}
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.goal_rate = goal_rate
+
+        self.random = random.Random(seed)
+        self.positions: dict[tuple[str, str], int] = {}
+        self.scores: dict[str, list[int]] = {}
+        self.timelines: dict[str, list[dict]] = {}
+        self.state_lock = threading.Lock()
+
+    def get_delay(self) -> float:
+        with self.state_lock:
+            return max(0, self.latency + self.random.uniform(-self.jitter, self.jitter))
+
+    def get_response(self, endpoint: str, game_id: str) -> tuple[int, dict]:
+        with self.state_lock:
+            if self.random.random() < self.error_rate:
+                return 503, {}
+
+            recorded = self.fixtures.get(endpoint, {}).get(game_id)
+
+            if recorded:
+                position = self.positions.get((endpoint, game_id), 0)
+                self.positions[(endpoint, game_id)] = position + 1
+
+                response = recorded[min(position, len(recorded) - 1)]
+                return response["status"], response["body"]
+
+            return self.simulate(endpoint, game_id)
+
+    def simulate(self, endpoint: str, game_id: str) -> tuple[int, dict]:
+        score = self.scores.setdefault(game_id, [0, 0])
+        timeline = self.timelines.setdefault(game_id, [])
+
+        if endpoint in ["time.php", "score.php"] and self.random.random() < self.goal_rate:
+            team = self.random.randrange(2)
+            score[team] += 1
+            timeline.append({"type": "goal", "period": 1, "time": "%02d:00" % len(timeline), "team": "AB"[team], "player": "Player %d" % self.random.randint(1, 99)})
+
+        match endpoint:
+            case "time.php":
+                return 200, {"live": True, "scoreA": score[0], "scoreB": score[1]}
+            case "timeline.php":
+                return 200, {"live": 1, "timeline": list(timeline)}
+            case "score.php":
+                return 200, {"scoreA": score[0], "scoreB": score[1]}
+
+        return 404, {}
@@ -0,0 +1,130 @@
+import datetime
+
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+from django.db import connection, transaction
+from django.utils import timezone
+
+from activities.competition.registry import clear_provider, get_provider
+from activities.competition.stub import ReplayServer, load_fixtures
+from activities.models import Competition, Game, GameType, Venue
+from activities.updater import ScoreUpdater, UpdateSummary
+from teams.models import Season, Team
+
+
+class WriteCounter:
+    """Counts the queries that modify the database, use with `connection.execute_wrapper`"""
+
+    def __init__(self):
+        self.writes = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        if sql.lstrip().split(" ", 1)[0].upper() in ["INSERT", "UPDATE", "DELETE"]:
+            self.writes += 1
+
+        return execute(sql, params, many, context)
+
+
+class Command(BaseCommand):
+    help = "Runs the score updater for synthetic live games against a local stub of the competition websites, all changes are rolled back afterwards"
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("--games", action="store", default=50, type=int, help="Number of synthetic games, divided over RBIHF and CEHL")
+        parser.add_argument("--cycles", action="store", default=5, type=int, help="Number of update cycles")
+        parser.add_argument("--workers", action="store", default=8, type=int, help="Number of games to fetch simultaneously")
+        parser.add_argument("--fixtures", action="store", help="Fixture file recorded with record_competition_fixtures, game IDs are numbered from 1")
+        parser.add_argument("--latency", action="store", default=50, type=float, help="Delay in milliseconds before every response")
+        parser.add_argument("--jitter", action="store", default=20, type=float, help="Maximum random variation of the delay in milliseconds")
+        parser.add_argument("--error-rate", action="store", default=0, type=float, help="Fraction of requests answered with an error")
+        parser.add_argument("--goal-rate", action="store", default=0.05, type=float, help="Chance of a goal in a simulated game on every request")
+        parser.add_argument("--rate-limit", action="store", default=1000, type=float, help="Maximum number of requests per second to the stub")
+        parser.add_argument("--seed", action="store", default=None, type=int, help="Seed for latency, errors and goals")
+
+    def handle(self, *args, **options) -> None:
+        if options["games"] < 1 or options["cycles"] < 1 or options["workers"] < 1:
+            raise CommandError("--games, --cycles and --workers should be at least 1")
+
+        server = ReplayServer(
+            fixtures=load_fixtures(options["fixtures"]) if options["fixtures"] else None,
+            latency=options["latency"] / 1000,
+            jitter=options["jitter"] / 1000,
+            error_rate=options["error_rate"],
+            goal_rate=options["goal_rate"],
+            seed=options["seed"],
+        )
+
+        with server, transaction.atomic():
+            games, competitions = self.create_games(server, options["games"], options["rate_limit"])
+            updater = ScoreUpdater(workers=options["workers"], publish=False)
+            counter = WriteCounter()
+            summary = UpdateSummary()
+
+            try:
+                with connection.execute_wrapper(counter):
+                    for cycle in range(options["cycles"]):
+                        cycle_summary = updater.update(list(Game.objects.filter(pk__in=games).select_related("poll_schedule")))
+
+                        summary.results.extend(cycle_summary.results)
+                        summary.wall_time += cycle_summary.wall_time
+                        self.stdout.write("Cycle %d: %s" % (cycle + 1, cycle_summary))
+
+            finally:
+                updater.close()
+
+                for competition in competitions:
+                    clear_provider(competition.pk)
+
+                transaction.set_rollback(True)
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                "%d games x %d cycles: %.1f games/s, latency p50 %.0f ms, p99 %.0f ms, %d failed, %d DB writes (%d score changes), %d HTTP requests over %d connections"
+                % (
+                    options["games"],
+                    options["cycles"],
+                    len(summary.results) / summary.wall_time if summary.wall_time > 0 else 0,
+                    summary.latency_percentile(50) * 1000,
+                    summary.latency_percentile(99) * 1000,
+                    len(summary.failed),
+                    counter.writes,
+                    len(summary.changed),
+                    server.requests,
+                    server.connections,
+                )
+            )
+        )
+
+    def create_games(self, server: ReplayServer, count: int, rate_limit: float) -> tuple[list[int], list[Competition]]:
+        now = timezone.now()
+
+        if not Season.objects.filter(start_date__lte=now.date(), end_date__gte=now.date()).exists():
+            Season.objects.create(start_date=now.date() - datetime.timedelta(days=1), end_date=now.date() + datetime.timedelta(days=1))
+
+        team = Team.objects.create(name="Benchmark %s" % now.timestamp())
+        game_type = GameType.objects.get_or_create(name="Competition Game")[0]
+
+        rbihf = Competition.objects.create(name="RBIHF", module="activities.competition.hockey")
+        get_provider(rbihf).url = server.url + "modules/league/ajax/time.php"
+        cehl = Competition.objects.create(name="CEHL", module="activities.competition.hockey")
+        get_provider(cehl).url = server.url + "ajax/"
+
+        for competition in [rbihf, cehl]:
+            get_provider(competition).rate_limit = rate_limit
+            get_provider(competition).rate_burst = max(1, int(rate_limit))
+
+        # bulk_create skips Game.save, link the venue of the default location like save would
+        venue = Venue.get_for_location(Game._meta.get_field("location").default)
+        games = Game.objects.bulk_create(
+            Game(
+                team=team,
+                game_type=game_type,
+                season=Season.get_season(date=now.date()),
+                date=now,
+                venue=venue,
+                live=True,
+                competition=[rbihf, cehl][i % 2],
+                game_id=str(i + 1),
+            )
+            for i in range(count)
+        )
+
+        return [game.pk for game in games], [rbihf, cehl]
@@ -0,0 +1,36 @@
+import time
+
+import requests
+from django.core.management.base import BaseCommand, CommandParser
+
+from activities.competition.base import CompetitionBaseClass
+from activities.competition.stub import StubServer
+
+
+class BenchmarkCompetition(CompetitionBaseClass):
+    headers = {"Accept": "application/json"}
+
+
+class Command(BaseCommand):
+    help = "Compares fetching from a local stub competition website with a new connection per request versus the shared keep-alive session"
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("--requests", action="store", default=500, type=int, help="Number of requests to send in each scenario")
+
+    def handle(self, *args, **options) -> None:
+        with StubServer() as server:
+            self.run(server, "new connection per request", lambda: requests.get(server.url, headers={"Connection": "close"}, timeout=5), options["requests"])
+            self.run(server, "shared keep-alive session", lambda: BenchmarkCompetition.get_session().get(server.url, timeout=5), options["requests"])
+
+    def run(self, server: StubServer, name: str, fetch, count: int) -> None:
+        server.reset_counters()
+        start = time.perf_counter()
+
+        for _ in range(count):
+            fetch().json()
+
+        duration = time.perf_counter() - start
+
+        self.stdout.write(
+            "%-28s %d requests in %.3fs (%.3f ms per request) over %d connections" % (name, server.requests, duration, duration / count * 1000, server.connections)
+        )
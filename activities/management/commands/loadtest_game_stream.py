@@ -0,0 +1,123 @@
+import asyncio
+import resource
+import time
+from urllib.parse import urlsplit
+
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+
+from activities.scoreboard import ScoreboardGame, publish_scoreboard
+
+
+class Command(BaseCommand):
+    help = (
+        "Opens many simultaneous connections to the live score stream and reports how many stay connected and how fast updates arrive. "
+        "Run the site with a single ASGI worker first, e.g. uvicorn clubmanager.asgi:application --port 8000"
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("--url", action="store", default="http://127.0.0.1:8000/api/games/stream/", help="URL of the live score stream")
+        parser.add_argument("--clients", action="store", default=1000, type=int, help="Number of simultaneous connections")
+        parser.add_argument("--duration", action="store", default=30, type=float, help="Number of seconds to keep the connections open")
+        parser.add_argument("--connect-rate", action="store", default=500, type=float, help="Number of new connections per second")
+        parser.add_argument(
+            "--publish",
+            action="store",
+            default=0,
+            type=float,
+            help="Publish a synthetic scoreboard with a changed score every PUBLISH seconds, this overwrites the live scoreboard of this machine",
+        )
+
+    def handle(self, *args, **options) -> None:
+        url = urlsplit(options["url"])
+
+        if url.scheme != "http" or not url.hostname:
+            raise CommandError("Only plain http URLs are supported")
+
+        # Every connection needs a file descriptor
+        soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+        wanted = options["clients"] + 100
+
+        if soft < wanted:
+            resource.setrlimit(resource.RLIMIT_NOFILE, (min(wanted, hard), hard))
+
+        self.connected = 0
+        self.failed = 0
+        self.events = 0
+        self.latencies: list[float] = []
+        self.published: dict[int, float] = {}
+
+        asyncio.run(self.run(url, options))
+
+        latencies = sorted(self.latencies)
+        p50 = latencies[len(latencies) // 2] * 1000 if len(latencies) > 0 else 0
+        p99 = latencies[min(len(latencies) - 1, round(len(latencies) * 0.99))] * 1000 if len(latencies) > 0 else 0
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                "%d of %d clients connected (%d failed), %d events received (%.0f/s), delivery latency p50 %.0f ms, p99 %.0f ms"
+                % (self.connected, options["clients"], self.failed, self.events, self.events / options["duration"], p50, p99)
+            )
+        )
+
+    async def run(self, url, options: dict) -> None:
+        stop = time.monotonic() + options["duration"]
+        clients = []
+
+        if options["publish"] > 0:
+            clients.append(asyncio.create_task(self.publish(options["publish"], stop)))
+
+        for i in range(options["clients"]):
+            clients.append(asyncio.create_task(self.client(url, stop)))
+            await asyncio.sleep(1 / options["connect_rate"])
+
+        await asyncio.gather(*clients)
+
+    async def publish(self, interval: float, stop: float) -> None:
+        games = [ScoreboardGame(id=1_000_000 + i, team=0, live=True, score_team=0, score_opponent=0) for i in range(10)]
+        goals = 0
+
+        while time.monotonic() + interval < stop:
+            await asyncio.sleep(interval)
+
+            goals += 1
+            games[goals % len(games)] = ScoreboardGame(id=1_000_000 + goals % len(games), team=0, live=True, score_team=goals, score_opponent=0)
+            self.published[await asyncio.to_thread(publish_scoreboard, list(games))] = time.monotonic()
+
+    async def client(self, url, stop: float) -> None:
+        try:
+            reader, writer = await asyncio.open_connection(url.hostname, url.port or 80)
+            writer.write(
+                ("GET %s HTTP/1.1\r\nHost: %s\r\nAccept: text/event-stream\r\nConnection: keep-alive\r\n\r\n" % (url.path or "/", url.netloc)).encode()
+            )
+            await writer.drain()
+
+            status = await asyncio.wait_for(reader.readline(), timeout=max(1, stop - time.monotonic()))
+
+            if b" 200 " not in status:
+                raise ConnectionError(status.decode(errors="replace").strip())
+
+        except (OSError, ConnectionError, asyncio.TimeoutError):
+            self.failed += 1
+            return
+
+        self.connected += 1
+
+        try:
+            while (remaining := stop - time.monotonic()) > 0:
+                line = await asyncio.wait_for(reader.readline(), timeout=remaining)
+
+                if line == b"":
+                    break
+
+                if line.startswith(b"id: "):
+                    self.events += 1
+                    version = int(line[4:])
+
+                    if version in self.published:
+                        self.latencies.append(time.monotonic() - self.published[version])
+
+        except (OSError, asyncio.TimeoutError, ValueError):
+            pass
+
+        finally:
+            writer.close()
@@ -0,0 +1,42 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandParser
+
+from activities.competition.registry import group_games
+from activities.competition.stub import RecordingAdapter, save_fixtures
+from activities.updater import get_games_to_update
+
+
+class Command(BaseCommand):
+    help = "Records the responses of the competition websites for live and recent games to a fixture file, without updating the games"
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("output", action="store", help="Fixture file to write")
+        parser.add_argument("--hours", action="store", default=3, type=int, help="Change the hour limit to the specified number of hours")
+        parser.add_argument("--polls", action="store", default=1, type=int, help="Number of times every game is fetched")
+        parser.add_argument("--interval", action="store", default=30, type=float, help="Number of seconds between two polls")
+
+    def handle(self, *args, **options) -> None:
+        adapter = RecordingAdapter()
+        groups, errors = group_games(list(get_games_to_update(hours=options["hours"], due_only=False)))
+
+        for game, error in errors.items():
+            self.stdout.write(self.style.ERROR('Skipped "%s" - %s' % (game, error)))
+
+        for provider in groups:
+            provider.get_session().mount("https://", adapter)
+            provider.get_session().mount("http://", adapter)
+
+        for poll in range(options["polls"]):
+            if poll > 0:
+                time.sleep(options["interval"])
+
+            for provider, games in groups.items():
+                for game in games:
+                    try:
+                        provider.fetch_game_information(game)
+                    except Exception as e:
+                        self.stdout.write(self.style.ERROR('Failed to fetch "%s" - %s' % (game, str(e) or e.__class__.__name__)))
+
+            save_fixtures(adapter.fixtures, options["output"])
+            self.stdout.write("Poll %d of %d recorded to %s" % (poll + 1, options["polls"], options["output"]))
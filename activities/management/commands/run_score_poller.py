@@ -0,0 +1,108 @@
+import signal
+import threading
+import time
+
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+from django.db import close_old_connections
+from django.utils import timezone
+
+from activities.competition.registry import load_providers
+from activities.models import ScoreUpdateRun, UpdaterLock
+from activities.scoreboard import publish_scoreboard
+from activities.updater import ScoreUpdater, get_games_to_update
+
+
+class Command(BaseCommand):
+    help = "Keeps running and fetches updates for games as soon as they are due according to their poll schedule, stops on SIGTERM or SIGINT"
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("--interval", action="store", default=5, type=float, help="Number of seconds between two checks for games that are due")
+        parser.add_argument("--hours", action="store", default=3, type=int, help="Change the hour limit to the specified number of hours")
+        parser.add_argument("--workers", action="store", default=8, type=int, help="Number of games to fetch simultaneously")
+        parser.add_argument("--timeout", action="store", default=10, type=float, help="Timeout in seconds for a single request to a competition website")
+        parser.add_argument("--deadline", action="store", default=60, type=float, help="Maximum duration in seconds of a single update cycle")
+        parser.add_argument("--heartbeat", action="store", default=300, type=float, help="Number of seconds between two heartbeat messages")
+        parser.add_argument("--keep-days", action="store", default=30, type=int, help="Number of days to keep runs in the score update ledger")
+
+    def handle(self, *args, **options) -> None:
+        if options["workers"] < 1:
+            raise CommandError("--workers should be at least 1")
+
+        if options["interval"] <= 0:
+            raise CommandError("--interval should be larger than 0")
+
+        for competition, error in load_providers().items():
+            self.stdout.write(self.style.ERROR('Competition "%s" is not valid, its games will not be updated - %s' % (competition, error)))
+
+        self.stop = threading.Event()
+        signal.signal(signal.SIGTERM, self.handle_signal)
+        signal.signal(signal.SIGINT, self.handle_signal)
+
+        holder = UpdaterLock.get_holder_name()
+        updater = ScoreUpdater(workers=options["workers"], timeout=options["timeout"], deadline=options["deadline"], holder=holder)
+        active = None
+        cycles = 0
+        last_heartbeat = time.monotonic()
+
+        self.stdout.write("Score poller started (interval %ss, %d workers)" % (options["interval"], options["workers"]))
+
+        try:
+            while not self.stop.is_set():
+                start = time.monotonic()
+                close_old_connections()
+
+                try:
+                    # Only one poller (or update_scores run) polls at the same time, the others stand by and take over once the lock expires
+                    if UpdaterLock.acquire(holder, ttl=options["deadline"] + options["interval"] + 30):
+                        if active is not True:
+                            self.stdout.write("Acquired the updater lock as %s" % holder)
+
+                        active = True
+                        self.run_cycle(updater, options["hours"])
+                        cycles += 1
+
+                    elif active is not False:
+                        self.stdout.write("Another score updater holds the lock, standing by")
+                        active = False
+
+                except Exception as e:
+                    self.stderr.write(self.style.ERROR("Update cycle failed - %s" % (str(e) or e.__class__.__name__)))
+
+                if time.monotonic() - last_heartbeat >= options["heartbeat"]:
+                    self.stdout.write(
+                        "Heartbeat %s - %s, %d cycles completed" % (timezone.now().isoformat(timespec="seconds"), "active" if active else "standing by", cycles)
+                    )
+                    last_heartbeat = time.monotonic()
+
+                    try:
+                        ScoreUpdateRun.prune(options["keep_days"])
+                    except Exception as e:
+                        self.stderr.write(self.style.ERROR("Pruning the score update ledger failed - %s" % (str(e) or e.__class__.__name__)))
+
+                self.stop.wait(max(0, options["interval"] - (time.monotonic() - start)))
+
+        finally:
+            updater.close()
+            UpdaterLock.release(holder)
+            close_old_connections()
+
+        self.stdout.write("Score poller stopped after %d cycles" % cycles)
+
+    def handle_signal(self, signum, frame) -> None:
+        self.stdout.write("Received %s, stopping after the current cycle" % signal.Signals(signum).name)
+        self.stop.set()
+
+    def run_cycle(self, updater: ScoreUpdater, hours: int) -> None:
+        games = list(get_games_to_update(hours=hours))
+
+        # Without games to poll the scoreboard is still refreshed, so web workers do not consider it stale
+        if len(games) == 0:
+            publish_scoreboard()
+            return
+
+        summary = updater.update(games)
+
+        for result in summary.failed:
+            self.stdout.write(self.style.ERROR('Failed to update "%s" - %s' % (result.game, result.error)))
+
+        self.stdout.write(str(summary))
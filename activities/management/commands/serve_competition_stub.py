@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand, CommandParser
+
+from activities.competition.stub import ReplayServer, load_fixtures
+
+
+class Command(BaseCommand):
+    help = "Runs a local stub of the competition websites that replays recorded fixtures and simulates live games"
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("--port", action="store", default=8500, type=int, help="Port to listen on")
+        parser.add_argument("--fixtures", action="store", help="Fixture file recorded with record_competition_fixtures")
+        parser.add_argument("--latency", action="store", default=0, type=float, help="Delay in milliseconds before every response")
+        parser.add_argument("--jitter", action="store", default=0, type=float, help="Maximum random variation of the delay in milliseconds")
+        parser.add_argument("--error-rate", action="store", default=0, type=float, help="Fraction of requests answered with an error")
+        parser.add_argument("--goal-rate", action="store", default=0.05, type=float, help="Chance of a goal in a simulated game on every request")
+
+    def handle(self, *args, **options) -> None:
+        server = ReplayServer(
+            fixtures=load_fixtures(options["fixtures"]) if options["fixtures"] else None,
+            latency=options["latency"] / 1000,
+            jitter=options["jitter"] / 1000,
+            error_rate=options["error_rate"],
+            goal_rate=options["goal_rate"],
+            port=options["port"],
+        )
+
+        self.stdout.write("Serving RBIHF at %smodules/league/ajax/time.php and CEHL at %sajax/, stop with CONTROL-C" % (server.url, server.url))
+
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
@@ -1,25 +1,56 @@
 from django.core.management.base import BaseCommand, CommandError, CommandParser
 
-from activities.models import Game
-from django.db.models import Q
-from django.utils import timezone
-import datetime
+from activities.competition.registry import load_providers
+from activities.models import ScoreUpdateRun, UpdaterLock
+from activities.updater import get_games_to_update, update_games
 
 
 class Command(BaseCommand):
-    help = "Fetches updates for games with a start date in the last 3 hours based on their competition parameters"
+    help = "Fetches updates for games that are due according to their poll schedule, limited to games with a start date in the last 3 hours"
 
     def add_arguments(self, parser: CommandParser) -> None:
         parser.add_argument("--hours", action="store", default=3, type=int, help="Change the hour limit to the specified number of hours")
+        parser.add_argument("--workers", action="store", default=8, type=int, help="Number of games to fetch simultaneously")
+        parser.add_argument("--timeout", action="store", default=10, type=float, help="Timeout in seconds for a single request to a competition website")
+        parser.add_argument("--deadline", action="store", default=90, type=float, help="Maximum duration in seconds of the complete run")
+        parser.add_argument("--all", action="store_true", help="Update all games within the hour limit, also the ones that are not due according to their poll schedule")
+        parser.add_argument("--keep-days", action="store", default=30, type=int, help="Number of days to keep runs in the score update ledger")
 
     def handle(self, *args, **options) -> None:
-        hour_limit = options["hours"]
+        if options["workers"] < 1:
+            raise CommandError("--workers should be at least 1")
 
-        games = Game.objects.filter(Q(live=True) | Q(date__lte=timezone.now(), date__gte=timezone.now() - datetime.timedelta(hours=hour_limit)))
-        for game in games:
-            game.update_game_information()
+        for competition, error in load_providers().items():
+            self.stdout.write(self.style.ERROR('Competition "%s" is not valid, its games will not be updated - %s' % (competition, error)))
 
-            if game.competition is not None:
-                self.stdout.write(self.style.SUCCESS('Game information updated for "%s"' % game))
+        holder = UpdaterLock.get_holder_name()
+
+        if not UpdaterLock.acquire(holder, ttl=options["deadline"] + 30):
+            self.stdout.write(self.style.WARNING("Another score update is still running, skipped"))
+            return
+
+        try:
+            summary = update_games(
+                list(get_games_to_update(hours=options["hours"], due_only=not options["all"])),
+                workers=options["workers"],
+                timeout=options["timeout"],
+                deadline=options["deadline"],
+                holder=holder,
+            )
+
+            ScoreUpdateRun.prune(options["keep_days"])
+
+        finally:
+            UpdaterLock.release(holder)
+
+        for result in summary.results:
+            if result.skipped:
+                self.stdout.write(self.style.WARNING('Skipped "%s" - no competition set' % result.game))
+            elif result.error is not None:
+                self.stdout.write(self.style.ERROR('Failed to update "%s" - %s' % (result.game, result.error)))
+            elif result.changed:
+                self.stdout.write(self.style.SUCCESS('Game information updated for "%s" (%.0f ms)' % (result.game, result.latency * 1000)))
             else:
-                self.stdout.write(self.style.WARNING('Skipped "%s" - no competition set' % game))
+                self.stdout.write('No changes for "%s" (%.0f ms)' % (result.game, result.latency * 1000))
+
+        self.stdout.write(str(summary))
@@ -0,0 +1,68 @@
+# Generated by Django 5.1.15 on 2026-10-17 13:30
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("activities", "0015_game_game_type"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PollSchedule",
+            fields=[
+                (
+                    "game",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="poll_schedule",
+                        serialize=False,
+                        to="activities.game",
+                        verbose_name="game",
+                    ),
+                ),
+                (
+                    "state",
+                    models.CharField(
+                        choices=[
+                            ("UP", "Upcoming"),
+                            ("LIVE", "Live"),
+                            ("FIN", "Finished"),
+                            ("STOP", "Stopped"),
+                        ],
+                        default="UP",
+                        max_length=4,
+                        verbose_name="state",
+                    ),
+                ),
+                (
+                    "interval",
+                    models.PositiveIntegerField(
+                        default=0,
+                        help_text="Number of seconds between the last and the next update",
+                        verbose_name="interval",
+                    ),
+                ),
+                (
+                    "next_poll",
+                    models.DateTimeField(
+                        blank=True,
+                        db_index=True,
+                        help_text="Games without a next poll are no longer updated",
+                        null=True,
+                        verbose_name="next poll",
+                    ),
+                ),
+                ("modified", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "verbose_name": "poll schedule",
+                "verbose_name_plural": "poll schedules",
+                "ordering": ["next_poll"],
+            },
+        ),
+    ]
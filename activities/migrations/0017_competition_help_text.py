@@ -0,0 +1,28 @@
+# Generated by Django 5.1.15 on 2026-10-17 13:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("activities", "0016_pollschedule"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="competition",
+            name="module",
+            field=models.CharField(
+                help_text="Module containing the competition class, e.g. activities.competition.hockey",
+                max_length=250,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="competition",
+            name="name",
+            field=models.CharField(
+                help_text="Name of the competition class, e.g. RBIHF", max_length=250
+            ),
+        ),
+    ]
@@ -0,0 +1,62 @@
+# Generated by Django 5.1.15 on 2026-10-17 13:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("activities", "0017_competition_help_text"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CircuitBreakerState",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "host",
+                    models.CharField(max_length=250, unique=True, verbose_name="host"),
+                ),
+                (
+                    "state",
+                    models.CharField(
+                        choices=[
+                            ("CLOSED", "Closed"),
+                            ("OPEN", "Open"),
+                            ("HALF", "Half open"),
+                        ],
+                        default="CLOSED",
+                        max_length=6,
+                        verbose_name="state",
+                    ),
+                ),
+                (
+                    "failures",
+                    models.PositiveIntegerField(
+                        default=0, verbose_name="consecutive failures"
+                    ),
+                ),
+                (
+                    "opened_at",
+                    models.DateTimeField(
+                        blank=True, null=True, verbose_name="opened at"
+                    ),
+                ),
+                ("modified", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "verbose_name": "circuit breaker",
+                "verbose_name_plural": "circuit breakers",
+                "ordering": ["host"],
+            },
+        ),
+    ]
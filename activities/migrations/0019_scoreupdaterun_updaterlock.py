@@ -0,0 +1,91 @@
+# Generated by Django 5.1.15 on 2026-10-17 13:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("activities", "0018_circuitbreakerstate"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ScoreUpdateRun",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "holder",
+                    models.CharField(blank=True, max_length=250, verbose_name="holder"),
+                ),
+                (
+                    "started",
+                    models.DateTimeField(db_index=True, verbose_name="started"),
+                ),
+                ("finished", models.DateTimeField(verbose_name="finished")),
+                (
+                    "games_polled",
+                    models.PositiveIntegerField(default=0, verbose_name="games polled"),
+                ),
+                (
+                    "games_changed",
+                    models.PositiveIntegerField(
+                        default=0, verbose_name="games changed"
+                    ),
+                ),
+                (
+                    "errors",
+                    models.PositiveIntegerField(default=0, verbose_name="errors"),
+                ),
+                (
+                    "latency",
+                    models.JSONField(
+                        blank=True,
+                        default=dict,
+                        help_text="Median and maximum latency in milliseconds per competition",
+                        verbose_name="latency",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "score update run",
+                "verbose_name_plural": "score update runs",
+                "ordering": ["-started"],
+            },
+        ),
+        migrations.CreateModel(
+            name="UpdaterLock",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "name",
+                    models.CharField(max_length=250, unique=True, verbose_name="name"),
+                ),
+                (
+                    "holder",
+                    models.CharField(blank=True, max_length=250, verbose_name="holder"),
+                ),
+                ("expires_at", models.DateTimeField(verbose_name="expires at")),
+            ],
+            options={
+                "verbose_name": "updater lock",
+                "verbose_name_plural": "updater locks",
+            },
+        ),
+    ]
@@ -0,0 +1,109 @@
+# Generated by Django 5.1.15 on 2026-10-17 13:43
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("activities", "0019_scoreupdaterun_updaterlock"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="pollschedule",
+            name="event_cursor",
+            field=models.PositiveIntegerField(
+                default=0,
+                help_text="Number of timeline entries of the competition website already stored as game events",
+                verbose_name="event cursor",
+            ),
+        ),
+        migrations.CreateModel(
+            name="GameEvent",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "sequence",
+                    models.PositiveIntegerField(
+                        help_text="Position of the event in the timeline of the competition website",
+                        verbose_name="sequence",
+                    ),
+                ),
+                (
+                    "event_type",
+                    models.CharField(
+                        choices=[
+                            ("GOAL", "Goal"),
+                            ("PEN", "Penalty"),
+                            ("OTHER", "Other"),
+                        ],
+                        default="OTHER",
+                        max_length=5,
+                        verbose_name="event type",
+                    ),
+                ),
+                (
+                    "period",
+                    models.CharField(blank=True, max_length=20, verbose_name="period"),
+                ),
+                (
+                    "time",
+                    models.CharField(blank=True, max_length=20, verbose_name="time"),
+                ),
+                (
+                    "for_team",
+                    models.BooleanField(
+                        blank=True,
+                        help_text="Whether the event is for our team, empty if unknown",
+                        null=True,
+                        verbose_name="for team",
+                    ),
+                ),
+                (
+                    "description",
+                    models.CharField(
+                        blank=True, max_length=250, verbose_name="description"
+                    ),
+                ),
+                (
+                    "data",
+                    models.JSONField(
+                        blank=True,
+                        default=dict,
+                        help_text="The event as received from the competition website",
+                        verbose_name="data",
+                    ),
+                ),
+                ("created", models.DateTimeField(auto_now_add=True)),
+                (
+                    "game",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="events",
+                        to="activities.game",
+                        verbose_name="game",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "game event",
+                "verbose_name_plural": "game events",
+                "ordering": ["game", "sequence"],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("game", "sequence"), name="unique_game_event_sequence"
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.1.15 on 2026-10-17 13:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("activities", "0020_gameevent_pollschedule_event_cursor"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="game",
+            name="version",
+            field=models.PositiveIntegerField(
+                default=0,
+                help_text="Raised on every change through the rinkside API or a form, to detect conflicting updates",
+                verbose_name="version",
+            ),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.1.15 on 2026-10-17 14:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("activities", "0021_game_version"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="opponent",
+            name="logo_height",
+            field=models.PositiveIntegerField(
+                blank=True, editable=False, null=True, verbose_name="logo height"
+            ),
+        ),
+        migrations.AddField(
+            model_name="opponent",
+            name="logo_width",
+            field=models.PositiveIntegerField(
+                blank=True, editable=False, null=True, verbose_name="logo width"
+            ),
+        ),
+        migrations.AlterField(
+            model_name="opponent",
+            name="logo",
+            field=models.ImageField(
+                height_field="logo_height",
+                upload_to="opponent/logo/",
+                verbose_name="logo",
+                width_field="logo_width",
+            ),
+        ),
+    ]
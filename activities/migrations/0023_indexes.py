@@ -0,0 +1,30 @@
+# Generated by Django 5.1.15 on 2026-10-17 14:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("activities", "0022_image_dimensions"),
+        ("teams", "0017_image_dimensions"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="game",
+            index=models.Index(fields=["season", "date"], name="game_season_date_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="game",
+            index=models.Index(fields=["date"], name="game_date_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="game",
+            index=models.Index(
+                condition=models.Q(("live", True)),
+                fields=["date"],
+                name="game_live_idx",
+            ),
+        ),
+    ]
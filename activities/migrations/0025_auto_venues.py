@@ -0,0 +1,35 @@
+from django.db import migrations
+
+
+def create_venues(apps, schema_editor):
+    """Links every game to a venue for its location, the former hard-coded home locations become the home venue"""
+    Game = apps.get_model("activities", "Game")
+    Venue = apps.get_model("activities", "Venue")
+
+    home = Venue.objects.create(name="Ice Skating Center Mechelen", short_name="ISCM", is_home=True)
+    venues = {"ice skating center mechelen": home, "iscm": home}
+
+    for location in Game.objects.order_by("location").values_list("location", flat=True).distinct():
+        key = location.strip().lower()
+
+        if key == "":
+            continue
+
+        if key not in venues:
+            venues[key] = Venue.objects.create(name=location.strip())
+
+        Game.objects.filter(location=location).update(venue=venues[key])
+
+
+def remove_venues(apps, schema_editor):
+    Venue = apps.get_model("activities", "Venue")
+    Venue.objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("activities", "0024_venue"),
+    ]
+
+    operations = [migrations.RunPython(create_venues, remove_venues)]
@@ -0,0 +1,23 @@
+# Generated by Django 5.1.15 on 2026-10-17 14:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("activities", "0025_auto_venues"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="game",
+            name="event_generation",
+            field=models.PositiveIntegerField(
+                default=1,
+                editable=False,
+                help_text="Raised whenever the timeline of the competition website was rewritten and events were changed or removed",
+                verbose_name="event generation",
+            ),
+        ),
+    ]
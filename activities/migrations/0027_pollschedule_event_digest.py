@@ -0,0 +1,23 @@
+# Generated by Django 5.1.15 on 2026-10-17 15:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("activities", "0026_game_event_generation"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="pollschedule",
+            name="event_digest",
+            field=models.CharField(
+                blank=True,
+                help_text="Hash of the timeline entries already stored, to notice changes to earlier entries",
+                max_length=64,
+                verbose_name="event digest",
+            ),
+        ),
+    ]
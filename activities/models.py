@@ -1,8 +1,15 @@
-import importlib
+import datetime
+import os
+import socket
+import uuid
 
 from django.contrib import admin
+from django.core.exceptions import ValidationError
 from django.db import models
+from django.db.models.functions import Trim
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
+from model_utils import FieldTracker
 from rules.contrib.models import RulesModel
 
 from members.rules import is_organization_admin
@@ -14,14 +21,16 @@ from .rules import is_team_admin
 
 class GameManager(models.Manager):
     def get_queryset(self) -> models.QuerySet:
-        return super(GameManager, self).get_queryset().select_related("team", "opponent", "competition", "season")
+        return super(GameManager, self).get_queryset().select_related("team", "opponent", "competition", "season", "venue")
 
 
 class Opponent(RulesModel):
     """A class holding data on opponents"""
 
     name = models.CharField(_("name"), max_length=250)
-    logo = models.ImageField(_("logo"), upload_to="opponent/logo/")
+    logo = models.ImageField(_("logo"), upload_to="opponent/logo/", width_field="logo_width", height_field="logo_height")
+    logo_width = models.PositiveIntegerField(_("logo width"), blank=True, null=True, editable=False)
+    logo_height = models.PositiveIntegerField(_("logo height"), blank=True, null=True, editable=False)
 
     created = models.DateTimeField(auto_now_add=True)
     modified = models.DateTimeField(auto_now=True)
@@ -36,6 +45,47 @@ class Opponent(RulesModel):
         rules_permissions = {"add": is_admin, "view": is_admin, "change": is_admin, "delete": is_organization_admin}
 
 
+class Venue(RulesModel):
+    """A rink where games are played, games are linked to the venue matching their location"""
+
+    name = models.CharField(_("name"), max_length=250, unique=True)
+    short_name = models.CharField(_("short name"), max_length=250, blank=True, help_text=_("An alternative name, locations matching it are linked to this venue as well"))
+    is_home = models.BooleanField(_("home venue"), default=False, help_text=_("Games at a home venue are home games"))
+
+    created = models.DateTimeField(auto_now_add=True)
+    modified = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return self.name
+
+    class Meta:
+        verbose_name = _("venue")
+        verbose_name_plural = _("venues")
+        ordering = ["name"]
+        rules_permissions = {"add": is_organization_admin, "view": is_organization_admin, "change": is_organization_admin, "delete": is_organization_admin}
+
+    def save(self, *args, **kwargs) -> None:
+        super(Venue, self).save(*args, **kwargs)
+
+        # Links the games at this venue that were saved before it was created, their locations are matched like in `get_for_location`
+        names = models.Q(trimmed_location__iexact=self.name.strip())
+
+        if self.short_name.strip() != "":
+            names |= models.Q(trimmed_location__iexact=self.short_name.strip())
+
+        Game.objects.filter(venue=None).annotate(trimmed_location=Trim("location")).filter(names).update(venue=self, modified=timezone.now())
+
+    @classmethod
+    def get_for_location(cls, location: str) -> "Venue | None":
+        """Returns the existing venue whose name or short name matches `location` (case insensitive), None for unknown locations"""
+        location = location.strip()
+
+        if location == "":
+            return None
+
+        return cls.objects.filter(models.Q(name__iexact=location) | models.Q(short_name__iexact=location)).order_by("pk").first()
+
+
 class GameType(RulesModel):
     """Can hold different types of games"""
 
@@ -62,6 +112,7 @@ class Game(RulesModel):
     opponent = models.ForeignKey(Opponent, on_delete=models.CASCADE, verbose_name=_("opponent"), related_name="games", blank=True, null=True)
     date = models.DateTimeField()
     location = models.CharField(_("location"), max_length=250, default="Ice Skating Center Mechelen")
+    venue = models.ForeignKey(Venue, on_delete=models.SET_NULL, verbose_name=_("venue"), related_name="games", blank=True, null=True, editable=False)
     game_type = models.ForeignKey(GameType, on_delete=models.PROTECT, verbose_name=_("game type"), related_name="games")
 
     competition = models.ForeignKey("Competition", on_delete=models.SET_NULL, blank=True, null=True, verbose_name=_("competition"))
@@ -69,10 +120,16 @@ class Game(RulesModel):
     live = models.BooleanField(_("live"), default=False)
     score_team = models.IntegerField(_("score team"), default=0, blank=True, null=True)
     score_opponent = models.IntegerField(_("score opponent"), default=0, blank=True, null=True)
+    version = models.PositiveIntegerField(_("version"), default=0, help_text=_("Raised on every change through the rinkside API or a form, to detect conflicting updates"))
+    event_generation = models.PositiveIntegerField(
+        _("event generation"), default=1, editable=False, help_text=_("Raised whenever the timeline of the competition website was rewritten and events were changed or removed")
+    )
 
     created = models.DateTimeField(auto_now_add=True)
     modified = models.DateTimeField(auto_now=True)
 
+    tracker = FieldTracker(fields=["live", "score_team", "score_opponent", "location", "date"])
+
     objects = GameManager()
 
     def __str__(self):
@@ -82,6 +139,11 @@ class Game(RulesModel):
         verbose_name = _("game")
         verbose_name_plural = _("games")
         ordering = ["date"]
+        indexes = [
+            models.Index(fields=["season", "date"], name="game_season_date_idx"),
+            models.Index(fields=["date"], name="game_date_idx"),
+            models.Index(fields=["date"], condition=models.Q(live=True), name="game_live_idx"),
+        ]
         rules_permissions = {
             "add": is_team_admin | is_organization_admin,
             "view": is_admin,
@@ -90,28 +152,212 @@ class Game(RulesModel):
         }
 
     def save(self, *args, **kwargs) -> None:
-        self.season = Season.get_season(date=self.date.date())
+        self.season = Season.get_season(date=self.date)
 
-        return super(Game, self).save(*args, **kwargs)
+        if self.venue_id is None or self.tracker.has_changed("location"):
+            self.venue = Venue.get_for_location(self.location)
+
+            if kwargs.get("update_fields") is not None:
+                kwargs["update_fields"] = set(kwargs["update_fields"]) | {"venue"}
+
+        if not self._state.adding and kwargs.get("update_fields") is None:
+            self.version += 1
+
+        rescheduled = not self._state.adding and self.tracker.has_changed("date")
+        super(Game, self).save(*args, **kwargs)
+
+        # A postponed game is polled again from its new date on, also when polling had already stopped
+        if rescheduled:
+            PollSchedule.objects.filter(game=self).update(state=PollSchedule.StateChoices.UPCOMING, interval=0, next_poll=timezone.now())
+            self._state.fields_cache.pop("poll_schedule", None)
 
     @property
     @admin.display(description=_("Home game?"), boolean=True)
     def is_home_game(self) -> bool:
-        return self.location.lower() == "ice skating center mechelen" or self.location.lower() == "iscm"
+        return self.venue is not None and self.venue.is_home
 
     def update_game_information(self):
         if self.competition is not None:
-            module = importlib.import_module(self.competition.module)
-            competition = getattr(module, self.competition.name)
-
-            competition().update_game_information(game=self)
+            self.competition.get_provider().update_game_information(game=self)
 
 
 class Competition(models.Model):
     """A competition has a name with a specific URL to fetch data from. These are managed centrally."""
 
-    name = models.CharField(max_length=250)
-    module = models.CharField(max_length=250)
+    name = models.CharField(max_length=250, help_text=_("Name of the competition class, e.g. RBIHF"))
+    module = models.CharField(max_length=250, help_text=_("Module containing the competition class, e.g. activities.competition.hockey"))
+
+    def __str__(self):
+        return self.name
+
+    def clean(self) -> None:
+        from .competition.registry import InvalidCompetition, get_provider_class
+
+        try:
+            get_provider_class(self.module, self.name)
+        except InvalidCompetition as e:
+            raise ValidationError(str(e))
+
+        return super(Competition, self).clean()
+
+    def get_provider(self):
+        """Returns the (shared) instance of the class referenced by `module` and `name`"""
+        from .competition.registry import get_provider
+
+        return get_provider(self)
+
+
+class PollSchedule(models.Model):
+    """Keeps track of when the score updater should fetch a game again, based on the state of the game at its last update"""
+
+    class StateChoices(models.TextChoices):
+        UPCOMING = "UP", _("Upcoming")
+        LIVE = "LIVE", _("Live")
+        FINISHED = "FIN", _("Finished")
+        STOPPED = "STOP", _("Stopped")
+
+    game = models.OneToOneField(Game, on_delete=models.CASCADE, primary_key=True, related_name="poll_schedule", verbose_name=_("game"))
+    state = models.CharField(_("state"), max_length=4, choices=StateChoices.choices, default=StateChoices.UPCOMING)
+    interval = models.PositiveIntegerField(_("interval"), default=0, help_text=_("Number of seconds between the last and the next update"))
+    next_poll = models.DateTimeField(_("next poll"), blank=True, null=True, db_index=True, help_text=_("Games without a next poll are no longer updated"))
+    event_cursor = models.PositiveIntegerField(_("event cursor"), default=0, help_text=_("Number of timeline entries of the competition website already stored as game events"))
+    event_digest = models.CharField(_("event digest"), max_length=64, blank=True, help_text=_("Hash of the timeline entries already stored, to notice changes to earlier entries"))
+
+    modified = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return str(self.game)
+
+    class Meta:
+        verbose_name = _("poll schedule")
+        verbose_name_plural = _("poll schedules")
+        ordering = ["next_poll"]
+
+
+class GameEvent(models.Model):
+    """A goal, penalty or other event of a game, taken from the timeline of the competition website"""
+
+    class EventTypeChoices(models.TextChoices):
+        GOAL = "GOAL", _("Goal")
+        PENALTY = "PEN", _("Penalty")
+        OTHER = "OTHER", _("Other")
+
+    game = models.ForeignKey(Game, on_delete=models.CASCADE, related_name="events", verbose_name=_("game"))
+    sequence = models.PositiveIntegerField(_("sequence"), help_text=_("Position of the event in the timeline of the competition website"))
+    event_type = models.CharField(_("event type"), max_length=5, choices=EventTypeChoices.choices, default=EventTypeChoices.OTHER)
+    period = models.CharField(_("period"), max_length=20, blank=True)
+    time = models.CharField(_("time"), max_length=20, blank=True)
+    for_team = models.BooleanField(_("for team"), blank=True, null=True, help_text=_("Whether the event is for our team, empty if unknown"))
+    description = models.CharField(_("description"), max_length=250, blank=True)
+    data = models.JSONField(_("data"), default=dict, blank=True, help_text=_("The event as received from the competition website"))
+
+    created = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return "%s - %s %s" % (self.game, self.get_event_type_display(), self.time)
+
+    class Meta:
+        verbose_name = _("game event")
+        verbose_name_plural = _("game events")
+        ordering = ["game", "sequence"]
+        constraints = [models.UniqueConstraint(fields=["game", "sequence"], name="unique_game_event_sequence")]
+
+
+class CircuitBreakerState(models.Model):
+    """The state of the circuit breaker for a competition website, used by the score updater to stop polling a website that is down"""
+
+    class StateChoices(models.TextChoices):
+        CLOSED = "CLOSED", _("Closed")
+        OPEN = "OPEN", _("Open")
+        HALF_OPEN = "HALF", _("Half open")
+
+    host = models.CharField(_("host"), max_length=250, unique=True)
+    state = models.CharField(_("state"), max_length=6, choices=StateChoices.choices, default=StateChoices.CLOSED)
+    failures = models.PositiveIntegerField(_("consecutive failures"), default=0)
+    opened_at = models.DateTimeField(_("opened at"), blank=True, null=True)
+
+    modified = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return self.host
+
+    class Meta:
+        verbose_name = _("circuit breaker")
+        verbose_name_plural = _("circuit breakers")
+        ordering = ["host"]
+
+
+class UpdaterLock(models.Model):
+    """
+    A lock in the database making sure only one score updater runs at the same time, also when multiple servers share the database.
+
+    The lock expires automatically, so a crashed updater does not block the others forever.
+    """
+
+    name = models.CharField(_("name"), max_length=250, unique=True)
+    holder = models.CharField(_("holder"), max_length=250, blank=True)
+    expires_at = models.DateTimeField(_("expires at"))
 
     def __str__(self):
         return self.name
+
+    class Meta:
+        verbose_name = _("updater lock")
+        verbose_name_plural = _("updater locks")
+
+    @staticmethod
+    def get_holder_name() -> str:
+        """Returns a name identifying the current process on this server"""
+        return "{host}:{pid}:{token}".format(host=socket.gethostname(), pid=os.getpid(), token=uuid.uuid4().hex[:8])
+
+    @classmethod
+    def acquire(cls, holder: str, ttl: float, name: str = "update_scores") -> bool:
+        """
+        Tries to take (or extend) the lock for `ttl` seconds without waiting, returns whether `holder` holds the lock.
+
+        A single conditional update takes the lock, so only one process can succeed, even on different servers.
+        """
+        now = timezone.now()
+
+        cls.objects.get_or_create(name=name, defaults={"expires_at": now})
+
+        return (
+            cls.objects.filter(models.Q(holder="") | models.Q(holder=holder) | models.Q(expires_at__lt=now), name=name).update(
+                holder=holder, expires_at=now + datetime.timedelta(seconds=ttl)
+            )
+            == 1
+        )
+
+    @classmethod
+    def release(cls, holder: str, name: str = "update_scores") -> None:
+        cls.objects.filter(name=name, holder=holder).update(holder="", expires_at=timezone.now())
+
+
+class ScoreUpdateRun(models.Model):
+    """A ledger entry for every run of the score updater"""
+
+    holder = models.CharField(_("holder"), max_length=250, blank=True)
+    started = models.DateTimeField(_("started"), db_index=True)
+    finished = models.DateTimeField(_("finished"))
+    games_polled = models.PositiveIntegerField(_("games polled"), default=0)
+    games_changed = models.PositiveIntegerField(_("games changed"), default=0)
+    errors = models.PositiveIntegerField(_("errors"), default=0)
+    latency = models.JSONField(_("latency"), default=dict, blank=True, help_text=_("Median and maximum latency in milliseconds per competition"))
+
+    def __str__(self):
+        return _("Run {started}").format(started=self.started)
+
+    class Meta:
+        verbose_name = _("score update run")
+        verbose_name_plural = _("score update runs")
+        ordering = ["-started"]
+
+    @property
+    @admin.display(description=_("Duration"))
+    def duration(self) -> datetime.timedelta:
+        return self.finished - self.started
+
+    @classmethod
+    def prune(cls, days: int) -> None:
+        """Removes all runs older than `days` days"""
+        cls.objects.filter(started__lt=timezone.now() - datetime.timedelta(days=days)).delete()
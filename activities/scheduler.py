@@ -0,0 +1,85 @@
+import datetime
+
+from django.db.models import Q, QuerySet
+
+from .models import Game, PollSchedule
+
+# All intervals are in seconds
+LIVE_INTERVAL = 10
+UPCOMING_INTERVAL = 60
+FINISHED_INTERVAL = 30
+MAX_FINISHED_INTERVAL = 15 * 60
+
+# Games are picked up this long before their start time
+UPCOMING_WINDOW = datetime.timedelta(minutes=15)
+# Games that never went live are treated as upcoming (instead of finished) until this long after their start time, so games that face off late
+# still get their scores. The competition websites only report whether a game is live, a game that was live and no longer is has finished.
+# Matches the default window of get_candidate_games, later games are no longer candidates anyway.
+START_CUTOFF = datetime.timedelta(hours=3)
+
+
+def get_candidate_games(now: datetime.datetime, hours: int = 3) -> QuerySet:
+    """Returns all games that are live, are about to start or have started in the last `hours` hours, games that start later are skipped"""
+    # Live games as a subquery, so both sides of the OR can use an index (game_live_idx and game_date_idx)
+    live = Game.objects.filter(live=True).order_by().values("pk")
+
+    return Game.objects.filter(Q(pk__in=live) | Q(date__lte=now + UPCOMING_WINDOW, date__gte=now - datetime.timedelta(hours=hours)))
+
+
+def get_due_games(now: datetime.datetime, hours: int = 3) -> QuerySet:
+    """Returns the candidate games that were never polled or whose next poll time has passed, stopped games are never due"""
+    return get_candidate_games(now, hours=hours).filter(Q(poll_schedule=None) | Q(poll_schedule__next_poll__lte=now))
+
+
+def get_schedule(game: Game, now: datetime.datetime, failed: bool = False) -> PollSchedule:
+    """
+    Calculates the next poll time of `game` after it has been updated.
+
+    * live games are polled every `LIVE_INTERVAL` seconds
+    * games that did not go live yet are polled every `UPCOMING_INTERVAL` seconds, until `START_CUTOFF` after their start time
+    * finished games back off, starting at `FINISHED_INTERVAL` and doubling every poll, and stop once `MAX_FINISHED_INTERVAL` is exceeded
+
+    A failed update keeps the current state and retries after the current interval.
+    """
+    try:
+        schedule = game.poll_schedule
+    except PollSchedule.DoesNotExist:
+        schedule = PollSchedule(game=game, state=PollSchedule.StateChoices.UPCOMING, interval=UPCOMING_INTERVAL)
+
+    if failed:
+        schedule.interval = schedule.interval or UPCOMING_INTERVAL
+
+    elif game.live:
+        schedule.state = PollSchedule.StateChoices.LIVE
+        schedule.interval = LIVE_INTERVAL
+
+    elif schedule.state == PollSchedule.StateChoices.UPCOMING and now < game.date + START_CUTOFF:
+        schedule.interval = UPCOMING_INTERVAL
+
+    elif schedule.state == PollSchedule.StateChoices.FINISHED:
+        schedule.interval = schedule.interval * 2
+
+    else:
+        schedule.state = PollSchedule.StateChoices.FINISHED
+        schedule.interval = FINISHED_INTERVAL
+
+    if schedule.state == PollSchedule.StateChoices.FINISHED and schedule.interval > MAX_FINISHED_INTERVAL:
+        schedule.state = PollSchedule.StateChoices.STOPPED
+
+    if schedule.state == PollSchedule.StateChoices.STOPPED:
+        schedule.next_poll = None
+    else:
+        schedule.next_poll = now + datetime.timedelta(seconds=schedule.interval)
+
+    schedule.modified = now
+    game.poll_schedule = schedule
+
+    return schedule
+
+
+def save_schedules(schedules: list[PollSchedule]) -> None:
+    """Stores all schedules with a single query"""
+    if len(schedules) > 0:
+        PollSchedule.objects.bulk_create(
+            schedules, update_conflicts=True, unique_fields=["game"], update_fields=["state", "interval", "next_poll", "event_cursor", "event_digest", "modified"]
+        )
@@ -0,0 +1,228 @@
+"""
+A live scoreboard shared with all web workers through a memory-mapped file.
+
+The score updater publishes the state of all live and recent games after every run with `publish_scoreboard`, web workers read it with
+`read_scoreboard` without querying the database. The file is never changed in place, every snapshot is written to a temporary file that replaces
+the previous one, so readers always see a complete snapshot and only map a new file when it was replaced.
+
+File layout (little endian):
+
+* header: magic `CMSB`, format, snapshot version, publish time (unix timestamp), number of games
+* one record per game: game ID, team ID, live flag, score team and score opponent (-1 when unknown)
+"""
+
+import datetime
+import fcntl
+import mmap
+import os
+import struct
+import tempfile
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+
+from django.conf import settings
+from django.utils import timezone
+
+from .scheduler import get_candidate_games
+
+MAGIC = b"CMSB"
+FORMAT = 1
+HEADER = struct.Struct("<4sHxxQdI")
+RECORD = struct.Struct("<IIBxhh")
+
+_reader_lock = threading.Lock()
+_reader: "ScoreboardReader | None" = None
+
+
+@dataclass(frozen=True)
+class ScoreboardGame:
+    id: int
+    team: int
+    live: bool
+    score_team: int | None
+    score_opponent: int | None
+
+
+@dataclass(frozen=True)
+class Scoreboard:
+    version: int
+    published: datetime.datetime
+    games: dict[int, ScoreboardGame]
+
+    @property
+    def age(self) -> float:
+        return (timezone.now() - self.published).total_seconds()
+
+
+def get_scoreboard_path() -> Path:
+    return Path(settings.CLUB_SCOREBOARD_PATH)
+
+
+def pack_scoreboard(version: int, published: datetime.datetime, games: list[ScoreboardGame]) -> bytes:
+    return HEADER.pack(MAGIC, FORMAT, version, published.timestamp(), len(games)) + b"".join(
+        RECORD.pack(
+            game.id,
+            game.team,
+            game.live,
+            -1 if game.score_team is None else game.score_team,
+            -1 if game.score_opponent is None else game.score_opponent,
+        )
+        for game in games
+    )
+
+
+def unpack_header(data: bytes | mmap.mmap) -> tuple[int, float, int] | None:
+    """Returns the version, publish time and number of games of the scoreboard in `data`, or None if it is not a scoreboard of a known format"""
+    if len(data) < HEADER.size:
+        return None
+
+    magic, format, version, published, count = HEADER.unpack_from(data)
+
+    if magic != MAGIC or format != FORMAT:
+        return None
+
+    return version, published, count
+
+
+def unpack_scoreboard(data: bytes | mmap.mmap) -> Scoreboard | None:
+    """Returns the scoreboard stored in `data`, or None if it is not a complete scoreboard of a known format"""
+    header = unpack_header(data)
+
+    if header is None:
+        return None
+
+    version, published, count = header
+
+    if len(data) < HEADER.size + count * RECORD.size:
+        return None
+
+    games = {}
+
+    for game_id, team_id, live, score_team, score_opponent in RECORD.iter_unpack(data[HEADER.size : HEADER.size + count * RECORD.size]):
+        games[game_id] = ScoreboardGame(
+            id=game_id,
+            team=team_id,
+            live=bool(live),
+            score_team=None if score_team == -1 else score_team,
+            score_opponent=None if score_opponent == -1 else score_opponent,
+        )
+
+    return Scoreboard(version=version, published=datetime.datetime.fromtimestamp(published, tz=datetime.timezone.utc), games=games)
+
+
+def get_scoreboard_games(hours: int = 3) -> list[ScoreboardGame]:
+    """Returns all games that are live, about to start or started in the last `hours` hours, as loaded from the database"""
+    return [
+        ScoreboardGame(id=game_id, team=team_id, live=live, score_team=score_team, score_opponent=score_opponent)
+        for game_id, team_id, live, score_team, score_opponent in get_candidate_games(timezone.now(), hours=hours)
+        .order_by("date", "pk")
+        .values_list("pk", "team_id", "live", "score_team", "score_opponent")
+    ]
+
+
+def publish_scoreboard(games: list[ScoreboardGame] | None = None, path: str | Path | None = None) -> int:
+    """
+    Writes a new snapshot of `games` (by default all candidate games of the score updater) and returns its version.
+
+    The version is one higher than the version of the current snapshot. Both the score updater and the web workers (rinkside API) publish, a lock file
+    next to the scoreboard makes sure they do so one at a time, so every snapshot gets its own version.
+    """
+    path = Path(path or get_scoreboard_path())
+
+    with open(path.parent / (".%s.lock" % path.name), "a") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+
+        # Loaded while holding the lock, so a later snapshot never holds older data
+        if games is None:
+            games = get_scoreboard_games()
+
+        try:
+            with open(path, "rb") as scoreboard_file:
+                header = unpack_header(scoreboard_file.read(HEADER.size))
+        except FileNotFoundError:
+            header = None
+
+        version = header[0] + 1 if header is not None else 1
+        descriptor, temporary_path = tempfile.mkstemp(dir=path.parent, prefix=".%s." % path.name)
+
+        try:
+            with os.fdopen(descriptor, "wb") as temporary_file:
+                temporary_file.write(pack_scoreboard(version, timezone.now(), games))
+
+            os.chmod(temporary_path, 0o644)
+            os.replace(temporary_path, path)
+
+        except BaseException:
+            os.unlink(temporary_path)
+            raise
+
+    return version
+
+
+class ScoreboardReader:
+    """
+    Reads the scoreboard at `path` through a memory map, the file is only mapped and parsed again after it was replaced by a new snapshot.
+
+    Checking for a new snapshot costs a single `stat` call, a reader is safe to share between threads.
+    """
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self.lock = threading.Lock()
+        self.file_id: tuple[int, int] | None = None
+        self.map: mmap.mmap | None = None
+        self.scoreboard: Scoreboard | None = None
+
+    def read(self) -> Scoreboard | None:
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+
+        with self.lock:
+            if (stat.st_ino, stat.st_mtime_ns) != self.file_id:
+                self.close()
+
+                with open(self.path, "rb") as scoreboard_file:
+                    # The file may have been replaced again since the stat call, identify it by what was actually opened
+                    stat = os.fstat(scoreboard_file.fileno())
+
+                    if stat.st_size == 0:
+                        return None
+
+                    self.map = mmap.mmap(scoreboard_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+                self.file_id = (stat.st_ino, stat.st_mtime_ns)
+                self.scoreboard = unpack_scoreboard(self.map)
+
+            return self.scoreboard
+
+    def close(self) -> None:
+        if self.map is not None:
+            self.map.close()
+
+        self.map = None
+        self.file_id = None
+        self.scoreboard = None
+
+
+def read_scoreboard(max_age: float | None = None) -> Scoreboard | None:
+    """Returns the current scoreboard, or None if there is none, it cannot be read or it is older than `max_age` seconds"""
+    global _reader
+
+    with _reader_lock:
+        if _reader is None or _reader.path != get_scoreboard_path():
+            _reader = ScoreboardReader(get_scoreboard_path())
+
+        reader = _reader
+
+    try:
+        scoreboard = reader.read()
+    except (OSError, ValueError):
+        return None
+
+    if scoreboard is None or (max_age is not None and scoreboard.age > max_age):
+        return None
+
+    return scoreboard
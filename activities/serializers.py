@@ -3,7 +3,7 @@ from rest_framework import serializers
 
 from teams.serializers import TeamNameSerializer
 
-from .models import Game, Opponent
+from .models import Game, GameEvent, Opponent
 
 
 class OpponentNameSerializer(serializers.ModelSerializer):
@@ -14,7 +14,7 @@ class OpponentNameSerializer(serializers.ModelSerializer):
         fields = ["name", "logo"]
 
     def get_logo(self, obj: Opponent) -> dict[str, str | int]:
-        return {"url": obj.logo.url, "width": obj.logo.width, "height": obj.logo.height}
+        return {"url": obj.logo.url, "width": obj.logo_width, "height": obj.logo_height}
 
 
 class GameSerializer(serializers.ModelSerializer):
@@ -34,5 +34,36 @@ class GameSerializer(serializers.ModelSerializer):
     def get_passed(self, obj: Game) -> bool:
         return obj.date <= timezone.now()
 
-    def is_home_game(self, obj: Game) -> bool:
+    def get_is_home_game(self, obj: Game) -> bool:
         return obj.is_home_game
+
+
+class GameEventSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = GameEvent
+        fields = ["id", "sequence", "event_type", "period", "time", "for_team", "description"]
+
+
+class RinksideGameSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Game
+        fields = ["id", "live", "score_team", "score_opponent", "version"]
+
+
+class RinksideScoreSerializer(serializers.Serializer):
+    version = serializers.IntegerField(min_value=0)
+    side = serializers.ChoiceField(choices=["team", "opponent"])
+    delta = serializers.ChoiceField(choices=[1, -1], default=1)
+
+
+class RinksideLiveSerializer(serializers.Serializer):
+    version = serializers.IntegerField(min_value=0)
+    live = serializers.BooleanField()
+
+
+class RinksideGoalSerializer(serializers.Serializer):
+    version = serializers.IntegerField(min_value=0)
+    side = serializers.ChoiceField(choices=["team", "opponent"])
+    period = serializers.CharField(max_length=20, required=False, allow_blank=True, default="")
+    time = serializers.CharField(max_length=20, required=False, allow_blank=True, default="")
+    description = serializers.CharField(max_length=250, required=False, allow_blank=True, default="")
@@ -0,0 +1,14 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import Signal, receiver
+
+from .competition.registry import clear_provider
+from .models import Competition
+
+# Sent by the score updater after the scores of one or more games have been stored, `games` holds the changed games.
+# Games are stored with a bulk update, so no post_save signal is sent for them.
+scores_changed = Signal()
+
+
+@receiver([post_save, post_delete], sender=Competition)
+def reset_provider(sender, instance: Competition, **kwargs) -> None:
+    clear_provider(instance.pk)
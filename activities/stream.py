@@ -0,0 +1,215 @@
+"""
+Pushes live score changes to browsers with server-sent events.
+
+Every ASGI worker runs a single `ScoreBroadcaster` task that watches the live scoreboard (see `activities.scoreboard`) and hands the games that changed
+to all subscribed connections. An idle connection costs a coroutine and a small queue, no thread and no database query, so a single worker can hold
+thousands of them. The broadcaster only runs while there are subscribers.
+
+`GameStreamApplication` serves the stream straight from `clubmanager.asgi`, without passing through the (partly synchronous) middleware of the site.
+"""
+
+import asyncio
+import json
+from urllib.parse import parse_qs
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+
+from teams.models import Team
+
+from .scoreboard import Scoreboard, ScoreboardGame, read_scoreboard
+
+# Seconds between two checks for a new scoreboard and between two keep-alive comments on an idle connection
+POLL_INTERVAL = 0.5
+KEEPALIVE_INTERVAL = 15
+
+# Subscribers that fall this many updates behind are sent a full snapshot instead of the changes they missed
+QUEUE_SIZE = 32
+
+
+def game_data(game: ScoreboardGame) -> dict:
+    return {"id": game.id, "team": game.team, "live": game.live, "score_team": game.score_team, "score_opponent": game.score_opponent}
+
+
+def format_event(event: str, data, id: int | None = None) -> bytes:
+    message = "event: %s\n" % event
+
+    if id is not None:
+        message += "id: %d\n" % id
+
+    return (message + "data: %s\n\n" % json.dumps(data, separators=(",", ":"))).encode()
+
+
+class Subscription:
+    """The queue of scoreboard changes for a single connection, only games of `teams` are sent if given"""
+
+    def __init__(self, teams: set[int] | None = None):
+        self.teams = teams
+        self.queue: asyncio.Queue[tuple[int, list[ScoreboardGame]] | None] = asyncio.Queue(maxsize=QUEUE_SIZE)
+
+    def wants(self, game: ScoreboardGame) -> bool:
+        return self.teams is None or game.team in self.teams
+
+    def put(self, version: int, games: list[ScoreboardGame]) -> None:
+        games = [game for game in games if self.wants(game)]
+
+        if len(games) == 0:
+            return
+
+        try:
+            self.queue.put_nowait((version, games))
+
+        except asyncio.QueueFull:
+            # The client does not keep up, drop what is queued and ask for a full snapshot instead
+            while not self.queue.empty():
+                self.queue.get_nowait()
+
+            self.queue.put_nowait(None)
+
+
+class ScoreBroadcaster:
+    def __init__(self):
+        self.subscriptions: set[Subscription] = set()
+        self.scoreboard: Scoreboard | None = None
+        self.task: asyncio.Task | None = None
+
+    def subscribe(self, teams: set[int] | None = None) -> Subscription:
+        subscription = Subscription(teams)
+        self.subscriptions.add(subscription)
+
+        if self.task is None or self.task.done() or self.task.get_loop() is not asyncio.get_running_loop():
+            self.scoreboard = read_scoreboard()
+            self.task = asyncio.get_running_loop().create_task(self.run())
+
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        self.subscriptions.discard(subscription)
+
+    async def run(self) -> None:
+        while len(self.subscriptions) > 0:
+            await asyncio.sleep(POLL_INTERVAL)
+
+            scoreboard = read_scoreboard()
+
+            if scoreboard is None or (self.scoreboard is not None and scoreboard.version == self.scoreboard.version):
+                continue
+
+            previous = self.scoreboard.games if self.scoreboard is not None else {}
+            changed = [game for game_id, game in scoreboard.games.items() if previous.get(game_id) != game]
+            self.scoreboard = scoreboard
+
+            for subscription in list(self.subscriptions):
+                subscription.put(scoreboard.version, changed)
+
+    def snapshot(self, subscription: Subscription) -> tuple[int | None, list[ScoreboardGame]]:
+        if self.scoreboard is None:
+            return None, []
+
+        return self.scoreboard.version, [game for game in self.scoreboard.games.values() if subscription.wants(game)]
+
+    async def stream(self, teams: set[int] | None = None):
+        """Yields the server-sent events for a single connection: a snapshot of all games, followed by every game that changes"""
+        subscription = self.subscribe(teams)
+
+        try:
+            version, games = self.snapshot(subscription)
+            yield format_event("snapshot", [game_data(game) for game in games], id=version)
+
+            while True:
+                try:
+                    update = await asyncio.wait_for(subscription.queue.get(), timeout=KEEPALIVE_INTERVAL)
+                except asyncio.TimeoutError:
+                    yield b": keep-alive\n\n"
+                    continue
+
+                if update is None:
+                    version, games = self.snapshot(subscription)
+                    yield format_event("snapshot", [game_data(game) for game in games], id=version)
+                    continue
+
+                version, games = update
+
+                for game in games:
+                    yield format_event("game", game_data(game), id=version)
+
+        finally:
+            self.unsubscribe(subscription)
+
+
+broadcaster = ScoreBroadcaster()
+
+
+def get_team_ids(slugs: list[str]) -> set[int]:
+    try:
+        return set(Team.objects.filter(slug__in=slugs).values_list("pk", flat=True))
+    finally:
+        close_old_connections()
+
+
+class GameStreamApplication:
+    """
+    An ASGI application serving the live score stream at `path`, all other requests are passed on to `application`.
+
+    Behaves like `activities.views.game_stream`, apart from the site middleware only the CORS headers are added.
+    """
+
+    path = "/api/games/stream/"
+
+    def __init__(self, application):
+        self.application = application
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http" or scope["path"] != self.path:
+            return await self.application(scope, receive, send)
+
+        if scope["method"] not in ["GET", "HEAD"]:
+            return await self.send_error(send, 405, b"Method not allowed")
+
+        teams = None
+        slugs = parse_qs(scope["query_string"].decode("latin-1")).get("team", [])
+
+        if len(slugs) > 0:
+            teams = await sync_to_async(get_team_ids)(slugs)
+
+            if len(teams) == 0:
+                return await self.send_error(send, 404, b"No team found")
+
+        await send({"type": "http.response.start", "status": 200, "headers": self.get_headers(scope)})
+
+        if scope["method"] == "HEAD":
+            return await send({"type": "http.response.body", "body": b""})
+
+        events = broadcaster.stream(teams)
+        sender = asyncio.ensure_future(self.send_events(events, send))
+        disconnect = asyncio.ensure_future(self.wait_for_disconnect(receive))
+
+        try:
+            await asyncio.wait([sender, disconnect], return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            sender.cancel()
+            disconnect.cancel()
+            await asyncio.gather(sender, disconnect, return_exceptions=True)
+            await events.aclose()
+
+    def get_headers(self, scope) -> list[tuple[bytes, bytes]]:
+        headers = [(b"content-type", b"text/event-stream"), (b"cache-control", b"no-cache"), (b"x-accel-buffering", b"no")]
+        origin = dict(scope["headers"]).get(b"origin", b"").decode("latin-1")
+
+        if origin and (getattr(settings, "CORS_ALLOW_ALL_ORIGINS", False) or origin in settings.CORS_ALLOWED_ORIGINS):
+            headers += [(b"access-control-allow-origin", origin.encode("latin-1")), (b"vary", b"Origin")]
+
+        return headers
+
+    async def send_events(self, events, send) -> None:
+        async for event in events:
+            await send({"type": "http.response.body", "body": event, "more_body": True})
+
+    async def wait_for_disconnect(self, receive) -> None:
+        while (await receive())["type"] != "http.disconnect":
+            pass
+
+    async def send_error(self, send, status: int, body: bytes) -> None:
+        await send({"type": "http.response.start", "status": status, "headers": [(b"content-type", b"text/plain")]})
+        await send({"type": "http.response.body", "body": body})
@@ -1,3 +1,484 @@
-from django.test import TestCase
+import asyncio
+import datetime
+import json
+import os
+import tempfile
+import time
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from members.models import Member
+from teams.models import Season, Team, TeamMembership, TeamRole
+
+from .competition.base import CompetitionBaseClass, GameInformation
+from .competition.breaker import CircuitBreaker, get_breaker, load_breakers, save_breakers
+from .competition.registry import clear_provider
+from .competition.stub import ReplayServer
+from .models import CircuitBreakerState, Competition, Game, GameEvent, GameType, PollSchedule, ScoreUpdateRun, UpdaterLock, Venue
+from .scoreboard import ScoreboardGame, publish_scoreboard, read_scoreboard
+from .stream import GameStreamApplication
+from .scheduler import FINISHED_INTERVAL, LIVE_INTERVAL, MAX_FINISHED_INTERVAL, START_CUTOFF, UPCOMING_INTERVAL, get_due_games, get_schedule, save_schedules
+from .updater import get_games_to_update, update_games
+
+
+class FakeCompetition(CompetitionBaseClass):
+    responses = {}
+    delay = 0
+
+    def fetch_game_information(self, game: Game) -> GameInformation:
+        time.sleep(self.delay)
+        response = self.responses[game.game_id]
+
+        if isinstance(response, Exception):
+            raise response
+
+        return response
+
+
+class UpdateScoresTest(TestCase):
+    def setUp(self):
+        scoreboard_directory = tempfile.TemporaryDirectory()
+        self.addCleanup(scoreboard_directory.cleanup)
+        self.enterContext(override_settings(CLUB_SCOREBOARD_PATH=os.path.join(scoreboard_directory.name, "scoreboard.bin")))
+
+        self.season = Season.get_season(date=timezone.now().date())
+        self.team = Team.objects.create(name="Team")
+        self.game_type = GameType.objects.get_or_create(name="Competition Game")[0]
+        self.competition = Competition.objects.create(name="FakeCompetition", module="activities.tests")
+
+    def create_game(self, game_id: str, **kwargs) -> Game:
+        kwargs.setdefault("date", timezone.now() - datetime.timedelta(minutes=30))
+        kwargs.setdefault("competition", self.competition)
+
+        return Game.objects.create(team=self.team, game_type=self.game_type, game_id=game_id, **kwargs)
+
+    def test_games_are_updated(self):
+        home_game = self.create_game("1")
+        away_game = self.create_game("2", location="Elsewhere")
+        FakeCompetition.responses = {"1": {"live": True, "scoreA": 3, "scoreB": 1}, "2": {"live": False, "scoreA": 3, "scoreB": 1}}
+
+        summary = update_games(list(get_games_to_update()), workers=2)
+
+        self.assertEqual(len(summary.updated), 2)
+        home_game.refresh_from_db()
+        away_game.refresh_from_db()
+        self.assertEqual((home_game.live, home_game.score_team, home_game.score_opponent), (True, 3, 1))
+        self.assertEqual((away_game.live, away_game.score_team, away_game.score_opponent), (False, 1, 3))
+
+    def test_unchanged_games_are_not_written(self):
+        game = self.create_game("1", live=True, score_team=1, score_opponent=0)
+        modified = game.modified
+        FakeCompetition.responses = {"1": {"live": True, "scoreA": 1, "scoreB": 0}}
+
+        summary = update_games(list(get_games_to_update()))
+
+        self.assertEqual((len(summary.updated), len(summary.changed)), (1, 0))
+        game.refresh_from_db()
+        self.assertEqual(game.modified, modified)
+
+    def test_partial_information_and_errors(self):
+        live_only = self.create_game("1", score_team=2, score_opponent=2)
+        self.create_game("2")
+        FakeCompetition.responses = {"1": {"live": True}, "2": ConnectionError("unreachable")}
+
+        summary = update_games(list(get_games_to_update()))
+
+        self.assertEqual(len(summary.updated), 1)
+        self.assertEqual(summary.failed[0].error, "unreachable")
+        live_only.refresh_from_db()
+        self.assertEqual((live_only.live, live_only.score_team, live_only.score_opponent), (True, 2, 2))
+
+    def test_deadline(self):
+        self.create_game("1")
+        FakeCompetition.responses = {"1": {"live": True}}
+        FakeCompetition.delay = 0.5
+
+        try:
+            summary = update_games(list(get_games_to_update()), deadline=0.1)
+        finally:
+            FakeCompetition.delay = 0
+
+        self.assertEqual(summary.timed_out, 1)
+        self.assertEqual(len(summary.updated), 0)
+
+    def test_invalid_competition(self):
+        competition = Competition(name="Missing", module="activities.tests")
+
+        with self.assertRaises(ValidationError):
+            competition.full_clean()
+
+        competition.save()
+        self.create_game("1")
+        self.create_game("2", competition=competition)
+        FakeCompetition.responses = {"1": {"live": True}}
+
+        summary = update_games(list(get_games_to_update()))
+
+        self.assertEqual(len(summary.updated), 1)
+        self.assertIn("not a competition class", summary.failed[0].error)
+
+    def test_poll_schedule(self):
+        live_game = self.create_game("1")
+        self.create_game("2", date=timezone.now() + datetime.timedelta(days=1))
+        FakeCompetition.responses = {"1": {"live": True, "scoreA": 0, "scoreB": 0}}
+
+        self.assertEqual(list(get_games_to_update()), [live_game])
+        update_games(list(get_games_to_update()))
+
+        schedule = PollSchedule.objects.get(game=live_game)
+        self.assertEqual((schedule.state, schedule.interval), (PollSchedule.StateChoices.LIVE, LIVE_INTERVAL))
+        self.assertEqual(list(get_games_to_update()), [])
+        self.assertEqual(list(get_games_to_update(due_only=False)), [live_game])
+
+    def test_finished_games_back_off_and_stop(self):
+        game = self.create_game("1", live=True)
+        now = timezone.now()
+        get_schedule(game, now)
+
+        game.live = False
+        intervals = []
+
+        while game.poll_schedule.state != PollSchedule.StateChoices.STOPPED:
+            intervals.append(get_schedule(game, now).interval)
+
+        self.assertEqual(intervals[0], FINISHED_INTERVAL)
+        self.assertTrue(all(later == earlier * 2 for earlier, later in zip(intervals, intervals[1:])))
+        self.assertGreater(intervals[-1], MAX_FINISHED_INTERVAL)
+        self.assertIsNone(game.poll_schedule.next_poll)
+
+    def test_rescheduled_games_are_polled_again(self):
+        game = self.create_game("1", live=True)
+        now = timezone.now()
+        get_schedule(game, now)
+        game.live = False
+
+        while game.poll_schedule.state != PollSchedule.StateChoices.STOPPED:
+            get_schedule(game, now)
+
+        save_schedules([game.poll_schedule])
+        self.assertEqual(list(get_due_games(now)), [])
+
+        # Postponed, it now starts within the upcoming window
+        game.date = game.date + datetime.timedelta(minutes=40)
+        game.save()
+
+        self.assertEqual(list(get_due_games(timezone.now())), [game])
+        self.assertEqual(PollSchedule.objects.get(game=game).state, PollSchedule.StateChoices.UPCOMING)
+
+    def test_late_start(self):
+        game = self.create_game("1", date=timezone.now() - datetime.timedelta(minutes=45))
+        now = timezone.now()
+
+        # Not live 45 minutes after the scheduled start, the face-off is late
+        for minutes in range(0, 60, 10):
+            schedule = get_schedule(game, now + datetime.timedelta(minutes=minutes))
+            self.assertEqual((schedule.state, schedule.interval), (PollSchedule.StateChoices.UPCOMING, UPCOMING_INTERVAL))
+
+        game.live = True
+        self.assertEqual(get_schedule(game, now + datetime.timedelta(hours=1)).state, PollSchedule.StateChoices.LIVE)
+
+        # A game that never goes live is given up after the cutoff
+        other_game = self.create_game("2", date=now - START_CUTOFF)
+        self.assertEqual(get_schedule(other_game, now).state, PollSchedule.StateChoices.FINISHED)
+
+    def test_hockey_providers_against_replay_server(self):
+        fixtures = {
+            "time.php": {"1": [{"status": 200, "body": {"live": True, "scoreA": 2, "scoreB": 1}}]},
+            "timeline.php": {"2": [{"status": 200, "body": {"live": 1}}]},
+            "score.php": {"2": [{"status": 200, "body": {"scoreA": 4, "scoreB": 5}}]},
+        }
+        rbihf = Competition.objects.create(name="RBIHF", module="activities.competition.hockey")
+        cehl = Competition.objects.create(name="CEHL", module="activities.competition.hockey")
+        rbihf_game = self.create_game("1", competition=rbihf)
+        cehl_game = self.create_game("2", competition=cehl, location="Elsewhere")
+        # The providers are shared by the whole process, later tests should not inherit the replay server
+        for competition in [rbihf, cehl]:
+            self.addCleanup(clear_provider, competition.pk)
+
+        with ReplayServer(fixtures=fixtures) as server:
+            rbihf.get_provider().url = server.url + "modules/league/ajax/time.php"
+            cehl.get_provider().url = server.url + "ajax/"
+
+            summary = update_games(list(get_games_to_update()))
+
+        self.assertEqual(len(summary.changed), 2)
+        rbihf_game.refresh_from_db()
+        cehl_game.refresh_from_db()
+        self.assertEqual((rbihf_game.live, rbihf_game.score_team, rbihf_game.score_opponent), (True, 2, 1))
+        self.assertEqual((cehl_game.live, cehl_game.score_team, cehl_game.score_opponent), (True, 5, 4))
+
+    def test_timeline_events_are_ingested_incrementally(self):
+        goal = {"type": "goal", "period": 1, "time": "05:12", "team": "A", "player": "Player 9"}
+        penalty = {"type": "penalty", "period": 2, "time": "21:40", "team": "B", "player": "Player 4"}
+        timelines = [[goal], [goal, penalty], [goal, penalty], [penalty]]
+        fixtures = {"timeline.php": {"1": [{"status": 200, "body": {"live": 1, "timeline": timeline}} for timeline in timelines]}}
+        cehl = Competition.objects.create(name="CEHL", module="activities.competition.hockey")
+        game = self.create_game("1", competition=cehl, location="Elsewhere")
+
+        self.addCleanup(clear_provider, cehl.pk)
+
+        with ReplayServer(fixtures=fixtures) as server:
+            cehl.get_provider().url = server.url + "ajax/"
+
+            summaries = [update_games(list(get_games_to_update(due_only=False))) for timeline in timelines[:3]]
+            self.assertEqual([summary.events for summary in summaries], [1, 1, 0])
+            self.assertEqual(PollSchedule.objects.get(game=game).event_cursor, 2)
+
+            events = list(GameEvent.objects.filter(game=game))
+            self.assertEqual([(event.sequence, event.event_type, event.for_team) for event in events], [(1, "GOAL", False), (2, "PEN", True)])
+
+            response = self.client.get("/api/games/%d/events/" % game.pk, {"since": events[0].id, "generation": 1})
+            self.assertEqual([event["sequence"] for event in response.json()["events"]], [2])
+            self.assertEqual((response.json()["cursor"], response.json()["reset"]), (events[1].id, False))
+
+            # The goal was disallowed: the event keeps its id, the client learns about the rewrite from the generation
+            update_games(list(get_games_to_update(due_only=False)))
+            self.assertEqual(list(GameEvent.objects.filter(game=game).values_list("id", "sequence", "event_type")), [(events[0].id, 1, "PEN")])
+
+            data = self.client.get("/api/games/%d/events/" % game.pk, {"since": events[1].id, "generation": 1}).json()
+            self.assertEqual((data["generation"], data["reset"]), (2, True))
+            self.assertEqual([event["event_type"] for event in data["events"]], ["PEN"])
+
+            response = self.client.get("/api/games/%d/events/" % game.pk, {"limit": "all"})
+            self.assertEqual(response.json(), {"limit": "limit should be an integer"})
+
+    def test_changed_timeline_entries_reset_the_events(self):
+        goal = {"type": "goal", "period": 1, "time": "05:12", "team": "A", "player": "Player 9"}
+        penalty = {"type": "penalty", "period": 2, "time": "21:40", "team": "B", "player": "Player 4"}
+        late_goal = {"type": "goal", "period": 1, "time": "02:03", "team": "B", "player": "Player 7"}
+        timelines = [[goal, penalty], [late_goal, goal, penalty]]
+        fixtures = {"timeline.php": {"1": [{"status": 200, "body": {"live": 1, "timeline": timeline}} for timeline in timelines]}}
+        cehl = Competition.objects.create(name="CEHL", module="activities.competition.hockey")
+        game = self.create_game("1", competition=cehl, location="Elsewhere")
+
+        self.addCleanup(clear_provider, cehl.pk)
+
+        with ReplayServer(fixtures=fixtures) as server:
+            cehl.get_provider().url = server.url + "ajax/"
+
+            for timeline in timelines:
+                update_games(list(get_games_to_update(due_only=False)))
+
+        # An entry inserted before the stored ones renumbers them, all events are written again in a new generation
+        game.refresh_from_db()
+        self.assertEqual(game.event_generation, 2)
+        self.assertEqual(list(GameEvent.objects.filter(game=game).values_list("sequence", "time")), [(1, "02:03"), (2, "05:12"), (3, "21:40")])
+
+    def test_live_scoreboard(self):
+        game = self.create_game("1")
+        FakeCompetition.responses = {"1": {"live": True, "scoreA": 3, "scoreB": 1}}
+
+        response = self.client.get("/api/games/live/")
+        self.assertEqual(response.json()["source"], "database")
+        self.assertEqual(response.json()["games"], [{"id": game.pk, "team": self.team.pk, "live": False, "score_team": 0, "score_opponent": 0}])
+
+        update_games(list(get_games_to_update()))
+        update_games(list(get_games_to_update(due_only=False)))
+        self.assertEqual(read_scoreboard().version, 2)
+
+        with self.assertNumQueries(0):
+            response = self.client.get("/api/games/live/")
+
+        self.assertEqual((response.json()["source"], response.json()["version"]), ("scoreboard", 2))
+        self.assertEqual(response.json()["games"], [{"id": game.pk, "team": self.team.pk, "live": True, "score_team": 3, "score_opponent": 1}])
+
+        # Still current until the next run of the updater is overdue
+        with mock.patch("django.utils.timezone.now", return_value=timezone.now() + datetime.timedelta(seconds=settings.CLUB_SCORES_UPDATE_INTERVAL + 60)):
+            self.assertEqual(self.client.get("/api/games/live/").json()["source"], "scoreboard")
+
+        with override_settings(CLUB_SCOREBOARD_MAX_AGE=-1):
+            self.assertEqual(self.client.get("/api/games/live/").json()["source"], "database")
+
+    def test_runs_are_recorded(self):
+        self.create_game("1")
+        self.create_game("2")
+        FakeCompetition.responses = {"1": {"live": True}, "2": {}}
+
+        update_games(list(get_games_to_update()), holder="test")
+
+        run = ScoreUpdateRun.objects.get()
+        self.assertEqual((run.holder, run.games_polled, run.games_changed, run.errors), ("test", 2, 1, 1))
+        self.assertIn("FakeCompetition", run.latency)
+
+    def test_updater_lock(self):
+        self.assertTrue(UpdaterLock.acquire("first", ttl=60))
+        self.assertFalse(UpdaterLock.acquire("second", ttl=60))
+        self.assertTrue(UpdaterLock.acquire("first", ttl=60))
+
+        UpdaterLock.release("first")
+        self.assertTrue(UpdaterLock.acquire("second", ttl=-1))
+        self.assertTrue(UpdaterLock.acquire("first", ttl=60))
+
+
+class CircuitBreakerTest(TestCase):
+    def test_breaker_opens_and_recovers(self):
+        breaker = CircuitBreaker("breaker.test", failure_threshold=2, reset_timeout=0)
+
+        breaker.record_failure()
+        self.assertTrue(breaker.allow_request())
+        breaker.record_failure()
+        self.assertEqual(breaker.state, CircuitBreakerState.StateChoices.OPEN)
+
+        # The reset timeout passed, a single probe is let through
+        self.assertTrue(breaker.allow_request())
+        self.assertFalse(breaker.allow_request())
+        breaker.record_success()
+        self.assertEqual(breaker.state, CircuitBreakerState.StateChoices.CLOSED)
+
+    def test_breaker_state_is_stored(self):
+        get_breaker("stored.test", failure_threshold=1).record_failure()
+        save_breakers()
+
+        restored = CircuitBreaker("stored.test")
+        load_breakers([restored])
+
+        self.assertEqual(CircuitBreakerState.objects.get(host="stored.test").state, CircuitBreakerState.StateChoices.OPEN)
+        self.assertEqual((restored.state, restored.failures), (CircuitBreakerState.StateChoices.OPEN, 1))
+        self.assertFalse(restored.allow_request())
+
+
+class GameStreamTest(TestCase):
+    def setUp(self):
+        scoreboard_directory = tempfile.TemporaryDirectory()
+        self.addCleanup(scoreboard_directory.cleanup)
+        self.enterContext(override_settings(CLUB_SCOREBOARD_PATH=os.path.join(scoreboard_directory.name, "scoreboard.bin")))
+        self.enterContext(mock.patch("activities.stream.POLL_INTERVAL", 0.01))
+
+        self.team = Team.objects.create(name="Team")
+        self.other_team = Team.objects.create(name="Other Team")
+
+    def publish(self, score: int) -> None:
+        publish_scoreboard(
+            [
+                ScoreboardGame(id=1, team=self.team.pk, live=True, score_team=score, score_opponent=0),
+                ScoreboardGame(id=2, team=self.other_team.pk, live=True, score_team=0, score_opponent=0),
+            ]
+        )
+
+    async def test_stream(self):
+        self.publish(0)
+        messages = asyncio.Queue()
+        requests = asyncio.Queue()
+        scope = {"type": "http", "method": "GET", "path": "/api/games/stream/", "query_string": ("team=%s" % self.team.slug).encode(), "headers": []}
+
+        application = asyncio.ensure_future(GameStreamApplication(None)(scope, requests.get, messages.put))
+
+        self.assertEqual((await messages.get())["status"], 200)
+        snapshot = (await messages.get())["body"].decode()
+        self.assertTrue(snapshot.startswith("event: snapshot\nid: 1\n"))
+        self.assertEqual([game["id"] for game in json.loads(snapshot.split("data: ")[1])], [1])
+
+        self.publish(1)
+        event = (await asyncio.wait_for(messages.get(), timeout=5))["body"].decode()
+        self.assertTrue(event.startswith("event: game\nid: 2\n"))
+        self.assertEqual(json.loads(event.split("data: ")[1])["score_team"], 1)
+
+        await requests.put({"type": "http.disconnect"})
+        await asyncio.wait_for(application, timeout=5)
+
+    async def test_unknown_team(self):
+        messages = asyncio.Queue()
+        scope = {"type": "http", "method": "GET", "path": "/api/games/stream/", "query_string": b"team=unknown", "headers": []}
+
+        await GameStreamApplication(None)(scope, asyncio.Queue().get, messages.put)
+        self.assertEqual((await messages.get())["status"], 404)
+
+    def test_not_served_under_wsgi(self):
+        self.publish(0)
+
+        with mock.patch("activities.views.broadcaster") as broadcaster:
+            response = self.client.get("/api/games/stream/")
+
+        self.assertEqual(response.status_code, 501)
+        broadcaster.stream.assert_not_called()
+
+
+class RinksideTest(TestCase):
+    def setUp(self):
+        scoreboard_directory = tempfile.TemporaryDirectory()
+        self.addCleanup(scoreboard_directory.cleanup)
+        self.enterContext(override_settings(CLUB_SCOREBOARD_PATH=os.path.join(scoreboard_directory.name, "scoreboard.bin")))
+
+        self.team = Team.objects.create(name="Team")
+        self.game = Game.objects.create(team=self.team, game_type=GameType.objects.get_or_create(name="Friendly")[0], date=timezone.now(), location="Elsewhere")
+
+        self.scorekeeper = get_user_model().objects.create_user("scorekeeper", password="x")
+        role = TeamRole.objects.create(name="Scorekeeper", abbreviation="SK", admin_role=True)
+        TeamMembership.objects.create(team=self.team, member=Member.objects.create(user=self.scorekeeper), season=Season.get_season(), role=role)
+
+    def post(self, action: str, **data):
+        return self.client.post("/api/rinkside/%d/%s/" % (self.game.pk, action), data, content_type="application/json")
+
+    def test_scorekeeping(self):
+        self.assertEqual(self.post("live", version=0, live=True).status_code, 403)
+
+        self.client.force_login(self.scorekeeper)
+        self.assertEqual(self.client.get("/api/rinkside/%d/" % self.game.pk).json()["version"], 0)
+
+        response = self.post("live", version=0, live=True)
+        self.assertEqual(response.json(), {"id": self.game.pk, "live": True, "score_team": 0, "score_opponent": 0, "version": 1})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(self.post("goal", version=1, side="opponent", time="03:12").json()["score_opponent"], 1)
+
+        self.assertEqual(self.post("score", version=2, side="team", delta=-1).json()["score_team"], 0)
+
+        # A second scorekeeper still working with version 2
+        response = self.post("score", version=2, side="team")
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual((response.json()["score_team"], response.json()["version"]), (0, 3))
+
+        self.assertEqual(GameEvent.objects.get(game=self.game).for_team, False)
+        self.assertEqual(read_scoreboard().games[self.game.pk].score_opponent, 1)
+
+    def test_goals_are_stored_with_their_event(self):
+        self.client.force_login(self.scorekeeper)
+        # An event that takes the number of the next version
+        GameEvent.objects.create(game=self.game, sequence=1, event_type=GameEvent.EventTypeChoices.PENALTY)
+
+        with self.captureOnCommitCallbacks(execute=True) as callbacks, self.assertRaises(IntegrityError):
+            self.post("goal", version=0, side="team", time="01:00")
+
+        self.game.refresh_from_db()
+        self.assertEqual((self.game.version, self.game.score_team), (0, 0))
+        self.assertEqual(callbacks, [])
+
+    def test_games_with_competition_are_refused(self):
+        self.game.competition = Competition.objects.create(name="RBIHF", module="activities.competition.hockey")
+        self.game.save()
+        self.client.force_login(self.scorekeeper)
+
+        self.assertEqual(self.post("live", version=self.game.version, live=True).status_code, 400)
+
+
+class VenueTest(TestCase):
+    def setUp(self):
+        self.team = Team.objects.create(name="Team")
+        self.game_type = GameType.objects.get_or_create(name="Friendly Game")[0]
+
+    def test_games_are_linked_to_venues(self):
+        home_game = Game.objects.create(team=self.team, game_type=self.game_type, date=timezone.now(), location="iscm")
+        away_game = Game.objects.create(team=self.team, game_type=self.game_type, date=timezone.now(), location="Elsewhere")
+
+        self.assertTrue(home_game.is_home_game)
+        self.assertFalse(away_game.is_home_game)
+        self.assertEqual(list(Game.objects.filter(venue__is_home=True)), [home_game])
+
+        # Unknown locations are not linked until an admin creates their venue
+        self.assertIsNone(away_game.venue)
+        self.assertFalse(Venue.objects.filter(name__iexact="elsewhere").exists())
+
+        away_game.location = " ELSEWHERE "
+        away_game.save()
+        venue = Venue.objects.create(name="Elsewhere")
+        self.assertEqual(Game.objects.get(pk=away_game.pk).venue, venue)
+
+        away_game.location = "Ice Skating Center Mechelen"
+        away_game.save()
+        self.assertTrue(Game.objects.get(pk=away_game.pk).is_home_game)
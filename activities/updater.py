@@ -0,0 +1,258 @@
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError, as_completed
+from dataclasses import dataclass, field
+
+from django.db.models import F, QuerySet
+from django.utils import timezone
+
+from .competition.base import CompetitionBaseClass
+from .competition.breaker import load_breakers, save_breakers
+from .competition.registry import group_games
+from .models import Game, GameEvent, ScoreUpdateRun
+from .scheduler import get_candidate_games, get_due_games, get_schedule, save_schedules
+from .scoreboard import publish_scoreboard
+from .signals import scores_changed
+
+
+@dataclass
+class GameResult:
+    """The outcome of fetching a single game, `latency` is the time spent waiting on the competition website in seconds"""
+
+    game: Game
+    latency: float | None = None
+    error: str | None = None
+    skipped: bool = False
+    changed: bool = False
+    events: int = 0
+
+
+@dataclass
+class UpdateSummary:
+    """Collects the results of a single update run"""
+
+    results: list[GameResult] = field(default_factory=list)
+    wall_time: float = 0
+    timed_out: int = 0
+
+    def __str__(self):
+        return "Updated %d of %d games in %.2fs (latency p50 %.0f ms, max %.0f ms, %d failed, %d writes, %d writes avoided, %d new events)" % (
+            len(self.updated),
+            len(self.results),
+            self.wall_time,
+            self.latency_percentile(50) * 1000,
+            self.latency_percentile(100) * 1000,
+            len(self.failed),
+            len(self.changed),
+            len(self.updated) - len(self.changed),
+            self.events,
+        )
+
+    @property
+    def updated(self) -> list[GameResult]:
+        return [result for result in self.results if not result.skipped and result.error is None]
+
+    @property
+    def skipped(self) -> list[GameResult]:
+        return [result for result in self.results if result.skipped]
+
+    @property
+    def changed(self) -> list[GameResult]:
+        return [result for result in self.results if result.changed]
+
+    @property
+    def events(self) -> int:
+        return sum(result.events for result in self.results)
+
+    @property
+    def failed(self) -> list[GameResult]:
+        return [result for result in self.results if result.error is not None]
+
+    @property
+    def latencies(self) -> list[float]:
+        return sorted(result.latency for result in self.results if result.latency is not None)
+
+    def latency_percentile(self, percentile: int, latencies: list[float] | None = None) -> float:
+        if latencies is None:
+            latencies = self.latencies
+
+        if len(latencies) == 0:
+            return 0
+
+        return latencies[min(len(latencies) - 1, round(percentile / 100 * (len(latencies) - 1)))]
+
+    def competition_latency(self) -> dict[str, dict[str, int]]:
+        """Returns the median and maximum latency in milliseconds per competition"""
+        latencies = {}
+
+        for result in self.results:
+            if result.latency is not None:
+                latencies.setdefault(str(result.game.competition), []).append(result.latency)
+
+        return {
+            competition: {"p50": round(self.latency_percentile(50, sorted(values)) * 1000), "max": round(max(values) * 1000)}
+            for competition, values in latencies.items()
+        }
+
+
+def get_games_to_update(hours: int = 3, due_only: bool = True) -> QuerySet:
+    """
+    Returns all games that are live, about to start or have started in the last `hours` hours.
+
+    If `due_only` is set, only games whose next poll time has passed are returned, see `activities.scheduler`.
+    """
+    now = timezone.now()
+
+    if due_only:
+        return get_due_games(now, hours=hours).select_related("poll_schedule")
+
+    return get_candidate_games(now, hours=hours).select_related("poll_schedule")
+
+
+class ScoreUpdater:
+    """
+    Fetches game information for a list of games concurrently and stores the results.
+
+    * `workers` maximum number of simultaneous requests to the competition websites
+    * `timeout` timeout in seconds for every single request
+    * `deadline` the maximum time in seconds to wait for all fetches of a single run, games that are not fetched in time are reported as failed
+
+    Fetching happens in a thread pool, the results are written to the database from the calling thread only. Only games whose live state or scores
+    changed are written, with a single bulk update per run, after which `activities.signals.scores_changed` is sent.
+
+    Games are grouped per competition provider, see `activities.competition.registry`. Requests to a competition website that keeps failing are
+    stopped by its circuit breaker, see `activities.competition.breaker`, the breaker states are stored after every run.
+
+    New timeline events are stored as `GameEvent` rows with a single bulk insert per run, the number of timeline entries seen is kept in the poll
+    schedule of the game so only new entries are parsed on the next run. Events are upserted on their position in the timeline, so they keep their id
+    when the timeline is read again after it was rewritten; events that disappeared are removed and the event generation of the game is raised.
+
+    Every run is recorded in the `ScoreUpdateRun` ledger, `holder` identifies the process. Unless `publish` is False, the live scoreboard is published
+    after every run, see `activities.scoreboard`. The thread pool is kept for the lifetime of the updater,
+    so a long running process can reuse it for every run. Call `close()` when done.
+    """
+
+    def __init__(self, workers: int = 8, timeout: float = 10, deadline: float = 90, holder: str = "", publish: bool = True):
+        self.holder = holder
+        self.publish = publish
+        self.timeout = timeout
+        self.deadline = deadline
+        self.executor = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="update_scores")
+
+    def update(self, games: list[Game]) -> UpdateSummary:
+        summary = UpdateSummary()
+        started = timezone.now()
+        start = time.monotonic()
+        futures: dict[Future, Game] = {}
+        providers: dict[Game, CompetitionBaseClass] = {}
+        events: list[GameEvent] = []
+        event_cursors: dict[Game, tuple[int, str]] = {}
+        events_reset: list[Game] = []
+        groups, errors = group_games(games)
+
+        for game in games:
+            if game.competition is None:
+                summary.results.append(GameResult(game=game, skipped=True))
+
+        for game, error in errors.items():
+            summary.results.append(GameResult(game=game, error=error))
+
+        load_breakers([provider.breaker for provider in groups])
+
+        for provider, provider_games in groups.items():
+            provider.timeout = self.timeout
+            futures.update(provider.fetch_games(provider_games, self.executor))
+            providers.update((game, provider) for game in provider_games)
+
+        try:
+            for future in as_completed(futures, timeout=self.deadline):
+                game = futures.pop(future)
+
+                try:
+                    game_data, latency = future.result()
+
+                    if not game_data:
+                        summary.results.append(GameResult(game=game, latency=latency, error="no game information received"))
+                        continue
+
+                    changed = providers[game].apply_game_information(game, game_data)
+                    game_events = providers[game].get_game_events(game, game_data)
+                    summary.results.append(GameResult(game=game, latency=latency, changed=changed, events=len(game_events)))
+
+                    events.extend(game_events)
+
+                    if "event_cursor" in game_data:
+                        event_cursors[game] = (game_data["event_cursor"], game_data.get("event_digest", ""))
+
+                    if game_data.get("events_reset"):
+                        events_reset.append(game)
+
+                except Exception as e:
+                    summary.results.append(GameResult(game=game, error=str(e) or e.__class__.__name__))
+
+        except TimeoutError:
+            for future, game in futures.items():
+                future.cancel()
+                summary.results.append(GameResult(game=game, error="deadline of %ss exceeded" % self.deadline))
+                summary.timed_out += 1
+
+        now = timezone.now()
+        changed_games = [result.game for result in summary.changed]
+
+        if len(changed_games) > 0:
+            for game in changed_games:
+                game.modified = now
+
+            Game.objects.bulk_update(changed_games, ["live", "score_team", "score_opponent", "modified"])
+            scores_changed.send(sender=Game, games=changed_games)
+
+        for game in events_reset:
+            GameEvent.objects.filter(game=game, sequence__gt=event_cursors.get(game, (0, ""))[0]).delete()
+
+        if len(events_reset) > 0:
+            Game.objects.filter(pk__in=[game.pk for game in events_reset]).update(event_generation=F("event_generation") + 1)
+
+        if len(events) > 0:
+            GameEvent.objects.bulk_create(
+                events,
+                update_conflicts=True,
+                unique_fields=["game", "sequence"],
+                update_fields=["event_type", "period", "time", "for_team", "description", "data"],
+            )
+
+        schedules = [get_schedule(result.game, now, failed=result.error is not None) for result in summary.results if not result.skipped]
+
+        for schedule in schedules:
+            schedule.event_cursor, schedule.event_digest = event_cursors.get(schedule.game, (schedule.event_cursor, schedule.event_digest))
+
+        save_schedules(schedules)
+        save_breakers()
+
+        summary.wall_time = time.monotonic() - start
+
+        ScoreUpdateRun.objects.create(
+            holder=self.holder,
+            started=started,
+            finished=timezone.now(),
+            games_polled=len(summary.results) - len(summary.skipped),
+            games_changed=len(summary.changed),
+            errors=len(summary.failed),
+            latency=summary.competition_latency(),
+        )
+
+        if self.publish:
+            publish_scoreboard()
+
+        return summary
+
+    def close(self) -> None:
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+def update_games(games: list[Game], workers: int = 8, timeout: float = 10, deadline: float = 90, holder: str = "") -> UpdateSummary:
+    """Runs a single update of `games`, see `ScoreUpdater` for the arguments"""
+    updater = ScoreUpdater(workers=workers, timeout=timeout, deadline=deadline, holder=holder)
+
+    try:
+        return updater.update(games)
+    finally:
+        updater.close()
@@ -1,3 +1,35 @@
-from django.shortcuts import render
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.http import Http404, HttpResponse, StreamingHttpResponse
 
-# Create your views here.
+from .stream import broadcaster, get_team_ids
+
+
+async def game_stream(request):
+    """
+    Streams live score changes as server-sent events, use `team` (a team slug, may be given more than once) to only follow the games of those teams.
+
+    The stream starts with a `snapshot` event holding all live and recent games, followed by a `game` event for every game whose live state or score
+    changes. Under ASGI the stream is served by `activities.stream.GameStreamApplication` instead of this view.
+
+    Only served under ASGI (`clubmanager.asgi`, see clubmanager-stream.service): under WSGI Django consumes the endless stream before sending anything,
+    which would hang a worker for good without the client receiving a byte.
+    """
+    if not isinstance(request, ASGIRequest):
+        return HttpResponse("The live score stream is only served by the ASGI application", status=501, content_type="text/plain")
+
+    teams = None
+    slugs = request.GET.getlist("team")
+
+    if len(slugs) > 0:
+        teams = await sync_to_async(get_team_ids)(slugs)
+
+        if len(teams) == 0:
+            raise Http404("No team found with slug %s" % ", ".join(slugs))
+
+    response = StreamingHttpResponse(broadcaster.stream(teams), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    # Tells nginx not to buffer the stream
+    response["X-Accel-Buffering"] = "no"
+
+    return response
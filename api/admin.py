@@ -0,0 +1,9 @@
+from django.contrib import admin
+
+from .models import ResponseCacheVersion
+
+
+@admin.register(ResponseCacheVersion)
+class ResponseCacheVersionAdmin(admin.ModelAdmin):
+    list_display = ["name", "version", "modified"]
+    readonly_fields = ["name", "version", "modified"]
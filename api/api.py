@@ -1,11 +1,9 @@
 import random
 from datetime import datetime, timedelta
-from itertools import chain
 from typing import List
 
-from bs4 import BeautifulSoup
 from django.db.models import Q
-from django.utils import text, timezone
+from django.utils import timezone
 from ninja import ModelSchema, Redoc, Schema
 from ninja_extra import ControllerBase, NinjaExtraAPI, api_controller, pagination, route
 
@@ -13,6 +11,7 @@ from activities.models import Game, Opponent
 from frontend.models import Sponsor
 from news.models import NewsItem
 from teams.models import Season, Team, TeamMembership, TeamPicture, TeamRole
+from teams.roster import get_roster
 
 api = NinjaExtraAPI(title="clubmanager", docs=Redoc())
 
@@ -33,11 +32,11 @@ class SponsorSchema(ModelSchema):
 
     @staticmethod
     def resolve_width(obj: Sponsor) -> int:
-        return obj.logo.width
+        return obj.logo_width
 
     @staticmethod
     def resolve_height(obj: Sponsor) -> int:
-        return obj.logo.height
+        return obj.logo_height
 
     @staticmethod
     def resolve_id(obj: Sponsor) -> int:
@@ -63,28 +62,30 @@ class NewsItemSchema(ModelSchema):
 
     @staticmethod
     def resolve_main_picture(obj: NewsItem):
-        if obj.main_picture() is not None:
+        main_picture = obj.main_picture()
+
+        if main_picture is not None:
             return {
-                "url": obj.main_picture().picture.url,
-                "height": obj.main_picture().picture.height,
-                "width": obj.main_picture().picture.width,
+                "url": main_picture.picture.url,
+                "height": main_picture.picture_height,
+                "width": main_picture.picture_width,
             }
 
     @staticmethod
     def resolve_pictures(obj: NewsItem):
-        return [{"url": picture.picture.url, "height": picture.picture.height, "width": picture.picture.height} for picture in obj.pictures.exclude(main_picture=True).all()]
+        return [{"url": picture.picture.url, "height": picture.picture_height, "width": picture.picture_width} for picture in obj.other_pictures()]
 
     @staticmethod
     def resolve_picture_height(obj: NewsItem):
         if obj.main_picture() is not None:
-            return obj.main_picture().picture.height
+            return obj.main_picture().picture_height
 
         return 0
 
     @staticmethod
     def resolve_picture_width(obj: NewsItem):
         if obj.main_picture() is not None:
-            return obj.main_picture().picture.width
+            return obj.main_picture().picture_width
 
         return 0
 
@@ -94,19 +95,11 @@ class NewsItemSchema(ModelSchema):
 
     @staticmethod
     def resolve_content(obj: NewsItem):
-        return obj.formatted()
+        return obj.rendered_html
 
     @staticmethod
     def resolve_summary(obj: NewsItem):
-        summary = BeautifulSoup(obj.formatted(), "html.parser")
-
-        for img in summary.find_all("img"):
-            if len(img.parent.contents) == 1:
-                img.parent.decompose()
-            else:
-                img.decompose()
-
-        return text.Truncator(summary).words(40, html=True)
+        return obj.summary_html
 
 
 class TeamSchema(ModelSchema):
@@ -118,7 +111,7 @@ class TeamSchema(ModelSchema):
 
     @staticmethod
     def resolve_logo(obj: Team):
-        return {"url": obj.logo.url, "height": obj.logo.height, "width": obj.logo.width}
+        return {"url": obj.logo.url, "height": obj.logo_height, "width": obj.logo_width}
 
 
 class OpponentSchema(ModelSchema):
@@ -130,7 +123,7 @@ class OpponentSchema(ModelSchema):
 
     @staticmethod
     def resolve_logo(obj: Team):
-        return {"url": obj.logo.url, "height": obj.logo.height, "width": obj.logo.width}
+        return {"url": obj.logo.url, "height": obj.logo_height, "width": obj.logo_width}
 
 
 class GameSchema(ModelSchema):
@@ -210,58 +203,32 @@ class TeamSchema(ModelSchema):
     @staticmethod
     def resolve_picture(obj: Team):
         try:
-            picture = obj.teampicture_set.get(season=Season.get_season()).picture
+            picture = obj.teampicture_set.get(season=Season.get_season())
 
-            return {"url": picture.url, "height": picture.height, "width": picture.width}
+            return {"url": picture.picture.url, "height": picture.picture_height, "width": picture.picture_width}
 
         except TeamPicture.DoesNotExist:
             return {"url": "", "height": 0, "width": 0}
 
     @staticmethod
     def resolve_goalie(obj: Team):
-        return obj.teammembership_set.filter(season=Season.get_season()).filter(role__abbreviation="GO").order_by("number")
+        return get_roster(obj).get_role("GO")
 
     @staticmethod
     def resolve_forward(obj: Team):
-        return obj.teammembership_set.filter(season=Season.get_season()).filter(role__abbreviation="F").order_by("number")
+        return get_roster(obj).get_role("F")
 
     @staticmethod
     def resolve_defense(obj: Team):
-        return obj.teammembership_set.filter(season=Season.get_season()).filter(role__abbreviation="D").order_by("number")
+        return get_roster(obj).get_role("D")
 
     @staticmethod
     def resolve_players(obj: Team):
-        return obj.teammembership_set.filter(season=Season.get_season()).filter(role__abbreviation="P").order_by("number")
+        return get_roster(obj).get_role("P")
 
     @staticmethod
     def resolve_staff(obj: Team):
-        head_coach = obj.teammembership_set.filter(season=Season.get_season(), role__abbreviation="CO").order_by(
-            "member__user__last_name", "member__user__first_name", "member__license"
-        )
-        assistant_coach = obj.teammembership_set.filter(season=Season.get_season(), role__abbreviation="AC").order_by(
-            "member__user__last_name", "member__user__first_name", "member__license"
-        )
-        general_manager = obj.teammembership_set.filter(season=Season.get_season(), role__abbreviation="GM").order_by(
-            "member__user__last_name", "member__user__first_name", "member__license"
-        )
-        team_manager = obj.teammembership_set.filter(season=Season.get_season(), role__abbreviation="TM").order_by(
-            "member__user__last_name", "member__user__first_name", "member__license"
-        )
-        others = (
-            obj.teammembership_set.filter(season=Season.get_season(), number=None)
-            .exclude(
-                Q(role__abbreviation="GO")
-                | Q(role__abbreviation="F")
-                | Q(role__abbreviation="D")
-                | Q(role__abbreviation="CO")
-                | Q(role__abbreviation="AC")
-                | Q(role__abbreviation="GM")
-                | Q(role__abbreviation="TM")
-            )
-            .order_by("member__user__last_name", "member__user__first_name", "member__license")
-        )
-
-        return list(chain(head_coach, assistant_coach, general_manager, team_manager, others))
+        return get_roster(obj).staff
 
 
 """ @api_controller("/sponsors")
@@ -278,15 +245,11 @@ class NewsController(ControllerBase):
     @route.get("", response={200: pagination.PaginatedResponseSchema[NewsItemSchema]})
     @pagination.paginate(pagination.PageNumberPaginationExtra, page_size=8)
     def get_news(self):
-        return (
-            NewsItem.objects.filter(status=NewsItem.StatusChoices.RELEASED, publish_on__lte=timezone.now())
-            .exclude(type=NewsItem.NewsItemTypeChoices.INTERNAL)
-            .order_by("-publish_on")
-        )
+        return NewsItem.objects.published().with_pictures()
 
     @route.get("{slug}", response={200: NewsItemSchema})
     def get_news_by_slug(self, slug: str):
-        return NewsItem.objects.exclude(type=NewsItem.NewsItemTypeChoices.INTERNAL).get(status=NewsItem.StatusChoices.RELEASED, publish_on__lte=timezone.now(), slug=slug)
+        return NewsItem.objects.published().with_pictures().get(slug=slug)
 
 
 @api_controller("/games")
@@ -307,7 +270,7 @@ class GamesController(ControllerBase):
                 games = games.filter(team__slug=team)
 
         if home_games_only:
-            games = games.filter(Q(location__iexact="ice skating center mechelen") | Q(location__iexact="iscm"))
+            games = games.filter(venue__is_home=True)
 
         return games[:count]
 
@@ -358,14 +321,14 @@ class NewsSchema(ModelSchema):
     @staticmethod
     def resolve_picture_height(obj: NewsItem):
         if obj.main_picture() is not None:
-            return obj.main_picture().picture.height
+            return obj.main_picture().picture_height
 
         return 0
 
     @staticmethod
     def resolve_picture_width(obj: NewsItem):
         if obj.main_picture() is not None:
-            return obj.main_picture().picture.width
+            return obj.main_picture().picture_width
 
         return 0
 
@@ -379,23 +342,15 @@ class NewsSchema(ModelSchema):
 
     @staticmethod
     def resolve_content(obj: NewsItem):
-        return obj.formatted()
+        return obj.rendered_html
 
     @staticmethod
     def resolve_summary(obj: NewsItem):
-        summary = BeautifulSoup(obj.formatted(), "html.parser")
-
-        for img in summary.find_all("img"):
-            if len(img.parent.contents) == 1:
-                img.parent.decompose()
-            else:
-                img.decompose()
-
-        return text.Truncator(summary).words(40, html=True)
+        return obj.summary_html
 
     @staticmethod
     def resolve_pictures(obj: NewsItem):
-        return [picture.picture.url for picture in obj.pictures.exclude(main_picture=True).all()]
+        return [picture.picture.url for picture in obj.other_pictures()]
 
     @staticmethod
     def resolve_publish_date(obj: NewsItem):
@@ -403,7 +358,7 @@ class NewsSchema(ModelSchema):
 
     @staticmethod
     def resolve_text(obj: NewsItem):
-        return obj.formatted()
+        return obj.rendered_html
 
 
 class SponsorSchema(ModelSchema):
@@ -503,49 +458,23 @@ class TeamSchema(ModelSchema):
 
     @staticmethod
     def resolve_goalie(obj: Team):
-        return obj.teammembership_set.filter(season=Season.get_season()).filter(role__abbreviation="GO").order_by("number")
+        return get_roster(obj).get_role("GO")
 
     @staticmethod
     def resolve_forward(obj: Team):
-        return obj.teammembership_set.filter(season=Season.get_season()).filter(role__abbreviation="F").order_by("number")
+        return get_roster(obj).get_role("F")
 
     @staticmethod
     def resolve_defense(obj: Team):
-        return obj.teammembership_set.filter(season=Season.get_season()).filter(role__abbreviation="D").order_by("number")
+        return get_roster(obj).get_role("D")
 
     @staticmethod
     def resolve_players(obj: Team):
-        return obj.teammembership_set.filter(season=Season.get_season()).filter(role=None).order_by("number")
+        return get_roster(obj).get_role(None)
 
     @staticmethod
     def resolve_staff(obj: Team):
-        head_coach = obj.teammembership_set.filter(season=Season.get_season(), role__abbreviation="CO").order_by(
-            "member__user__last_name", "member__user__first_name", "member__license"
-        )
-        assistant_coach = obj.teammembership_set.filter(season=Season.get_season(), role__abbreviation="AC").order_by(
-            "member__user__last_name", "member__user__first_name", "member__license"
-        )
-        general_manager = obj.teammembership_set.filter(season=Season.get_season(), role__abbreviation="GM").order_by(
-            "member__user__last_name", "member__user__first_name", "member__license"
-        )
-        team_manager = obj.teammembership_set.filter(season=Season.get_season(), role__abbreviation="TM").order_by(
-            "member__user__last_name", "member__user__first_name", "member__license"
-        )
-        others = (
-            obj.teammembership_set.filter(season=Season.get_season(), number=None)
-            .exclude(
-                Q(role__abbreviation="GO")
-                | Q(role__abbreviation="F")
-                | Q(role__abbreviation="D")
-                | Q(role__abbreviation="CO")
-                | Q(role__abbreviation="AC")
-                | Q(role__abbreviation="GM")
-                | Q(role__abbreviation="TM")
-            )
-            .order_by("member__user__last_name", "member__user__first_name", "member__license")
-        )
-
-        return list(chain(head_coach, assistant_coach, general_manager, team_manager, others))
+        return get_roster(obj).staff
 
 
 @api_controller("/blackout")
@@ -560,15 +489,11 @@ class NewsController:
     @route.get("", response={200: pagination.PaginatedResponseSchema[NewsSchema]})
     @pagination.paginate(pagination.PageNumberPaginationExtra, page_size=8)
     def get_news(self):
-        return (
-            NewsItem.objects.filter(status=NewsItem.StatusChoices.RELEASED, publish_on__lte=timezone.now())
-            .exclude(type=NewsItem.NewsItemTypeChoices.INTERNAL)
-            .order_by("-publish_on")
-        )
+        return NewsItem.objects.published().with_pictures()
 
     @route.get("{slug}", response={200: NewsSchema})
     def get_news_by_slug(self, slug: str):
-        return NewsItem.objects.exclude(type=NewsItem.NewsItemTypeChoices.INTERNAL).get(status=NewsItem.StatusChoices.RELEASED, publish_on__lte=timezone.now(), slug=slug)
+        return NewsItem.objects.published().with_pictures().get(slug=slug)
 
 
 @api_controller("/sponsors")
@@ -0,0 +1,171 @@
+"""
+Caches the responses of the public read API (the DRF viewsets behind the website) and answers conditional requests.
+
+Every cached viewset names the resources its responses depend on (`cache_resources`). Responses are stored in the Django cache under a key made of the
+view, its arguments, the query parameters and the current versions of those resources. Saving or deleting a model raises the versions of the
+resources it belongs to (see `api.signals`), so the next request computes a fresh response. Versions live in the database, which keeps invalidation
+correct across all web workers even when every worker has its own (local memory) cache.
+
+Responses that depend on the clock (news with a future publish time, the game window) are only cached until the next moment the response changes,
+see `get_cache_timeout` of the viewsets. Every response carries an `X-Cache` header (HIT or MISS), `get_stats` returns the hit ratio per resource of
+the current worker.
+
+Before the cache is even consulted, an `ETag` and `Last-Modified` are calculated from the resource versions and a single aggregate over the queryset
+of the view (latest `modified` and row count), `If-None-Match` and `If-Modified-Since` are answered with a 304 without serializing anything.
+"""
+
+import datetime
+import hashlib
+import json
+import threading
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Max, QuerySet
+from django.http import HttpResponseBase
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+from rest_framework.request import Request
+from rest_framework.response import Response
+
+from .models import ResponseCacheVersion
+
+CACHE_HEADER = "X-Cache"
+
+_stats_lock = threading.Lock()
+_hits: Counter = Counter()
+_misses: Counter = Counter()
+
+
+def seconds_until(moment: datetime.datetime | None) -> float:
+    """Returns the number of seconds until `moment` (at least 1), or the default timeout if there is no such moment"""
+    if moment is None:
+        return settings.CLUB_API_CACHE_TIMEOUT
+
+    return max(1, (moment - timezone.now()).total_seconds())
+
+
+def record(resource: str, hit: bool) -> None:
+    with _stats_lock:
+        (_hits if hit else _misses)[resource] += 1
+
+
+def get_stats() -> dict[str, dict[str, int | float]]:
+    """Returns the hits, misses and hit ratio per resource since this worker started"""
+    with _stats_lock:
+        return {
+            resource: {"hits": _hits[resource], "misses": _misses[resource], "ratio": _hits[resource] / (_hits[resource] + _misses[resource])}
+            for resource in sorted(set(_hits) | set(_misses))
+        }
+
+
+def reset_stats() -> None:
+    with _stats_lock:
+        _hits.clear()
+        _misses.clear()
+
+
+class CachedResponseMixin:
+    """Caches the responses of `list` and `retrieve` of a viewset (successful responses only) and answers conditional requests for them"""
+
+    cache_resources: list[str] = []
+
+    def get_resource_versions(self) -> dict[str, tuple[int, datetime.datetime]]:
+        if not hasattr(self, "_resource_versions"):
+            self._resource_versions = {
+                name: (version, modified)
+                for name, version, modified in ResponseCacheVersion.objects.filter(name__in=self.cache_resources).values_list("name", "version", "modified")
+            }
+
+        return self._resource_versions
+
+    def get_validator_queryset(self, kwargs: dict) -> QuerySet:
+        """The rows the response is built from, the object itself for `retrieve`"""
+        queryset = self.filter_queryset(self.get_queryset())
+
+        if self.action == "retrieve":
+            lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+            queryset = queryset.filter(**{self.lookup_field: kwargs[lookup_url_kwarg]})
+
+        return queryset
+
+    def get_last_modified_aggregates(self) -> dict:
+        """Aggregates over the validator queryset that tell when its data last changed, override to add e.g. publish times that passed"""
+        return {"modified": Max("modified")}
+
+    def get_validators(self, request: Request, kwargs: dict) -> tuple[str, datetime.datetime | None]:
+        """Returns the ETag and last modification time of the response, calculated with a single aggregate query and without serializing"""
+        aggregates = self.get_validator_queryset(kwargs).aggregate(count=Count("pk"), **self.get_last_modified_aggregates())
+        versions = self.get_resource_versions()
+
+        # Aggregates in the future (e.g. the start of the next game) only change the ETag
+        now = timezone.now()
+        moments = [value for value in aggregates.values() if isinstance(value, datetime.datetime) and value <= now]
+        moments += [modified for version, modified in versions.values()]
+        arguments = [self.basename, self.action, request.get_host(), kwargs, sorted(request.query_params.lists()), sorted(versions.items()), sorted(aggregates.items())]
+
+        return '"%s"' % hashlib.sha256(json.dumps(arguments, default=str).encode()).hexdigest()[:32], max(moments, default=None)
+
+    def get_cache_timeout(self) -> float:
+        """Number of seconds a new response may be cached, override to stop caching at the next moment the response changes"""
+        return settings.CLUB_API_CACHE_TIMEOUT
+
+    def get_cache_key(self, request: Request, kwargs: dict) -> str:
+        arguments = [
+            request.get_host(),
+            kwargs,
+            sorted(request.query_params.lists()),
+            sorted((name, version) for name, (version, modified) in self.get_resource_versions().items()),
+        ]
+
+        return "api:response:%s:%s:%s" % (self.basename, self.action, hashlib.sha256(json.dumps(arguments, default=str).encode()).hexdigest())
+
+    def list(self, request: Request, *args, **kwargs) -> Response:
+        return self.get_cached_response(super(CachedResponseMixin, self).list, request, *args, **kwargs)
+
+    def retrieve(self, request: Request, *args, **kwargs) -> Response:
+        return self.get_cached_response(super(CachedResponseMixin, self).retrieve, request, *args, **kwargs)
+
+    def get_cached_response(self, view, request: Request, *args, **kwargs) -> HttpResponseBase:
+        etag, last_modified = self.get_validators(request, kwargs)
+        timestamp = int(last_modified.timestamp()) if last_modified is not None else None
+        not_modified = get_conditional_response(request, etag=etag, last_modified=timestamp)
+
+        if not_modified is not None:
+            return self.add_validators(not_modified, etag, timestamp)
+
+        return self.add_validators(self.get_response(view, request, *args, **kwargs), etag, timestamp)
+
+    def add_validators(self, response: HttpResponseBase, etag: str, timestamp: int | None) -> HttpResponseBase:
+        if response.status_code in [200, 304]:
+            response["ETag"] = etag
+
+            if timestamp is not None:
+                response["Last-Modified"] = http_date(timestamp)
+
+            # Browsers may store the response but always have to check it is still current
+            patch_cache_control(response, no_cache=True)
+
+        return response
+
+    def get_response(self, view, request: Request, *args, **kwargs) -> Response:
+        key = self.get_cache_key(request, kwargs)
+        resource = self.cache_resources[0] if len(self.cache_resources) > 0 else self.basename
+        cached = cache.get(key)
+
+        if cached is not None:
+            record(resource, hit=True)
+            response = Response(cached)
+            response[CACHE_HEADER] = "HIT"
+            return response
+
+        record(resource, hit=False)
+        response = view(request, *args, **kwargs)
+
+        if response.status_code == 200:
+            cache.set(key, response.data, timeout=min(settings.CLUB_API_CACHE_TIMEOUT, self.get_cache_timeout()))
+
+        response[CACHE_HEADER] = "MISS"
+        return response
@@ -0,0 +1,41 @@
+# Generated by Django 5.1.15 on 2026-10-17 14:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = []
+
+    operations = [
+        migrations.CreateModel(
+            name="ResponseCacheVersion",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "name",
+                    models.CharField(max_length=50, unique=True, verbose_name="name"),
+                ),
+                (
+                    "version",
+                    models.PositiveBigIntegerField(default=1, verbose_name="version"),
+                ),
+                ("modified", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "verbose_name": "response cache version",
+                "verbose_name_plural": "response cache versions",
+                "ordering": ["name"],
+            },
+        ),
+    ]
@@ -0,0 +1,38 @@
+from django.db import models
+from django.db.models import F
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+
+
+class ResponseCacheVersion(models.Model):
+    """
+    The version of a resource of the public API (e.g. news), raised whenever its data changes.
+
+    Cached responses are stored under the current versions of their resources, raising a version makes all of them stale at once. The version is
+    raised in the same transaction as the change itself, so no process can see the new version together with the old data. Other caches that have to
+    be invalidated across processes use versions of their own (e.g. the rosters in `teams.roster`).
+    """
+
+    name = models.CharField(_("name"), max_length=50, unique=True)
+    version = models.PositiveBigIntegerField(_("version"), default=1)
+
+    modified = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return "%s v%d" % (self.name, self.version)
+
+    class Meta:
+        verbose_name = _("response cache version")
+        verbose_name_plural = _("response cache versions")
+        ordering = ["name"]
+
+    @classmethod
+    def get_versions(cls, names: list[str]) -> dict[str, int]:
+        return dict(cls.objects.filter(name__in=names).values_list("name", "version"))
+
+    @classmethod
+    def bump(cls, names: list[str]) -> None:
+        for name in names:
+            # update() skips auto_now, the modification time is the Last-Modified of deletions
+            if cls.objects.filter(name=name).update(version=F("version") + 1, modified=timezone.now()) == 0:
+                cls.objects.get_or_create(name=name, defaults={"version": 2})
@@ -0,0 +1,40 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from activities.models import Game, GameType, Opponent, Venue
+from activities.signals import scores_changed
+from frontend.models import Sponsor
+from members.models import Member
+from news.models import NewsItem, Picture
+from teams.models import Season, Team, TeamMembership, TeamPicture, TeamRole
+
+from .models import ResponseCacheVersion
+
+# The resources of the public API whose cached responses depend on each model
+DEPENDENCIES = {
+    NewsItem: ["news"],
+    Picture: ["news"],
+    Game: ["games"],
+    GameType: ["games"],
+    Opponent: ["games"],
+    Venue: ["games"],
+    # News responses show the short names of their teams
+    Team: ["teams", "games", "news"],
+    TeamMembership: ["teams"],
+    TeamPicture: ["teams"],
+    TeamRole: ["teams"],
+    Member: ["teams"],
+    Season: ["teams", "games"],
+    Sponsor: ["sponsors"],
+}
+
+
+@receiver([post_save, post_delete])
+def invalidate_responses(sender, **kwargs) -> None:
+    if sender in DEPENDENCIES:
+        ResponseCacheVersion.bump(DEPENDENCIES[sender])
+
+
+@receiver(scores_changed)
+def invalidate_scores(sender, **kwargs) -> None:
+    ResponseCacheVersion.bump(["games"])
@@ -0,0 +1,178 @@
+import datetime
+import re
+import unittest
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import Q, QuerySet
+from django.test import TestCase
+from django.utils import timezone
+
+from activities.models import Game, GameType
+from activities.scheduler import get_candidate_games, get_due_games
+from members.models import Member
+from news.models import NewsItem
+from teams.models import Season, Team, TeamMembership, TeamRole
+from teams.roster import get_memberships
+
+from .cache import CACHE_HEADER, get_stats, reset_stats
+from .models import ResponseCacheVersion
+
+# A table scan without an index, e.g. "SCAN activities_game" (but not "SCAN activities_game USING INDEX game_date_idx")
+TABLE_SCAN = re.compile(r"^SCAN (\w+)$")
+
+
+@unittest.skipUnless(connection.vendor == "sqlite", "Query plans are checked with SQLite's EXPLAIN QUERY PLAN")
+class QueryPlanTest(TestCase):
+    """The querysets behind the public API should all be answered from an index"""
+
+    def setUp(self):
+        now = timezone.now()
+        self.season = Season.get_season()
+        self.team = Team.objects.create(name="Team")
+        game_type = GameType.objects.get_or_create(name="Competition Game")[0]
+        user = get_user_model().objects.create_user("user")
+        role = TeamRole.objects.create(name="Forward", abbreviation="F")
+
+        for i in range(20):
+            Game.objects.create(team=self.team, game_type=game_type, date=now + datetime.timedelta(days=i - 10), live=i == 10)
+            NewsItem.objects.create(title="News %d" % i, text="Text", author=user, status=i % 3, type=i % 3, publish_on=now - datetime.timedelta(days=i))
+
+        TeamMembership.objects.create(team=self.team, member=Member.objects.create(user=user), season=self.season, role=role, number=9)
+
+    def get_table_scans(self, queryset: QuerySet) -> list[str]:
+        sql, params = queryset.query.sql_with_params()
+
+        with connection.cursor() as cursor:
+            cursor.execute("EXPLAIN QUERY PLAN " + sql, params)
+            plan = [row[-1] for row in cursor.fetchall()]
+
+        return [line for line in plan if TABLE_SCAN.match(line)]
+
+    def test_api_querysets_use_indexes(self):
+        now = timezone.now()
+        querysets = {
+            "news list": NewsItem.objects.published(),
+            "news detail": NewsItem.objects.published().filter(slug="news-1"),
+            "news cursor page": NewsItem.objects.published()
+            .filter(publish_on__lte=now - datetime.timedelta(days=5))
+            .exclude(publish_on=now - datetime.timedelta(days=5), id__gte=10)
+            .order_by("-publish_on", "-id")[:9],
+            "game list": Game.objects.filter(season=self.season).filter(Q(date__gte=now) | Q(live=True) | Q(date__gte=now - datetime.timedelta(hours=3)))[:5],
+            "game list for team": Game.objects.filter(season=self.season, team__slug=self.team.slug),
+            "home games": Game.objects.filter(season=self.season, venue__is_home=True),
+            "live games": Game.objects.filter(live=True),
+            "candidate games": get_candidate_games(now).order_by("date", "pk"),
+            "due games": get_due_games(now),
+            "roster": get_memberships(self.team, self.season),
+            "role": TeamMembership.objects.filter(team=self.team, season=self.season, role__abbreviation="F"),
+            "season of a date": Season.objects.filter(start_date__lte=now.date(), end_date__gte=now.date()),
+        }
+
+        for name, queryset in querysets.items():
+            with self.subTest(name):
+                self.assertEqual(self.get_table_scans(queryset), [])
+
+
+class ResponseCacheTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        reset_stats()
+        self.author = get_user_model().objects.create_user("author")
+
+    def create_news_item(self, publish_on: datetime.datetime | None = None) -> NewsItem:
+        return NewsItem.objects.create(
+            title="Title",
+            text="Text",
+            author=self.author,
+            status=NewsItem.StatusChoices.RELEASED,
+            type=NewsItem.NewsItemTypeChoices.EXTERNAL,
+            publish_on=publish_on or timezone.now(),
+        )
+
+    def test_responses_are_cached_until_changed(self):
+        self.create_news_item()
+        self.assertEqual(self.client.get("/api/news/")[CACHE_HEADER], "MISS")
+
+        # The validators and the cache versions
+        with self.assertNumQueries(2):
+            response = self.client.get("/api/news/")
+
+        self.assertEqual((response[CACHE_HEADER], response.json()["count"]), ("HIT", 1))
+        self.assertEqual(self.client.get("/api/news/", {"page": 1})[CACHE_HEADER], "MISS")
+
+        self.create_news_item()
+        response = self.client.get("/api/news/")
+        self.assertEqual((response[CACHE_HEADER], response.json()["count"]), ("MISS", 2))
+
+        self.assertEqual(get_stats()["news"], {"hits": 1, "misses": 3, "ratio": 0.25})
+
+    def test_team_changes_reach_news(self):
+        team = Team.objects.create(name="Team", short_name="T")
+        self.create_news_item().teams.add(team)
+        etag = self.client.get("/api/news/")["ETag"]
+
+        team.short_name = "U"
+        team.save()
+        response = self.client.get("/api/news/", HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual((response.status_code, response[CACHE_HEADER]), (200, "MISS"))
+        self.assertEqual(response.json()["results"][0]["teams"], ["U"])
+
+    def test_timeout_ends_at_next_publish_time(self):
+        self.create_news_item(publish_on=timezone.now() + datetime.timedelta(seconds=90))
+
+        with mock.patch.object(cache, "set", wraps=cache.set) as cache_set:
+            self.client.get("/api/news/")
+
+        self.assertAlmostEqual(cache_set.call_args.kwargs["timeout"], 90, delta=5)
+
+
+class ConditionalRequestTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.author = get_user_model().objects.create_user("author")
+        self.news_item = NewsItem.objects.create(
+            title="Title", text="Text", author=self.author, status=NewsItem.StatusChoices.RELEASED, type=NewsItem.NewsItemTypeChoices.EXTERNAL
+        )
+
+    def test_unchanged_responses_are_not_sent_again(self):
+        response = self.client.get("/api/news/%s/" % self.news_item.slug)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("no-cache", response["Cache-Control"])
+
+        # Answered from the validators and the cache versions, before the cache or serializer
+        with self.assertNumQueries(2), mock.patch.object(cache, "get") as cache_get:
+            not_modified = self.client.get("/api/news/%s/" % self.news_item.slug, HTTP_IF_NONE_MATCH=response["ETag"])
+            cache_get.assert_not_called()
+
+        self.assertEqual((not_modified.status_code, not_modified.content), (304, b""))
+        self.assertEqual(not_modified["ETag"], response["ETag"])
+
+        not_modified = self.client.get("/api/news/%s/" % self.news_item.slug, HTTP_IF_MODIFIED_SINCE=response["Last-Modified"])
+        self.assertEqual(not_modified.status_code, 304)
+
+    def test_deletions_are_sent(self):
+        NewsItem.objects.create(title="Other", text="Text", author=self.author, status=NewsItem.StatusChoices.RELEASED, type=NewsItem.NewsItemTypeChoices.EXTERNAL)
+
+        # Last-Modified has a precision of seconds, move everything before the deletion well into the past
+        past = timezone.now() - datetime.timedelta(minutes=5)
+        NewsItem.objects.update(publish_on=past, modified=past)
+        ResponseCacheVersion.objects.update(modified=past)
+        last_modified = self.client.get("/api/news/")["Last-Modified"]
+
+        self.news_item.delete()
+        response = self.client.get("/api/news/", HTTP_IF_MODIFIED_SINCE=last_modified)
+
+        self.assertEqual((response.status_code, response.json()["count"]), (200, 1))
+
+    def test_changes_are_sent(self):
+        etag = self.client.get("/api/news/")["ETag"]
+
+        NewsItem.objects.filter(pk=self.news_item.pk).delete()
+        response = self.client.get("/api/news/", HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual((response.status_code, response.json()["count"]), (200, 0))
+        self.assertNotEqual(response["ETag"], etag)
@@ -0,0 +1,15 @@
+from rest_framework import permissions, viewsets
+from rest_framework.request import Request
+from rest_framework.response import Response
+
+from .cache import get_stats
+from .models import ResponseCacheVersion
+
+
+class ResponseCacheViewSet(viewsets.ViewSet):
+    """Hit ratio of the response cache of the worker answering the request, and the current version of every resource"""
+
+    permission_classes = [permissions.IsAdminUser]
+
+    def list(self, request: Request) -> Response:
+        return Response({"stats": get_stats(), "versions": dict(ResponseCacheVersion.objects.values_list("name", "version"))})
@@ -2,11 +2,14 @@ from rest_framework import routers
 
 from frontend.api import SponsorViewSet
 from teams.api import TeamsViewSet
-from activities.api import GameViewSet
+from activities.api import GameViewSet, RinksideViewSet
 from news.api import NewsItemViewSet
+from api.views import ResponseCacheViewSet
 
 router = routers.DefaultRouter()
 router.register(r"sponsors", SponsorViewSet, basename="sponsors")
 router.register(r"teams", TeamsViewSet)
 router.register(r"games", GameViewSet, basename="games")
+router.register(r"rinkside", RinksideViewSet, basename="rinkside")
 router.register(r"news", NewsItemViewSet, basename="newsitems")
+router.register(r"cache", ResponseCacheViewSet, basename="cache")
@@ -13,4 +13,9 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "clubmanager.settings")
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+# Imported after Django is set up, serves the live score stream without going through the middleware
+from activities.stream import GameStreamApplication  # noqa: E402
+
+application = GameStreamApplication(django_application)
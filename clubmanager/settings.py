@@ -61,6 +61,7 @@ INSTALLED_APPS = [
     "frontend",
     "activities",
     "api",
+    "webhooks",
     "django_cleanup.apps.CleanupConfig",
 ]
 
@@ -182,6 +183,14 @@ STATICFILES_DIRS = [BASE_DIR / "static"]
 SITE_NAME = env("CLUB_SITE_NAME")
 SITE_LOGO = env("CLUB_SITE_LOGO")
 CLUB_ENFORCE_LICENSE = env("CLUB_ENFORCE_LICENSE", default=True)
+# Live scoreboard written by the score updater and read by all web workers, see activities.scoreboard
+CLUB_SCOREBOARD_PATH = env("CLUB_SCOREBOARD_PATH", default=str(BASE_DIR / "scoreboard.bin"))
+# Seconds between two runs of update_scores (OnUnitActiveSec of clubmanager-update-scores.timer)
+CLUB_SCORES_UPDATE_INTERVAL = env.int("CLUB_SCORES_UPDATE_INTERVAL", default=120)
+# A scoreboard older than this is considered stale (the score updater is not running), a run may take up to its 90 seconds deadline on top of the interval
+CLUB_SCOREBOARD_MAX_AGE = env.int("CLUB_SCOREBOARD_MAX_AGE", default=2 * CLUB_SCORES_UPDATE_INTERVAL)
+# Maximum number of seconds a response of the public API is cached, changes invalidate it earlier, see api.cache
+CLUB_API_CACHE_TIMEOUT = env.int("CLUB_API_CACHE_TIMEOUT", default=300)
 
 INTERNAL_IPS = ["127.0.0.1"]
 
@@ -22,6 +22,8 @@ from django.urls import include, path
 from django.views.generic import RedirectView
 from two_factor.urls import urlpatterns as two_factor_urls
 
+from activities.views import game_stream
+
 from .api import router
 
 urlpatterns = [
@@ -35,6 +37,7 @@ urlpatterns = [
     path("initials-avatar/", include("django_initials_avatar.urls")),
     path("markdownx/", include("markdownx.urls")),
     path("admin/", admin.site.urls),
+    path("api/games/stream/", game_stream, name="game-stream"),
     path("api/", include(router.urls)),
     path("", RedirectView.as_view(pattern_name="clubmanager:index")),
 ]
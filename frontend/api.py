@@ -1,13 +1,22 @@
+from datetime import timedelta
+
 from django.db.models import Q
 from django.utils import timezone
 from rest_framework import viewsets
 
+from api.cache import CachedResponseMixin, seconds_until
+
 from .models import Sponsor
 from .serializers import SponsorSerializer
 
 
-class SponsorViewSet(viewsets.ReadOnlyModelViewSet):
+class SponsorViewSet(CachedResponseMixin, viewsets.ReadOnlyModelViewSet):
     serializer_class = SponsorSerializer
+    cache_resources = ["sponsors"]
+
+    def get_cache_timeout(self) -> float:
+        # Sponsors start and end on a date, the list changes at midnight
+        return seconds_until(timezone.localtime().replace(hour=0, minute=0, second=0, microsecond=0) + timedelta(days=1))
 
     def get_queryset(self, *args, **kwargs):
         return Sponsor.objects.filter(start_date__lte=timezone.now()).filter(Q(end_date__gte=timezone.now()) | Q(end_date=None))
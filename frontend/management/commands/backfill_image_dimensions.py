@@ -0,0 +1,59 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from django.apps import apps
+from django.core.files.images import get_image_dimensions
+from django.core.files.storage import Storage
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+from django.db import models
+
+
+def read_dimensions(storage: Storage, name: str) -> tuple[int | None, int | None] | None:
+    """Returns the width and height of the image `name` in `storage`, or None if it cannot be read"""
+    try:
+        with storage.open(name, "rb") as image:
+            return get_image_dimensions(image)
+    except (OSError, ValueError):
+        return None
+
+
+class Command(BaseCommand):
+    help = "Stores the width and height of all images that have dimension fields but no dimensions yet, reading the images in parallel"
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("--workers", action="store", default=8, type=int, help="Number of images to read simultaneously")
+        parser.add_argument("--force", action="store_true", help="Read all images again, also those that already have dimensions")
+
+    def handle(self, *args, **options) -> None:
+        if options["workers"] < 1:
+            raise CommandError("--workers should be at least 1")
+
+        with ThreadPoolExecutor(max_workers=options["workers"]) as executor:
+            for model in apps.get_models():
+                for field in model._meta.get_fields():
+                    if isinstance(field, models.ImageField) and field.width_field and field.height_field:
+                        self.backfill(executor, model, field, options["force"])
+
+    def backfill(self, executor: ThreadPoolExecutor, model: type[models.Model], field: models.ImageField, force: bool) -> None:
+        # Only names are loaded, model instances would read every image without dimensions while being initialised
+        images = model._base_manager.exclude(**{field.attname: ""}).exclude(**{field.attname: None})
+
+        if not force:
+            images = images.filter(models.Q(**{field.width_field: None}) | models.Q(**{field.height_field: None}))
+
+        images = list(images.values_list("pk", field.attname))
+        updated = 0
+        failed = []
+
+        for (pk, name), dimensions in zip(images, executor.map(lambda image: read_dimensions(field.storage, image[1]), images)):
+            if dimensions is None or None in dimensions:
+                failed.append(name)
+                continue
+
+            model._base_manager.filter(pk=pk).update(**{field.width_field: dimensions[0], field.height_field: dimensions[1]})
+            updated += 1
+
+        if len(images) > 0:
+            self.stdout.write(self.style.SUCCESS("%s.%s: stored the dimensions of %d of %d images" % (model._meta.label, field.name, updated, len(images))))
+
+        for name in failed:
+            self.stdout.write(self.style.WARNING("%s.%s: could not read %s" % (model._meta.label, field.name, name)))
@@ -0,0 +1,36 @@
+# Generated by Django 5.1.15 on 2026-10-17 14:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("frontend", "0005_alter_sponsor_options"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="sponsor",
+            name="logo_height",
+            field=models.PositiveIntegerField(
+                blank=True, editable=False, null=True, verbose_name="logo height"
+            ),
+        ),
+        migrations.AddField(
+            model_name="sponsor",
+            name="logo_width",
+            field=models.PositiveIntegerField(
+                blank=True, editable=False, null=True, verbose_name="logo width"
+            ),
+        ),
+        migrations.AlterField(
+            model_name="sponsor",
+            name="logo",
+            field=models.ImageField(
+                height_field="logo_height",
+                upload_to="sponsors/logo/",
+                width_field="logo_width",
+            ),
+        ),
+    ]
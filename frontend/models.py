@@ -11,7 +11,9 @@ class Sponsor(models.Model):
     start_date = models.DateField(_("start date"), default=timezone.now, help_text=_("Logo will be visible as of this day"))
     end_date = models.DateField(_("end date"), blank=True, null=True, help_text=_("Logo will no longer be visible as of this date, leave empty to display indefinitly"))
     url = models.URLField(blank=True, null=True)
-    logo = models.ImageField(upload_to="sponsors/logo/")
+    logo = models.ImageField(upload_to="sponsors/logo/", width_field="logo_width", height_field="logo_height")
+    logo_width = models.PositiveIntegerField(_("logo width"), blank=True, null=True, editable=False)
+    logo_height = models.PositiveIntegerField(_("logo height"), blank=True, null=True, editable=False)
 
     created = models.DateTimeField(auto_now_add=True)
     modified = models.DateTimeField(auto_now=True)
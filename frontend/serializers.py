@@ -4,8 +4,8 @@ from .models import Sponsor
 
 
 class SponsorSerializer(serializers.ModelSerializer):
-    width = serializers.IntegerField(source="logo.width")
-    height = serializers.IntegerField(source="logo.height")
+    width = serializers.IntegerField(source="logo_width")
+    height = serializers.IntegerField(source="logo_height")
 
     class Meta:
         model = Sponsor
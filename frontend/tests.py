@@ -1,3 +1,37 @@
-from django.test import TestCase
+import io
+import os
+import tempfile
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from PIL import Image
+
+from .models import Sponsor
+
+
+class ImageDimensionsTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        media_root = tempfile.TemporaryDirectory()
+        self.addCleanup(media_root.cleanup)
+        self.enterContext(override_settings(MEDIA_ROOT=media_root.name))
+
+        image = io.BytesIO()
+        Image.new("RGB", (120, 80)).save(image, "PNG")
+        self.sponsor = Sponsor.objects.create(name="Sponsor", logo=SimpleUploadedFile("logo.png", image.getvalue(), content_type="image/png"))
+
+    def test_dimensions_are_stored_on_upload(self):
+        self.assertEqual((self.sponsor.logo_width, self.sponsor.logo_height), (120, 80))
+
+        # Served from the stored dimensions, the image itself is not needed anymore
+        os.unlink(self.sponsor.logo.path)
+        self.assertEqual(self.client.get("/api/sponsors/").json()[0]["width"], 120)
+
+    def test_backfill(self):
+        Sponsor.objects.update(logo_width=None, logo_height=None)
+        call_command("backfill_image_dimensions", workers=2, stdout=mock.Mock())
+
+        self.assertEqual(Sponsor.objects.values_list("logo_width", "logo_height").get(), (120, 80))
@@ -1,6 +1,10 @@
-from rest_framework import viewsets
+from django.db.models import Max, Min
 from django.utils import timezone
+from rest_framework import viewsets
+
+from api.cache import CachedResponseMixin, seconds_until
 from .models import NewsItem
+from .pagination import CursorPaginationClass
 from .serializers import NewsItemSerializer
 from rest_framework.pagination import PageNumberPagination
 
@@ -9,14 +13,30 @@ class PaginationClass(PageNumberPagination):
     page_size = 8
 
 
-class NewsItemViewSet(viewsets.ReadOnlyModelViewSet):
+class NewsItemViewSet(CachedResponseMixin, viewsets.ReadOnlyModelViewSet):
     serializer_class = NewsItemSerializer
     lookup_field = "slug"
     pagination_class = PaginationClass
+    cache_resources = ["news"]
+
+    def get_cache_timeout(self) -> float:
+        # Released items with a publish time in the future appear once it has passed
+        scheduled = NewsItem.objects.filter(status=NewsItem.StatusChoices.RELEASED, publish_on__gt=timezone.now()).exclude(type=NewsItem.NewsItemTypeChoices.INTERNAL)
+        return seconds_until(scheduled.aggregate(next=Min("publish_on"))["next"])
+
+    def get_last_modified_aggregates(self) -> dict:
+        # A scheduled item appears when its publish time passes, without being modified
+        return {"modified": Max("modified"), "published": Max("publish_on")}
+
+    @property
+    def paginator(self):
+        """Clients opt into cursor pagination with `?pagination=cursor`, the `next` and `previous` links keep the `cursor` parameter"""
+        if not hasattr(self, "_paginator"):
+            query_params = self.request.query_params
+            cursor = query_params.get("pagination") == "cursor" or CursorPaginationClass.cursor_query_param in query_params
+            self._paginator = CursorPaginationClass() if cursor else self.pagination_class()
+
+        return self._paginator
 
     def get_queryset(self, *args, **kwargs):
-        return (
-            NewsItem.objects.filter(status=NewsItem.StatusChoices.RELEASED, publish_on__lte=timezone.now())
-            .exclude(type=NewsItem.NewsItemTypeChoices.INTERNAL)
-            .order_by("-publish_on")
-        )
+        return NewsItem.objects.published().with_pictures()
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand, CommandParser
+
+from news.models import NewsItem
+
+
+class Command(BaseCommand):
+    help = "Renders the HTML and summary of all news items whose text changed since they were last rendered"
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("--force", action="store_true", help="Render all news items, e.g. after changing the Markdown settings")
+        parser.add_argument("--batch-size", action="store", default=100, type=int, help="Number of news items to save in a single query")
+
+    def handle(self, *args, **options) -> None:
+        rendered = []
+        count = 0
+
+        for news_item in NewsItem.objects.only("pk", "text", "content_hash").iterator(chunk_size=options["batch_size"]):
+            count += 1
+
+            if news_item.render(force=options["force"]):
+                rendered.append(news_item)
+
+        NewsItem.objects.bulk_update(rendered, ["rendered_html", "summary_html", "content_hash"], batch_size=options["batch_size"])
+
+        self.stdout.write(self.style.SUCCESS("Rendered %d of %d news items" % (len(rendered), count)))
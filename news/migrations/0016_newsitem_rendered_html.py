@@ -0,0 +1,70 @@
+# Generated by Django 5.1.15 on 2026-10-17 14:04
+
+import hashlib
+
+from bs4 import BeautifulSoup
+from django.db import migrations, models
+from django.utils import text as text_utils
+from markdownx.utils import markdownify
+
+# Copies of news.models.SUMMARY_WORDS, get_content_hash and render_summary as they were when this migration was written
+SUMMARY_WORDS = 40
+
+
+def get_content_hash(text):
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+def render_summary(html):
+    summary = BeautifulSoup(html, "html.parser")
+
+    for img in summary.find_all("img"):
+        if len(img.parent.contents) == 1:
+            img.parent.decompose()
+
+        else:
+            img.decompose()
+
+    return text_utils.Truncator(summary).words(SUMMARY_WORDS, html=True)
+
+
+def render_news_items(apps, schema_editor):
+    NewsItem = apps.get_model("news", "NewsItem")
+
+    for news_item in NewsItem.objects.only("pk", "text").iterator():
+        news_item.rendered_html = markdownify(news_item.text)
+        news_item.summary_html = render_summary(news_item.rendered_html)
+        news_item.content_hash = get_content_hash(news_item.text)
+        news_item.save(update_fields=["rendered_html", "summary_html", "content_hash"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("news", "0015_auto_20240902_0925"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="newsitem",
+            name="content_hash",
+            field=models.CharField(
+                blank=True, editable=False, max_length=64, verbose_name="content hash"
+            ),
+        ),
+        migrations.AddField(
+            model_name="newsitem",
+            name="rendered_html",
+            field=models.TextField(
+                blank=True, editable=False, verbose_name="rendered HTML"
+            ),
+        ),
+        migrations.AddField(
+            model_name="newsitem",
+            name="summary_html",
+            field=models.TextField(
+                blank=True, editable=False, verbose_name="summary HTML"
+            ),
+        ),
+        migrations.RunPython(render_news_items, migrations.RunPython.noop),
+    ]
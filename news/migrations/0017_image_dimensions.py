@@ -0,0 +1,37 @@
+# Generated by Django 5.1.15 on 2026-10-17 14:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("news", "0016_newsitem_rendered_html"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="picture",
+            name="picture_height",
+            field=models.PositiveIntegerField(
+                blank=True, editable=False, null=True, verbose_name="picture height"
+            ),
+        ),
+        migrations.AddField(
+            model_name="picture",
+            name="picture_width",
+            field=models.PositiveIntegerField(
+                blank=True, editable=False, null=True, verbose_name="picture width"
+            ),
+        ),
+        migrations.AlterField(
+            model_name="picture",
+            name="picture",
+            field=models.ImageField(
+                height_field="picture_height",
+                upload_to="news/pictures/",
+                verbose_name="picture",
+                width_field="picture_width",
+            ),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.1.15 on 2026-10-17 14:22
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("news", "0018_indexes"),
+        ("teams", "0018_indexes"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="newsitem",
+            name="newsitem_published_idx",
+        ),
+        migrations.AddIndex(
+            model_name="newsitem",
+            index=models.Index(
+                condition=models.Q(("status", 2), models.Q(("type", 0), _negated=True)),
+                fields=["-publish_on", "-id"],
+                name="newsitem_published_idx",
+            ),
+        ),
+    ]
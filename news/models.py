@@ -1,16 +1,57 @@
+import hashlib
+
+from bs4 import BeautifulSoup
 from django.contrib import admin
 from django.contrib.auth import get_user_model
 from django.db import models
+from django.utils import text as text_utils
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 from django_extensions.db.fields import AutoSlugField
 from markdownx.models import MarkdownxField
 from markdownx.utils import markdownify
+from model_utils import FieldTracker
 from rules.contrib.models import RulesModel
 
 from teams.models import Team
 from .rules import is_admin, is_author, is_released, is_editor
 
+# Number of words in the summary of a news item
+SUMMARY_WORDS = 40
+
+
+def get_content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+def render_summary(html: str) -> str:
+    """Returns the first words of `html` without any images"""
+    summary = BeautifulSoup(html, "html.parser")
+
+    for img in summary.find_all("img"):
+        if len(img.parent.contents) == 1:
+            img.parent.decompose()
+
+        else:
+            img.decompose()
+
+    return text_utils.Truncator(summary).words(SUMMARY_WORDS, html=True)
+
+
+class NewsItemQuerySet(models.QuerySet):
+    def published(self) -> models.QuerySet:
+        """Released news items that are visible on the website, newest first"""
+        return (
+            self.filter(status=NewsItem.StatusChoices.RELEASED, publish_on__lte=timezone.now()).exclude(type=NewsItem.NewsItemTypeChoices.INTERNAL).order_by("-publish_on")
+        )
+
+    def with_pictures(self) -> models.QuerySet:
+        """Prefetches the pictures and teams of every news item, `main_picture()` and `other_pictures()` then no longer query"""
+        return self.prefetch_related(
+            models.Prefetch("pictures", queryset=Picture.objects.order_by("pk")),
+            models.Prefetch("teams", queryset=Team.objects.select_related(None).prefetch_related(None)),
+        )
+
 
 class NewsItem(RulesModel):
     """A news item. This can be both an internal as well as an external message."""
@@ -42,9 +83,18 @@ class NewsItem(RulesModel):
 
     teams = models.ManyToManyField(Team, related_name="news_items")
 
+    # Rendered from text on save, content_hash is the hash of the text they were rendered from
+    rendered_html = models.TextField(_("rendered HTML"), blank=True, editable=False)
+    summary_html = models.TextField(_("summary HTML"), blank=True, editable=False)
+    content_hash = models.CharField(_("content hash"), max_length=64, blank=True, editable=False)
+
     created = models.DateTimeField(auto_now_add=True)
     modified = models.DateTimeField(auto_now=True)
 
+    tracker = FieldTracker(fields=["status"])
+
+    objects = NewsItemQuerySet.as_manager()
+
     def __str__(self):
         return self.title
 
@@ -52,17 +102,53 @@ class NewsItem(RulesModel):
         verbose_name = _("news item")
         verbose_name_plural = _("news items")
         ordering = ["-created"]
+        indexes = [
+            # Matches NewsItemQuerySet.published(): released (2) and not internal (0), in the order of the cursor pagination of the API
+            models.Index(fields=["-publish_on", "-id"], condition=models.Q(status=2) & ~models.Q(type=0), name="newsitem_published_idx"),
+        ]
         rules_permissions = {"add": is_admin, "view": is_author | is_released, "change": is_author | is_editor, "delete": is_author | is_editor, "release": is_editor}
 
+    def save(self, *args, **kwargs) -> None:
+        if self.render() and kwargs.get("update_fields") is not None:
+            kwargs["update_fields"] = set(kwargs["update_fields"]) | {"rendered_html", "summary_html", "content_hash"}
+
+        return super(NewsItem, self).save(*args, **kwargs)
+
+    def render(self, force: bool = False) -> bool:
+        """Renders `text` into `rendered_html` and `summary_html` if it changed since the last render (or if `force`), returns True if rendered"""
+        content_hash = get_content_hash(self.text)
+
+        if content_hash == self.content_hash and not force:
+            return False
+
+        self.rendered_html = markdownify(self.text)
+        self.summary_html = render_summary(self.rendered_html)
+        self.content_hash = content_hash
+
+        return True
+
     def formatted(self) -> str:
+        if self.content_hash == get_content_hash(self.text):
+            return self.rendered_html
+
         return markdownify(self.text)
 
     def main_picture(self) -> "Picture":
+        if "pictures" in getattr(self, "_prefetched_objects_cache", {}):
+            return next((picture for picture in self.pictures.all() if picture.main_picture), None)
+
         try:
             return self.pictures.get(main_picture=True)
         except Picture.DoesNotExist:
             return None
 
+    def other_pictures(self) -> list["Picture"]:
+        """All pictures apart from the main picture"""
+        if "pictures" in getattr(self, "_prefetched_objects_cache", {}):
+            return [picture for picture in self.pictures.all() if not picture.main_picture]
+
+        return list(self.pictures.exclude(main_picture=True))
+
     @property
     @admin.display(description=_("Author"))
     def author_name(self):
@@ -73,7 +159,9 @@ class Picture(models.Model):
     """A picture linked to a news item."""
 
     news_item = models.ForeignKey(NewsItem, on_delete=models.CASCADE, related_name="pictures", verbose_name=_("news item"))
-    picture = models.ImageField(_("picture"), upload_to="news/pictures/")
+    picture = models.ImageField(_("picture"), upload_to="news/pictures/", width_field="picture_width", height_field="picture_height")
+    picture_width = models.PositiveIntegerField(_("picture width"), blank=True, null=True, editable=False)
+    picture_height = models.PositiveIntegerField(_("picture height"), blank=True, null=True, editable=False)
     main_picture = models.BooleanField(_("main picture"), default=False, help_text=_("The main picture is the picture shown on the cover of the news item."))
 
     created = models.DateTimeField(auto_now_add=True)
@@ -0,0 +1,98 @@
+"""
+Keyset (cursor) pagination of the news feed on (publish_on, id), newest first.
+
+A cursor holds the publish time and id of the last item of a page (or the first, for the previous page). The next page is the first `page_size` items
+before that position, found with a range on the `newsitem_published_idx` index instead of an offset and without counting all news items, so every
+page is equally fast and items published while browsing do not shift the next pages.
+"""
+
+import base64
+import datetime
+from urllib.parse import parse_qs, urlencode
+
+from django.db.models import QuerySet
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class CursorPaginationClass(BasePagination):
+    page_size = 8
+    cursor_query_param = "cursor"
+    invalid_cursor_message = "Invalid cursor"
+
+    def encode_cursor(self, item, reverse: bool) -> str:
+        position = {"p": item.publish_on.isoformat(), "i": item.pk}
+
+        if reverse:
+            position["r"] = 1
+
+        cursor = base64.urlsafe_b64encode(urlencode(position).encode()).decode()
+        return replace_query_param(self.base_url, self.cursor_query_param, cursor)
+
+    def decode_cursor(self, request: Request) -> tuple[datetime.datetime, int, bool] | None:
+        cursor = request.query_params.get(self.cursor_query_param)
+
+        if cursor is None:
+            return None
+
+        try:
+            position = parse_qs(base64.urlsafe_b64decode(cursor.encode()).decode(), strict_parsing=True)
+            return datetime.datetime.fromisoformat(position["p"][0]), int(position["i"][0]), "r" in position
+        except (TypeError, ValueError, KeyError, UnicodeDecodeError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def paginate_queryset(self, queryset: QuerySet, request: Request, view=None) -> list:
+        self.base_url = request.build_absolute_uri()
+        position = self.decode_cursor(request)
+
+        if position is None:
+            items = list(queryset.order_by("-publish_on", "-id")[: self.page_size + 1])
+            self.has_previous, self.has_next = False, len(items) > self.page_size
+            self.items = items[: self.page_size]
+            return self.items
+
+        publish_on, pk, reverse = position
+
+        # A range on publish_on the index can use, items with the same publish time as the position are told apart by their id
+        if reverse:
+            items = list(queryset.filter(publish_on__gte=publish_on).exclude(publish_on=publish_on, id__lte=pk).order_by("publish_on", "id")[: self.page_size + 1])
+            self.has_previous, self.has_next = len(items) > self.page_size, True
+            self.items = items[: self.page_size][::-1]
+        else:
+            items = list(queryset.filter(publish_on__lte=publish_on).exclude(publish_on=publish_on, id__gte=pk).order_by("-publish_on", "-id")[: self.page_size + 1])
+            self.has_previous, self.has_next = True, len(items) > self.page_size
+            self.items = items[: self.page_size]
+
+        return self.items
+
+    def get_next_link(self) -> str | None:
+        if not self.has_next or len(self.items) == 0:
+            return None
+
+        return self.encode_cursor(self.items[-1], reverse=False)
+
+    def get_previous_link(self) -> str | None:
+        if not self.has_previous:
+            return None
+
+        if len(self.items) == 0:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+
+        return self.encode_cursor(self.items[0], reverse=True)
+
+    def get_paginated_response(self, data) -> Response:
+        return Response({"next": self.get_next_link(), "previous": self.get_previous_link(), "results": data})
+
+    def get_paginated_response_schema(self, schema: dict) -> dict:
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "previous": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
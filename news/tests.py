@@ -1,3 +1,99 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
 from django.test import TestCase
+from django.utils import timezone
+
+from teams.models import Team
+
+from .models import NewsItem, Picture
+
+
+class RenderedNewsTest(TestCase):
+    def setUp(self):
+        self.author = get_user_model().objects.create_user("author")
+
+    def test_text_is_rendered_on_save(self):
+        text = "![picture](/media/picture.jpg)\n\n" + " ".join("word%d" % i for i in range(60))
+        news_item = NewsItem.objects.create(title="Title", text=text, author=self.author)
+
+        self.assertIn("<img", news_item.rendered_html)
+        self.assertNotIn("<img", news_item.summary_html)
+        self.assertTrue(news_item.summary_html.endswith("…</p>"))
+        self.assertNotIn("word40", news_item.summary_html)
+
+        with mock.patch("news.models.markdownify") as markdownify:
+            news_item.title = "Other title"
+            news_item.save()
+            markdownify.assert_not_called()
+
+        news_item.text = "*Changed*"
+        news_item.save(update_fields=["text"])
+        news_item.refresh_from_db()
+        self.assertEqual(news_item.rendered_html, "<p><em>Changed</em></p>")
+
+    def test_render_command(self):
+        news_item = NewsItem.objects.create(title="Title", text="Text", author=self.author)
+        NewsItem.objects.update(text="New text")
+
+        call_command("render_news", stdout=mock.Mock())
+        news_item.refresh_from_db()
+        self.assertEqual(news_item.summary_html, "<p>New text</p>")
+
+
+class NewsListTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.author = get_user_model().objects.create_user("author")
+        self.team = Team.objects.create(name="Team")
+
+    def create_news_items(self, count: int) -> None:
+        for i in range(count):
+            news_item = NewsItem.objects.create(
+                title="Title %d" % i, text="Text", author=self.author, status=NewsItem.StatusChoices.RELEASED, type=NewsItem.NewsItemTypeChoices.EXTERNAL
+            )
+            news_item.teams.add(self.team)
+
+            for main_picture in [True, False]:
+                Picture.objects.create(news_item=news_item, picture="news/pictures/%d.png" % i, picture_width=40, picture_height=30, main_picture=main_picture)
+
+    def test_query_count_does_not_depend_on_page_size(self):
+        # Validators, cache versions, count, news items, pictures, teams and the next publish time (new items make sure the response is not cached)
+        for count in [1, 8]:
+            self.create_news_items(count)
+
+            with self.assertNumQueries(7):
+                data = self.client.get("/api/news/").json()
+
+            self.assertEqual(data["results"][0]["main_picture"]["width"], 40)
+            self.assertEqual(len(data["results"][0]["pictures"]), 1)
+
+    def test_cursor_pagination(self):
+        self.create_news_items(10)
+        # Items published at the same moment are ordered by id
+        NewsItem.objects.filter(pk__in=NewsItem.objects.order_by("pk").values("pk")[:4]).update(publish_on=timezone.now())
+
+        # Validators, cache versions, news items, pictures, teams and the next publish time, the total is not counted
+        with self.assertNumQueries(6):
+            data = self.client.get("/api/news/", {"pagination": "cursor"}).json()
+
+        self.assertNotIn("count", data)
+        self.assertIsNone(data["previous"])
+        first_page = [news_item["title"] for news_item in data["results"]]
+        self.assertEqual(len(first_page), 8)
+
+        # Items published while browsing do not shift the next page
+        self.create_news_items(1)
+        data = self.client.get(data["next"]).json()
+
+        second_page = [news_item["title"] for news_item in data["results"]]
+        self.assertEqual(len(second_page), 2)
+        self.assertIsNone(data["next"])
+        self.assertEqual(sorted(first_page + second_page), sorted("Title %d" % i for i in range(10)))
+
+        data = self.client.get(data["previous"]).json()
+        self.assertEqual([news_item["title"] for news_item in data["results"]], first_page)
 
-# Create your tests here.
+        self.assertEqual(self.client.get("/api/news/", {"cursor": "invalid"}).status_code, 404)
@@ -1,10 +1,14 @@
 from rest_framework import viewsets
 
+from api.cache import CachedResponseMixin
+
 from .models import Team
 from .serializers import TeamSerializer
 
 
-class TeamsViewSet(viewsets.ReadOnlyModelViewSet):
-    queryset = Team.objects.all()
+class TeamsViewSet(CachedResponseMixin, viewsets.ReadOnlyModelViewSet):
+    # The members are not serialized, the roster comes from teams.roster
+    queryset = Team.objects.prefetch_related(None)
     lookup_field = "slug"
     serializer_class = TeamSerializer
+    cache_resources = ["teams"]
@@ -0,0 +1,62 @@
+# Generated by Django 5.1.15 on 2026-10-17 14:06
+
+import teams.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("teams", "0016_alter_team_number_pool"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="team",
+            name="logo_height",
+            field=models.PositiveIntegerField(
+                blank=True, editable=False, null=True, verbose_name="logo height"
+            ),
+        ),
+        migrations.AddField(
+            model_name="team",
+            name="logo_width",
+            field=models.PositiveIntegerField(
+                blank=True, editable=False, null=True, verbose_name="logo width"
+            ),
+        ),
+        migrations.AddField(
+            model_name="teampicture",
+            name="picture_height",
+            field=models.PositiveIntegerField(
+                blank=True, editable=False, null=True, verbose_name="picture height"
+            ),
+        ),
+        migrations.AddField(
+            model_name="teampicture",
+            name="picture_width",
+            field=models.PositiveIntegerField(
+                blank=True, editable=False, null=True, verbose_name="picture width"
+            ),
+        ),
+        migrations.AlterField(
+            model_name="team",
+            name="logo",
+            field=models.ImageField(
+                height_field="logo_height",
+                upload_to="team/logo/",
+                verbose_name="logo",
+                width_field="logo_width",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="teampicture",
+            name="picture",
+            field=models.ImageField(
+                height_field="picture_height",
+                upload_to=teams.models.team_season_path,
+                verbose_name="picture",
+                width_field="picture_width",
+            ),
+        ),
+    ]
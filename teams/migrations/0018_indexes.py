@@ -0,0 +1,26 @@
+# Generated by Django 5.1.15 on 2026-10-17 14:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("members", "0016_alter_member_license"),
+        ("teams", "0017_image_dimensions"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="season",
+            index=models.Index(
+                fields=["start_date", "end_date"], name="season_dates_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="teammembership",
+            index=models.Index(
+                fields=["team", "season", "role"], name="teammembership_roster_idx"
+            ),
+        ),
+    ]
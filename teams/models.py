@@ -43,29 +43,47 @@ class Season(RulesModel):
         verbose_name = _("season")
         verbose_name_plural = _("seasons")
         ordering = ["start_date"]
+        indexes = [models.Index(fields=["start_date", "end_date"], name="season_dates_idx")]
         rules_permissions = {"add": is_organization_admin, "view": is_organization_admin, "change": is_organization_admin, "delete": is_organization_admin}
 
     @classmethod
-    def get_season(cls, date: datetime.date = timezone.now(), return_values_only: bool = False) -> "list | Season":
+    def get_season(cls, date: datetime.date | None = None, return_values_only: bool = False) -> "list | Season":
         """
-        Returns the season for the given date.
+        Returns the season for the given date, served from the in-process season cache (see `teams.seasons`).
 
-        * `date` date to check, default = `timezone.now()`
+        * `date` date to check, default = today
         * `return_values_only` if true, will only return start and end date, no object, default = `False`
 
-        Raises `DoesNotExist` if no Season exists.
+        Raises `DoesNotExist` if no Season exists and `MultipleObjectsReturned` if seasons overlap.
         """
-        season = cls.objects.get(start_date__lte=date, end_date__gte=date)
+        from .seasons import get_season
+
+        season = get_season(date)
+
+        if season is None:
+            raise cls.DoesNotExist("No season found for %s" % (date or "today"))
 
         if return_values_only:
             return [season.start_date, season.end_date]
         return season
 
     @classmethod
-    def get_season_id(cls, date: datetime.date = timezone.now()) -> int:
+    def get_season_id(cls, date: datetime.date | None = None) -> int:
         season = Season.get_season(date=date, return_values_only=False)
         return season.id
 
+    def clean(self) -> None:
+        if self.start_date is not None and self.end_date is not None:
+            if self.start_date > self.end_date:
+                raise ValidationError(_("The end date should be after the start date."))
+
+            overlapping = Season.objects.filter(start_date__lte=self.end_date, end_date__gte=self.start_date).exclude(pk=self.pk).first()
+
+            if overlapping is not None:
+                raise ValidationError(_("Seasons cannot overlap, this season overlaps with %(season)s."), params={"season": overlapping})
+
+        return super(Season, self).clean()
+
     @property
     @admin.display(description=_("Current Season"), boolean=True)
     def current_season(self):
@@ -142,7 +160,9 @@ class Team(RulesModel):
         help_text=_("Internal groups are only visible to members, external groups are available via the API"),
     )
     number_pool = models.ForeignKey(NumberPool, on_delete=models.SET_DEFAULT, verbose_name=_("number pool"), to_field="name", default="default")
-    logo = models.ImageField(_("logo"), upload_to="team/logo/")
+    logo = models.ImageField(_("logo"), upload_to="team/logo/", width_field="logo_width", height_field="logo_height")
+    logo_width = models.PositiveIntegerField(_("logo width"), blank=True, null=True, editable=False)
+    logo_height = models.PositiveIntegerField(_("logo height"), blank=True, null=True, editable=False)
 
     members = models.ManyToManyField(Member, verbose_name=_("members"), through="TeamMembership")
 
@@ -207,6 +227,7 @@ class TeamMembership(RulesModel):
                 violation_error_message=_("Number already in use for this team in the current season"),
             ),
         ]
+        indexes = [models.Index(fields=["team", "season", "role"], name="teammembership_roster_idx")]
         rules_permissions = {
             "add": is_team_admin | is_organization_admin,
             "view": is_admin,
@@ -251,7 +272,9 @@ class TeamPicture(RulesModel):
 
     team = models.ForeignKey(Team, on_delete=models.CASCADE, verbose_name=_("team"))
     season = models.ForeignKey(Season, on_delete=models.PROTECT, verbose_name=_("season"))
-    picture = models.ImageField(_("picture"), upload_to=team_season_path)
+    picture = models.ImageField(_("picture"), upload_to=team_season_path, width_field="picture_width", height_field="picture_height")
+    picture_width = models.PositiveIntegerField(_("picture width"), blank=True, null=True, editable=False)
+    picture_height = models.PositiveIntegerField(_("picture height"), blank=True, null=True, editable=False)
 
     created = models.DateTimeField(auto_now_add=True)
     modified = models.DateTimeField(auto_now=True)
@@ -0,0 +1,93 @@
+"""
+Builds the roster of a team for a season from a single query.
+
+All memberships of the team are loaded at once and grouped in Python: memberships with a staff role (`TeamRole.staff_role`) form the staff, ordered
+by the sort order of their role and by name, all others are grouped per role and ordered by number.
+
+Rosters are kept in the Django cache under a generation that is stored in the database (`api.models.ResponseCacheVersion`) and raised whenever a
+membership, role or member changes. Every process reads the generation from the database, so a change is seen everywhere at once, also when each
+worker has its own (local memory) cache.
+"""
+
+from dataclasses import dataclass, field
+
+from django.core.cache import cache
+from django.db.models import QuerySet
+
+from api.models import ResponseCacheVersion
+
+from .models import Season, Team, TeamMembership
+
+# Rosters are also refreshed after ROSTER_TIMEOUT seconds, e.g. for name changes of a user which do not clear the cache
+ROSTER_TIMEOUT = 60 * 60
+GENERATION = "rosters"
+
+
+@dataclass
+class Roster:
+    players: dict[str, list[TeamMembership]] = field(default_factory=dict)
+    staff: list[TeamMembership] = field(default_factory=list)
+
+    def get_role(self, abbreviation: str | None) -> list[TeamMembership]:
+        """Returns the (non staff) memberships with the role `abbreviation`, ordered by number"""
+        return self.players.get(abbreviation, [])
+
+
+def name_key(membership: TeamMembership) -> tuple:
+    return (membership.member.user.last_name, membership.member.user.first_name, membership.member.license or "")
+
+
+def build_roster(memberships: list[TeamMembership]) -> Roster:
+    roster = Roster()
+
+    for membership in memberships:
+        if membership.role.staff_role:
+            roster.staff.append(membership)
+        else:
+            roster.players.setdefault(membership.role.abbreviation, []).append(membership)
+
+    roster.staff.sort(key=lambda membership: (membership.role.sort_order, membership.role.name) + name_key(membership))
+
+    for players in roster.players.values():
+        players.sort(key=lambda membership: (membership.number is None, membership.number or 0) + name_key(membership))
+
+    return roster
+
+
+def get_memberships(team: Team | int, season: Season | int) -> QuerySet:
+    return TeamMembership.objects.select_related(None).select_related("member__user", "role").filter(team=team, season=season).order_by()
+
+
+def load_roster(team: Team | int, season: Season | int) -> Roster:
+    return build_roster(list(get_memberships(team, season)))
+
+
+def get_roster(team: Team, season: Season | None = None) -> Roster:
+    """
+    Returns the roster of `team` for `season` (default the current season).
+
+    The roster is remembered on `team` as well, so serializing a team asks the cache only once.
+    """
+    season_id = season.pk if season is not None else Season.get_season_id()
+    rosters = team.__dict__.setdefault("_rosters", {})
+
+    if season_id not in rosters:
+        key = "teams:roster:%d:%d:%d" % (get_generation(), team.pk, season_id)
+        roster = cache.get(key)
+
+        if roster is None:
+            roster = load_roster(team.pk, season_id)
+            cache.set(key, roster, timeout=ROSTER_TIMEOUT)
+
+        rosters[season_id] = roster
+
+    return rosters[season_id]
+
+
+def get_generation() -> int:
+    return ResponseCacheVersion.get_versions([GENERATION]).get(GENERATION, 1)
+
+
+def clear_rosters() -> None:
+    """Invalidates all cached rosters in all processes, by moving to a new generation of cache keys"""
+    ResponseCacheVersion.bump([GENERATION])
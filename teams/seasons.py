@@ -0,0 +1,138 @@
+"""
+Resolves the season of a date without querying the season table on every call.
+
+The season table is tiny and rarely changes, every worker loads it once and answers all lookups from memory. Saving or deleting a season raises the
+"seasons" version in the database (`api.models.ResponseCacheVersion`, see `teams.signals`) in the same transaction. Every process compares the version
+with the one of its copy and reloads when it changed: once per request while serving requests, at most every `VERSION_TTL` seconds otherwise (e.g. the
+score updater and other management commands).
+"""
+
+import datetime
+import threading
+import time
+
+from django.db import connection
+from django.utils import timezone
+
+from api.models import ResponseCacheVersion
+
+from .models import Season
+
+# Lookups are remembered per date, the memo is cleared when it grows beyond this many dates
+MAX_DATES = 1000
+VERSION = "seasons"
+# Seconds a version is trusted outside requests, changes made by other processes are seen after at most this long
+VERSION_TTL = 5
+
+
+def to_date(date: datetime.date | datetime.datetime | None) -> datetime.date:
+    """Returns the (local) date of `date`, today if not given"""
+    if date is None:
+        return timezone.localdate()
+
+    if isinstance(date, datetime.datetime):
+        return timezone.localdate(date) if timezone.is_aware(date) else date.date()
+
+    return date
+
+
+_version_table_exists = False
+
+
+def get_version() -> tuple | None:
+    """The version of the season table, the modification time tells apart versions that were raised in a transaction that was rolled back"""
+    global _version_table_exists
+
+    # Seasons are already looked up by migrations that run before the version table is created (the default of Game.season)
+    if not _version_table_exists:
+        _version_table_exists = ResponseCacheVersion._meta.db_table in connection.introspection.table_names()
+
+        if not _version_table_exists:
+            return None
+
+    return ResponseCacheVersion.objects.filter(name=VERSION).values_list("version", "modified").first()
+
+
+class SeasonService:
+    """An in-process copy of the season table, safe to share between threads"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.seasons: list[Season] | None = None
+        self.version: tuple | None = None
+        self.dates: dict[datetime.date, list[Season]] = {}
+        # Monotonic time of the last comparison outside a request
+        self.checked: float | None = None
+        # Per thread: whether it is serving a request and already compared the version during it
+        self.local = threading.local()
+
+    def start_request(self) -> None:
+        self.local.in_request = True
+        self.local.verified = False
+
+    def finish_request(self) -> None:
+        self.local.in_request = False
+        self.local.verified = False
+
+    def get_season(self, date: datetime.date | datetime.datetime | None = None) -> Season | None:
+        """
+        Returns the season `date` (default today) falls in, or None if there is none.
+
+        Raises `Season.MultipleObjectsReturned` if `date` falls in more than one season.
+        """
+        date = to_date(date)
+
+        in_request = getattr(self.local, "in_request", False)
+
+        if in_request:
+            expired = not getattr(self.local, "verified", False)
+        else:
+            expired = self.checked is None or time.monotonic() - self.checked >= VERSION_TTL
+
+        if expired:
+            version = get_version()
+
+            with self.lock:
+                if self.seasons is None or version != self.version:
+                    self.seasons = list(Season.objects.order_by("start_date", "pk"))
+                    self.version = version
+                    self.dates = {}
+
+                if not in_request:
+                    self.checked = time.monotonic()
+
+            self.local.verified = in_request
+
+        with self.lock:
+            if self.seasons is None:
+                self.seasons = list(Season.objects.order_by("start_date", "pk"))
+
+            if date not in self.dates:
+                if len(self.dates) >= MAX_DATES:
+                    self.dates = {}
+
+                self.dates[date] = [season for season in self.seasons if season.start_date <= date <= season.end_date]
+
+            seasons = self.dates[date]
+
+        if len(seasons) > 1:
+            raise Season.MultipleObjectsReturned("%s falls in %d overlapping seasons" % (date, len(seasons)))
+
+        return seasons[0] if len(seasons) == 1 else None
+
+    def clear(self) -> None:
+        with self.lock:
+            self.seasons = None
+            self.version = None
+            self.dates = {}
+            self.checked = None
+
+        self.local.verified = False
+
+
+season_service = SeasonService()
+
+
+def get_season(date: datetime.date | datetime.datetime | None = None) -> Season | None:
+    """Returns the season `date` (default today) falls in, or None if there is none"""
+    return season_service.get_season(date)
@@ -1,9 +1,7 @@
-from itertools import chain
-
-from django.db.models import Q
 from rest_framework import serializers
 
 from .models import Season, Team, TeamMembership, TeamPicture, TeamRole
+from .roster import get_roster
 
 
 class TeamNameSerializer(serializers.ModelSerializer):
@@ -14,7 +12,7 @@ class TeamNameSerializer(serializers.ModelSerializer):
         fields = ["name", "logo"]
 
     def get_logo(self, obj: Team) -> dict[str, str | int]:
-        return {"url": obj.logo.url, "width": obj.logo.width, "height": obj.logo.height}
+        return {"url": obj.logo.url, "width": obj.logo_width, "height": obj.logo_height}
 
 
 class TeamRoleSerializer(serializers.ModelSerializer):
@@ -49,49 +47,23 @@ class TeamSerializer(serializers.ModelSerializer):
 
     def get_picture(self, obj: Team) -> str:
         try:
-            picture = obj.teampicture_set.get(season=Season.get_season()).picture
-            return {"url": picture.url, "width": picture.width, "height": picture.height}
+            picture = obj.teampicture_set.get(season=Season.get_season())
+            return {"url": picture.picture.url, "width": picture.picture_width, "height": picture.picture_height}
 
         except TeamPicture.DoesNotExist:
             return {"url": "", "height": 0, "width": 0}
 
     def get_goalie(self, obj: Team) -> list[TeamMembership]:
-        return TeamMembershipSerializer(obj.teammembership_set.filter(season=Season.get_season()).filter(role__abbreviation="GO").order_by("number"), many=True).data
+        return TeamMembershipSerializer(get_roster(obj).get_role("GO"), many=True).data
 
     def get_forward(self, obj: Team) -> list[TeamMembership]:
-        return TeamMembershipSerializer(obj.teammembership_set.filter(season=Season.get_season()).filter(role__abbreviation="F").order_by("number"), many=True).data
+        return TeamMembershipSerializer(get_roster(obj).get_role("F"), many=True).data
 
     def get_defense(self, obj: Team) -> list[TeamMembership]:
-        return TeamMembershipSerializer(obj.teammembership_set.filter(season=Season.get_season()).filter(role__abbreviation="D").order_by("number"), many=True).data
+        return TeamMembershipSerializer(get_roster(obj).get_role("D"), many=True).data
 
     def get_players(self, obj: Team) -> list[TeamMembership]:
-        return TeamMembershipSerializer(obj.teammembership_set.filter(season=Season.get_season()).filter(role__abbreviation="P").order_by("number"), many=True).data
+        return TeamMembershipSerializer(get_roster(obj).get_role("P"), many=True).data
 
     def get_staff(self, obj: Team) -> list[TeamMembership]:
-        head_coach = obj.teammembership_set.filter(season=Season.get_season(), role__abbreviation="CO").order_by(
-            "member__user__last_name", "member__user__first_name", "member__license"
-        )
-        assistant_coach = obj.teammembership_set.filter(season=Season.get_season(), role__abbreviation="AC").order_by(
-            "member__user__last_name", "member__user__first_name", "member__license"
-        )
-        general_manager = obj.teammembership_set.filter(season=Season.get_season(), role__abbreviation="GM").order_by(
-            "member__user__last_name", "member__user__first_name", "member__license"
-        )
-        team_manager = obj.teammembership_set.filter(season=Season.get_season(), role__abbreviation="TM").order_by(
-            "member__user__last_name", "member__user__first_name", "member__license"
-        )
-        others = (
-            obj.teammembership_set.filter(season=Season.get_season(), number=None)
-            .exclude(
-                Q(role__abbreviation="GO")
-                | Q(role__abbreviation="F")
-                | Q(role__abbreviation="D")
-                | Q(role__abbreviation="CO")
-                | Q(role__abbreviation="AC")
-                | Q(role__abbreviation="GM")
-                | Q(role__abbreviation="TM")
-            )
-            .order_by("member__user__last_name", "member__user__first_name", "member__license")
-        )
-
-        return TeamMembershipSerializer(list(chain(head_coach, assistant_coach, general_manager, team_manager, others)), many=True).data
+        return TeamMembershipSerializer(get_roster(obj).staff, many=True).data
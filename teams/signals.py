@@ -1,8 +1,14 @@
+from django.core.signals import request_finished, request_started
 from django.dispatch import Signal, receiver
 from django.db.models.signals import post_delete, post_save, pre_save
 from django.contrib.auth.models import Group
 
-from .models import Team, TeamMembership, Season
+from api.models import ResponseCacheVersion
+from members.models import Member
+
+from .models import Team, TeamMembership, TeamRole, Season
+from .roster import clear_rosters
+from .seasons import VERSION, season_service
 from .tasks import update_group_membership
 
 
@@ -32,3 +38,28 @@ def delete_group(sender, instance: Team, *args, **kwargs):
 def update_group_memberships(sender, instance: TeamMembership, *args, **kwargs) -> None:
     update_group_membership(instance.member.user.id)
     # update_group_membership.delay_on_commit(instance.member.user.id)
+
+
+@receiver([post_save, post_delete], sender=Season)
+def clear_season_cache(sender, instance: Season, *args, **kwargs) -> None:
+    # Raised in the same transaction as the change, other processes reload their copy once they see the new version
+    ResponseCacheVersion.bump([VERSION])
+    season_service.clear()
+
+
+@receiver(request_started)
+def start_season_request(sender, **kwargs) -> None:
+    season_service.start_request()
+
+
+@receiver(request_finished)
+def finish_season_request(sender, **kwargs) -> None:
+    season_service.finish_request()
+
+
+@receiver([post_save, post_delete], sender=TeamMembership)
+@receiver([post_save, post_delete], sender=TeamRole)
+@receiver([post_save, post_delete], sender=Member)
+def clear_roster_cache(sender, *args, **kwargs) -> None:
+    # The generation is raised in the same transaction as the change, no process sees the new generation with the old memberships
+    clear_rosters()
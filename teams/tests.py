@@ -1,3 +1,127 @@
-from django.test import TestCase
+import datetime
+import time
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.db.models import F
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from api.models import ResponseCacheVersion
+from members.models import Member
+
+from .models import Season, Team, TeamMembership, TeamRole
+from .roster import GENERATION, get_roster
+from .seasons import VERSION, VERSION_TTL, season_service
+
+
+class SeasonServiceTest(TestCase):
+    def setUp(self):
+        season_service.clear()
+        # Seasons created by a test are rolled back without a signal
+        self.addCleanup(season_service.clear)
+
+        self.current = Season.objects.get(start_date__lte=timezone.localdate(), end_date__gte=timezone.localdate())
+
+    def test_lookups_are_cached(self):
+        season_service.start_request()
+        self.addCleanup(season_service.finish_request)
+
+        # The version and the season table, once per request
+        with self.assertNumQueries(2):
+            for i in range(5):
+                self.assertEqual(Season.get_season(), self.current)
+
+            self.assertEqual(Season.get_season_id(date=self.current.start_date), self.current.pk)
+
+    def test_changes_reach_other_processes(self):
+        self.assertEqual(Season.get_season(), self.current)
+
+        # Another process moves the start of the season, this process only shares the database
+        Season.objects.filter(pk=self.current.pk).update(start_date=timezone.localdate() + datetime.timedelta(days=1))
+        ResponseCacheVersion.bump([VERSION])
+
+        # Outside requests the version is only compared again once it expired
+        with self.assertNumQueries(0):
+            self.assertEqual(Season.get_season(), self.current)
+
+        with mock.patch("time.monotonic", return_value=time.monotonic() + VERSION_TTL), self.assertRaises(Season.DoesNotExist):
+            Season.get_season()
+
+    def test_overlapping_seasons(self):
+        overlapping = Season(start_date=self.current.end_date, end_date=self.current.end_date + datetime.timedelta(days=364))
+
+        with self.assertRaises(ValidationError):
+            overlapping.full_clean()
+
+        overlapping.save()
+
+        with self.assertRaises(Season.MultipleObjectsReturned):
+            Season.get_season(date=self.current.end_date)
+
+    def test_changes_clear_the_cache(self):
+        date = self.current.end_date + datetime.timedelta(days=1)
+
+        with self.assertRaises(Season.DoesNotExist):
+            Season.get_season(date=date)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            next_season = Season.objects.create(start_date=date, end_date=date + datetime.timedelta(days=364))
+
+        self.assertEqual(Season.get_season(date=date), next_season)
+
+        # The default date is today at the time of the call, not at import time
+        with mock.patch("django.utils.timezone.now", return_value=timezone.now() + (date - timezone.localdate())):
+            self.assertEqual(Season.get_season(), next_season)
+
+
+class RosterTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+        self.team = Team.objects.create(name="Team")
+        self.season = Season.get_season()
+        roles = {
+            "GO": TeamRole.objects.create(name="Goalie", abbreviation="GO"),
+            "F": TeamRole.objects.create(name="Forward", abbreviation="F"),
+            "GM": TeamRole.objects.create(name="General Manager", abbreviation="GM", staff_role=True, sort_order=2),
+            "CO": TeamRole.objects.create(name="Coach", abbreviation="CO", staff_role=True, sort_order=1),
+        }
+
+        for i, (role, number, last_name) in enumerate([("F", 17, "B"), ("F", 9, "C"), ("GO", 30, "D"), ("GM", None, "E"), ("CO", None, "F")]):
+            user = get_user_model().objects.create_user("user%d" % i, last_name=last_name)
+            TeamMembership.objects.create(team=self.team, member=Member.objects.create(user=user), season=self.season, role=roles[role], number=number)
+
+    @override_settings(CLUB_API_CACHE_TIMEOUT=0)
+    def test_team_endpoint(self):
+        self.client.get("/api/teams/%s/" % self.team.slug)
+
+        # The validators, the response cache versions, the team, the season version, its picture and the roster generation, the roster comes from the cache
+        with self.assertNumQueries(6):
+            data = self.client.get("/api/teams/%s/" % self.team.slug).json()
+
+        self.assertEqual([player["number"] for player in data["forward"]], [9, 17])
+        self.assertEqual([player["number"] for player in data["goalie"]], [30])
+        self.assertEqual([member["role"]["abbreviation"] for member in data["staff"]], ["CO", "GM"])
+        self.assertEqual(data["players"], [])
+
+    def test_changes_clear_the_cache(self):
+        self.client.get("/api/teams/%s/" % self.team.slug)
+        TeamMembership.objects.filter(number=17).update(number=7)
+        TeamMembership.objects.get(number=7).save()
+
+        data = self.client.get("/api/teams/%s/" % self.team.slug).json()
+        self.assertEqual([player["number"] for player in data["forward"]], [7, 9])
+
+    def test_clearing_reaches_other_processes(self):
+        self.assertEqual([membership.number for membership in get_roster(self.team, self.season).get_role("F")], [9, 17])
+
+        # Another process changes a number, this process only shares the database
+        TeamMembership.objects.filter(number=17).update(number=7)
+        ResponseCacheVersion.objects.filter(name=GENERATION).update(version=F("version") + 1)
+
+        team = Team.objects.get(pk=self.team.pk)
+        self.assertEqual([membership.number for membership in get_roster(team, self.season).get_role("F")], [7, 9])
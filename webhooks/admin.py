@@ -0,0 +1,34 @@
+from django.contrib import admin
+from django.utils import timezone
+
+from .models import WebhookEvent, WebhookSubscription, WebhookWorkerLock
+
+
+@admin.register(WebhookSubscription)
+class WebhookSubscriptionAdmin(admin.ModelAdmin):
+    list_display = ["name", "url", "active", "on_game_update", "on_news_release", "batch_window"]
+    list_filter = ["active", "on_game_update", "on_news_release"]
+    search_fields = ["name", "url"]
+    fieldsets = [
+        ["GENERAL INFORMATION", {"fields": ["name", "url", "secret", "active"]}],
+        ["EVENTS", {"fields": ["on_game_update", "on_news_release", "batch_window", "max_batch_size"]}],
+    ]
+
+
+@admin.register(WebhookEvent)
+class WebhookEventAdmin(admin.ModelAdmin):
+    date_hierarchy = "created"
+    list_display = ["created", "subscription", "event_type", "key", "status", "attempts", "next_attempt", "last_error"]
+    list_filter = ["status", "event_type", "subscription"]
+    list_select_related = ["subscription"]
+    readonly_fields = ["subscription", "event_type", "key", "payload", "created", "delivered_at"]
+    actions = ["retry_now"]
+
+    @admin.action(description="Retry the selected events now")
+    def retry_now(self, request, queryset) -> None:
+        queryset.exclude(status=WebhookEvent.StatusChoices.DELIVERED).update(status=WebhookEvent.StatusChoices.PENDING, attempts=0, next_attempt=timezone.now())
+
+
+@admin.register(WebhookWorkerLock)
+class WebhookWorkerLockAdmin(admin.ModelAdmin):
+    list_display = ["name", "holder", "expires_at"]
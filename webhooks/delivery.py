@@ -0,0 +1,172 @@
+import datetime
+import hashlib
+import hmac
+import json
+import random
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+
+import requests
+from django.db.models import F, Min
+from django.utils import timezone
+
+from .events import load_payloads
+from .models import WebhookEvent, WebhookSubscription
+
+SIGNATURE_HEADER = "X-Clubmanager-Signature"
+TIMESTAMP_HEADER = "X-Clubmanager-Timestamp"
+
+# Failed deliveries are retried after RETRY_DELAY seconds, doubling on every attempt up to MAX_RETRY_DELAY, events are given up after MAX_ATTEMPTS
+RETRY_DELAY = 30
+MAX_RETRY_DELAY = 6 * 60 * 60
+MAX_ATTEMPTS = 10
+
+
+def sign(secret: str, timestamp: int, body: bytes) -> str:
+    """
+    Returns the signature sent in the `X-Clubmanager-Signature` header.
+
+    Receivers calculate the HMAC-SHA256 of the `X-Clubmanager-Timestamp` header, a dot and the raw request body with the shared secret and compare it
+    to the header (after `sha256=`), rejecting requests with an old timestamp protects against replays.
+    """
+    return "sha256=" + hmac.new(secret.encode(), b"%d." % timestamp + body, hashlib.sha256).hexdigest()
+
+
+def get_retry_delay(attempts: int) -> float:
+    """Seconds to wait after the `attempts`-th failed attempt, with some jitter so failed receivers are not hit by all retries at once"""
+    return min(MAX_RETRY_DELAY, RETRY_DELAY * 2 ** (attempts - 1)) * random.uniform(0.8, 1.2)
+
+
+@dataclass
+class Batch:
+    subscription: WebhookSubscription
+    events: list[WebhookEvent]
+    superseded: list[WebhookEvent]
+
+    def get_body(self) -> bytes:
+        return json.dumps(
+            {"events": [{"id": event.pk, "type": event.event_type, "created": event.created.isoformat(), "data": event.payload} for event in self.events]}
+        ).encode()
+
+
+@dataclass
+class DeliverySummary:
+    delivered: int = 0
+    failed: int = 0
+    superseded: int = 0
+    given_up: int = 0
+
+    def __str__(self):
+        return "Delivered %d events, %d failed (%d given up), %d combined with newer events" % (self.delivered, self.failed, self.given_up, self.superseded)
+
+
+def get_batches(now: datetime.datetime) -> list[Batch]:
+    """
+    Returns a batch of due events for every subscription whose oldest due event waited at least the batch window of the subscription.
+
+    Of several events with the same key (e.g. a game that scored twice) only the latest one is sent, the others are superseded. Payloads are built
+    from the current state (see `webhooks.events.load_payloads`), events whose game or news item is gone are superseded as well, events of news items
+    whose publish time was moved to the future wait until then.
+    """
+    due = WebhookEvent.objects.filter(status=WebhookEvent.StatusChoices.PENDING, next_attempt__lte=now, subscription__active=True)
+    batches = []
+
+    for subscription_id, oldest in due.values_list("subscription").annotate(oldest=Min("created")).order_by():
+        subscription = WebhookSubscription.objects.get(pk=subscription_id)
+
+        if oldest > now - datetime.timedelta(seconds=subscription.batch_window):
+            continue
+
+        latest: dict[str, WebhookEvent] = {}
+        superseded = []
+
+        for event in due.filter(subscription=subscription).order_by("created", "pk"):
+            if event.key in latest:
+                superseded.append(latest.pop(event.key))
+            elif len(latest) >= subscription.max_batch_size:
+                break
+
+            latest[event.key] = event
+
+        events = list(latest.values())
+        gone, postponed = load_payloads(events, now)
+        events = [event for event in events if event not in gone and event not in postponed]
+        # Stored as sent, for the admin
+        WebhookEvent.objects.bulk_update(events, ["payload"])
+        WebhookEvent.objects.bulk_update(postponed, ["next_attempt"])
+
+        batches.append(Batch(subscription=subscription, events=events, superseded=superseded + gone))
+
+    return batches
+
+
+class WebhookWorker:
+    """
+    Delivers the queued webhook events, one request per subscription per run.
+
+    Requests are sent from a thread pool, all database writes happen in the calling thread. Call `close()` when done.
+    """
+
+    def __init__(self, workers: int = 4, timeout: float = 10):
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.executor = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="webhooks")
+
+    def run(self) -> DeliverySummary:
+        summary = DeliverySummary()
+        futures: dict[Future, Batch] = {self.executor.submit(self.send, batch): batch for batch in get_batches(timezone.now())}
+
+        for future in as_completed(futures):
+            batch = futures[future]
+            error = future.result()
+            now = timezone.now()
+
+            WebhookEvent.objects.filter(pk__in=[event.pk for event in batch.superseded]).update(status=WebhookEvent.StatusChoices.SUPERSEDED)
+            summary.superseded += len(batch.superseded)
+
+            if error is None:
+                WebhookEvent.objects.filter(pk__in=[event.pk for event in batch.events]).update(
+                    status=WebhookEvent.StatusChoices.DELIVERED, delivered_at=now, attempts=F("attempts") + 1, last_error=""
+                )
+                summary.delivered += len(batch.events)
+                continue
+
+            summary.failed += len(batch.events)
+            attempts = max(event.attempts for event in batch.events) + 1
+            events = WebhookEvent.objects.filter(pk__in=[event.pk for event in batch.events])
+
+            if attempts >= MAX_ATTEMPTS:
+                events.update(status=WebhookEvent.StatusChoices.FAILED, attempts=F("attempts") + 1, last_error=error[:500])
+                summary.given_up += len(batch.events)
+            else:
+                events.update(attempts=F("attempts") + 1, next_attempt=now + datetime.timedelta(seconds=get_retry_delay(attempts)), last_error=error[:500])
+
+        return summary
+
+    def send(self, batch: Batch) -> str | None:
+        """Posts the batch to the subscription and returns the error, runs in the thread pool and does not touch the database"""
+        if len(batch.events) == 0:
+            return None
+
+        body = batch.get_body()
+        timestamp = int(time.time())
+        headers = {
+            "Content-Type": "application/json",
+            TIMESTAMP_HEADER: str(timestamp),
+            SIGNATURE_HEADER: sign(batch.subscription.secret, timestamp, body),
+        }
+
+        try:
+            response = self.session.post(batch.subscription.url, data=body, headers=headers, timeout=self.timeout)
+        except requests.RequestException as e:
+            return str(e) or e.__class__.__name__
+
+        if response.status_code >= 300:
+            return "HTTP %d" % response.status_code
+
+        return None
+
+    def close(self) -> None:
+        self.executor.shutdown(wait=True, cancel_futures=True)
+        self.session.close()
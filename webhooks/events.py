@@ -0,0 +1,105 @@
+import datetime
+
+from django.db.models import Q
+from django.utils import timezone
+
+from activities.models import Game
+from news.models import NewsItem
+
+from .models import WebhookEvent, WebhookSubscription
+
+
+def game_payload(game: Game) -> dict:
+    return {
+        "id": game.pk,
+        "team": game.team.slug,
+        "opponent": game.opponent.name if game.opponent is not None else None,
+        "date": game.date.isoformat(),
+        "live": game.live,
+        "score_team": game.score_team,
+        "score_opponent": game.score_opponent,
+        "modified": game.modified.isoformat(),
+    }
+
+
+def news_payload(news_item: NewsItem) -> dict:
+    return {
+        "id": news_item.pk,
+        "slug": news_item.slug,
+        "title": news_item.title,
+        "publish_on": news_item.publish_on.isoformat(),
+        "teams": [team.slug for team in news_item.teams.all()],
+        "modified": news_item.modified.isoformat(),
+    }
+
+
+def load_payloads(events: list[WebhookEvent], now: datetime.datetime) -> tuple[list[WebhookEvent], list[WebhookEvent]]:
+    """
+    Builds the payload of `events` from the current state of their game or news item.
+
+    Returns the events whose game or news item is gone (or no longer released), and the events of news items whose publish time was moved past `now`,
+    their `next_attempt` is set to the new publish time.
+
+    Payloads are built when they are sent instead of when they are queued: a news item released in the admin is saved before its teams, and a retried
+    event would otherwise send an older state than a later event. Receivers can drop payloads with an older `modified` than they already have.
+    """
+    ids = {event_type: [int(event.key.split(":")[1]) for event in events if event.event_type == event_type] for event_type in WebhookEvent.EventTypeChoices}
+    games = Game.objects.in_bulk(ids[WebhookEvent.EventTypeChoices.GAME_UPDATED])
+    news_items = (
+        NewsItem.objects.filter(status=NewsItem.StatusChoices.RELEASED)
+        .exclude(type=NewsItem.NewsItemTypeChoices.INTERNAL)
+        .prefetch_related("teams")
+        .in_bulk(ids[WebhookEvent.EventTypeChoices.NEWS_RELEASED])
+    )
+    gone, postponed = [], []
+
+    for event in events:
+        pk = int(event.key.split(":")[1])
+
+        if event.event_type == WebhookEvent.EventTypeChoices.GAME_UPDATED and pk in games:
+            event.payload = game_payload(games[pk])
+        elif event.event_type == WebhookEvent.EventTypeChoices.NEWS_RELEASED and pk in news_items:
+            if news_items[pk].publish_on > now:
+                event.next_attempt = news_items[pk].publish_on
+                postponed.append(event)
+            else:
+                event.payload = news_payload(news_items[pk])
+        else:
+            gone.append(event)
+
+    return gone, postponed
+
+
+def enqueue(event_type: str, events: dict[str, dict], available_at: datetime.datetime | None = None) -> None:
+    """
+    Queues `events` (payloads by key) for all active subscriptions of `event_type` with a single insert, delivery happens in the webhook worker.
+
+    Events are only sent from `available_at` on, e.g. the publish time of a news item.
+    """
+    if len(events) == 0:
+        return
+
+    match event_type:
+        case WebhookEvent.EventTypeChoices.GAME_UPDATED:
+            subscriptions = WebhookSubscription.objects.filter(Q(active=True) & Q(on_game_update=True))
+        case WebhookEvent.EventTypeChoices.NEWS_RELEASED:
+            subscriptions = WebhookSubscription.objects.filter(Q(active=True) & Q(on_news_release=True))
+        case _:
+            raise ValueError("Unknown event type %s" % event_type)
+
+    now = timezone.now()
+    available_at = max(now, available_at) if available_at is not None else now
+
+    WebhookEvent.objects.bulk_create(
+        WebhookEvent(subscription=subscription, event_type=event_type, key=key, payload=payload, next_attempt=available_at, created=available_at)
+        for subscription in subscriptions.only("pk")
+        for key, payload in events.items()
+    )
+
+
+def enqueue_games(games: list[Game]) -> None:
+    enqueue(WebhookEvent.EventTypeChoices.GAME_UPDATED, {"game:%d" % game.pk: game_payload(game) for game in games})
+
+
+def enqueue_news_item(news_item: NewsItem) -> None:
+    enqueue(WebhookEvent.EventTypeChoices.NEWS_RELEASED, {"news:%d" % news_item.pk: news_payload(news_item)}, available_at=news_item.publish_on)
@@ -0,0 +1,75 @@
+import signal
+import threading
+import time
+
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+from django.db import close_old_connections
+
+from webhooks.delivery import WebhookWorker
+from webhooks.models import WebhookEvent, WebhookWorkerLock
+
+
+class Command(BaseCommand):
+    help = "Keeps running and delivers queued webhook events to their subscriptions, stops on SIGTERM or SIGINT"
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("--interval", action="store", default=2, type=float, help="Number of seconds between two checks for events that are due")
+        parser.add_argument("--workers", action="store", default=4, type=int, help="Number of subscriptions to deliver to simultaneously")
+        parser.add_argument("--timeout", action="store", default=10, type=float, help="Timeout in seconds for a single request to a subscription")
+        parser.add_argument("--keep-days", action="store", default=7, type=int, help="Number of days to keep delivered and failed events")
+        parser.add_argument("--once", action="store_true", help="Deliver all events that are due and stop")
+
+    def handle(self, *args, **options) -> None:
+        if options["workers"] < 1:
+            raise CommandError("--workers should be at least 1")
+
+        if options["interval"] <= 0:
+            raise CommandError("--interval should be larger than 0")
+
+        self.stop = threading.Event()
+        signal.signal(signal.SIGTERM, self.handle_signal)
+        signal.signal(signal.SIGINT, self.handle_signal)
+
+        holder = WebhookWorkerLock.get_holder_name()
+        worker = WebhookWorker(workers=options["workers"], timeout=options["timeout"])
+        active = None
+        last_prune = 0
+
+        try:
+            while not self.stop.is_set():
+                start = time.monotonic()
+                close_old_connections()
+
+                try:
+                    # Only one worker delivers at the same time, so events are never sent twice
+                    if WebhookWorkerLock.acquire(holder, ttl=options["timeout"] * 2 + options["interval"] + 30):
+                        active = True
+                        summary = worker.run()
+
+                        if summary.delivered + summary.failed + summary.superseded > 0:
+                            self.stdout.write(str(summary))
+
+                        if time.monotonic() - last_prune >= 3600:
+                            WebhookEvent.prune(options["keep_days"])
+                            last_prune = time.monotonic()
+
+                    elif active is not False:
+                        self.stdout.write("Another webhook worker holds the lock, standing by")
+                        active = False
+
+                except Exception as e:
+                    self.stderr.write(self.style.ERROR("Delivery cycle failed - %s" % (str(e) or e.__class__.__name__)))
+
+                if options["once"]:
+                    break
+
+                self.stop.wait(max(0, options["interval"] - (time.monotonic() - start)))
+
+        finally:
+            worker.close()
+            WebhookWorkerLock.release(holder)
+            close_old_connections()
+
+    def handle_signal(self, signum, frame) -> None:
+        self.stdout.write("Received %s, stopping after the current cycle" % signal.Signals(signum).name)
+        self.stop.set()
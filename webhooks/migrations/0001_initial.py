@@ -0,0 +1,176 @@
+# Generated by Django 5.1.15 on 2026-10-17 13:59
+
+import django.db.models.deletion
+import django.utils.timezone
+import webhooks.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = []
+
+    operations = [
+        migrations.CreateModel(
+            name="WebhookSubscription",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("name", models.CharField(max_length=250, verbose_name="name")),
+                ("url", models.URLField(max_length=500, verbose_name="URL")),
+                (
+                    "secret",
+                    models.CharField(
+                        default=webhooks.models.generate_secret,
+                        help_text="Shared secret used to sign every request",
+                        max_length=250,
+                        verbose_name="secret",
+                    ),
+                ),
+                ("active", models.BooleanField(default=True, verbose_name="active")),
+                (
+                    "on_game_update",
+                    models.BooleanField(
+                        default=True,
+                        help_text="Send an event when the live state or score of a game changes",
+                        verbose_name="game updates",
+                    ),
+                ),
+                (
+                    "on_news_release",
+                    models.BooleanField(
+                        default=True,
+                        help_text="Send an event when an external news item is published",
+                        verbose_name="news releases",
+                    ),
+                ),
+                (
+                    "batch_window",
+                    models.PositiveIntegerField(
+                        default=5,
+                        help_text="Number of seconds to wait for more events before sending, events for the same game are combined",
+                        verbose_name="batch window",
+                    ),
+                ),
+                (
+                    "max_batch_size",
+                    models.PositiveIntegerField(
+                        default=50,
+                        help_text="Maximum number of events sent in a single request",
+                        verbose_name="maximum batch size",
+                    ),
+                ),
+                ("created", models.DateTimeField(auto_now_add=True)),
+                ("modified", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "verbose_name": "webhook subscription",
+                "verbose_name_plural": "webhook subscriptions",
+                "ordering": ["name"],
+            },
+        ),
+        migrations.CreateModel(
+            name="WebhookEvent",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "event_type",
+                    models.CharField(
+                        choices=[
+                            ("game.updated", "Game updated"),
+                            ("news.released", "News released"),
+                        ],
+                        max_length=50,
+                        verbose_name="event type",
+                    ),
+                ),
+                (
+                    "key",
+                    models.CharField(
+                        help_text="Pending events with the same key are combined, only the latest one is sent",
+                        max_length=100,
+                        verbose_name="key",
+                    ),
+                ),
+                ("payload", models.JSONField(default=dict, verbose_name="payload")),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("PENDING", "Pending"),
+                            ("DELIVERED", "Delivered"),
+                            ("SUPERSEDED", "Superseded"),
+                            ("FAILED", "Failed"),
+                        ],
+                        default="PENDING",
+                        max_length=10,
+                        verbose_name="status",
+                    ),
+                ),
+                (
+                    "attempts",
+                    models.PositiveIntegerField(default=0, verbose_name="attempts"),
+                ),
+                (
+                    "next_attempt",
+                    models.DateTimeField(
+                        default=django.utils.timezone.now, verbose_name="next attempt"
+                    ),
+                ),
+                (
+                    "last_error",
+                    models.CharField(
+                        blank=True, max_length=500, verbose_name="last error"
+                    ),
+                ),
+                (
+                    "delivered_at",
+                    models.DateTimeField(
+                        blank=True, null=True, verbose_name="delivered at"
+                    ),
+                ),
+                (
+                    "created",
+                    models.DateTimeField(
+                        default=django.utils.timezone.now, verbose_name="created"
+                    ),
+                ),
+                (
+                    "subscription",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="events",
+                        to="webhooks.webhooksubscription",
+                        verbose_name="subscription",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "webhook event",
+                "verbose_name_plural": "webhook events",
+                "ordering": ["-created"],
+                "indexes": [
+                    models.Index(
+                        fields=["status", "next_attempt"], name="webhookevent_queue_idx"
+                    )
+                ],
+            },
+        ),
+    ]
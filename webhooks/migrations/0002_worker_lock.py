@@ -0,0 +1,49 @@
+# Generated by Django 5.1.15 on 2026-10-17 14:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("webhooks", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="WebhookWorkerLock",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "name",
+                    models.CharField(max_length=250, unique=True, verbose_name="name"),
+                ),
+                (
+                    "holder",
+                    models.CharField(blank=True, max_length=250, verbose_name="holder"),
+                ),
+                ("expires_at", models.DateTimeField(verbose_name="expires at")),
+            ],
+            options={
+                "verbose_name": "webhook worker lock",
+                "verbose_name_plural": "webhook worker locks",
+            },
+        ),
+        migrations.AlterField(
+            model_name="webhookevent",
+            name="payload",
+            field=models.JSONField(
+                default=dict,
+                help_text="Built again from the current game or news item when the event is sent",
+                verbose_name="payload",
+            ),
+        ),
+    ]
@@ -0,0 +1,124 @@
+import datetime
+import os
+import secrets
+import socket
+import uuid
+
+from django.db import models
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+
+
+def generate_secret() -> str:
+    return secrets.token_urlsafe(32)
+
+
+class WebhookSubscription(models.Model):
+    """An external site that is notified of game and news changes, every request is signed with `secret` (see `webhooks.delivery`)"""
+
+    name = models.CharField(_("name"), max_length=250)
+    url = models.URLField(_("URL"), max_length=500)
+    secret = models.CharField(_("secret"), max_length=250, default=generate_secret, help_text=_("Shared secret used to sign every request"))
+    active = models.BooleanField(_("active"), default=True)
+
+    on_game_update = models.BooleanField(_("game updates"), default=True, help_text=_("Send an event when the live state or score of a game changes"))
+    on_news_release = models.BooleanField(_("news releases"), default=True, help_text=_("Send an event when an external news item is published"))
+
+    batch_window = models.PositiveIntegerField(
+        _("batch window"), default=5, help_text=_("Number of seconds to wait for more events before sending, events for the same game are combined")
+    )
+    max_batch_size = models.PositiveIntegerField(_("maximum batch size"), default=50, help_text=_("Maximum number of events sent in a single request"))
+
+    created = models.DateTimeField(auto_now_add=True)
+    modified = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return self.name
+
+    class Meta:
+        verbose_name = _("webhook subscription")
+        verbose_name_plural = _("webhook subscriptions")
+        ordering = ["name"]
+
+
+class WebhookEvent(models.Model):
+    """A single event queued for a subscription, delivered by the webhook worker (`run_webhook_worker`)"""
+
+    class StatusChoices(models.TextChoices):
+        PENDING = "PENDING", _("Pending")
+        DELIVERED = "DELIVERED", _("Delivered")
+        SUPERSEDED = "SUPERSEDED", _("Superseded")
+        FAILED = "FAILED", _("Failed")
+
+    class EventTypeChoices(models.TextChoices):
+        GAME_UPDATED = "game.updated", _("Game updated")
+        NEWS_RELEASED = "news.released", _("News released")
+
+    subscription = models.ForeignKey(WebhookSubscription, on_delete=models.CASCADE, related_name="events", verbose_name=_("subscription"))
+    event_type = models.CharField(_("event type"), max_length=50, choices=EventTypeChoices.choices)
+    key = models.CharField(_("key"), max_length=100, help_text=_("Pending events with the same key are combined, only the latest one is sent"))
+    payload = models.JSONField(_("payload"), default=dict, help_text=_("Built again from the current game or news item when the event is sent"))
+
+    status = models.CharField(_("status"), max_length=10, choices=StatusChoices.choices, default=StatusChoices.PENDING)
+    attempts = models.PositiveIntegerField(_("attempts"), default=0)
+    next_attempt = models.DateTimeField(_("next attempt"), default=timezone.now)
+    last_error = models.CharField(_("last error"), max_length=500, blank=True)
+    delivered_at = models.DateTimeField(_("delivered at"), blank=True, null=True)
+
+    created = models.DateTimeField(_("created"), default=timezone.now)
+
+    def __str__(self):
+        return "%s - %s" % (self.subscription, self.event_type)
+
+    class Meta:
+        verbose_name = _("webhook event")
+        verbose_name_plural = _("webhook events")
+        ordering = ["-created"]
+        indexes = [models.Index(fields=["status", "next_attempt"], name="webhookevent_queue_idx")]
+
+    @classmethod
+    def prune(cls, days: int) -> None:
+        """Removes all events that are no longer pending and were created more than `days` days ago"""
+        cls.objects.exclude(status=cls.StatusChoices.PENDING).filter(created__lt=timezone.now() - datetime.timedelta(days=days)).delete()
+
+
+class WebhookWorkerLock(models.Model):
+    """
+    A lock in the database making sure only one webhook worker delivers at the same time, so events are never sent twice.
+
+    The lock expires automatically, so a crashed worker does not block the others forever.
+    """
+
+    name = models.CharField(_("name"), max_length=250, unique=True)
+    holder = models.CharField(_("holder"), max_length=250, blank=True)
+    expires_at = models.DateTimeField(_("expires at"))
+
+    def __str__(self):
+        return self.name
+
+    class Meta:
+        verbose_name = _("webhook worker lock")
+        verbose_name_plural = _("webhook worker locks")
+
+    @staticmethod
+    def get_holder_name() -> str:
+        """Returns a name identifying the current process on this server"""
+        return "{host}:{pid}:{token}".format(host=socket.gethostname(), pid=os.getpid(), token=uuid.uuid4().hex[:8])
+
+    @classmethod
+    def acquire(cls, holder: str, ttl: float, name: str = "webhooks") -> bool:
+        """Tries to take (or extend) the lock for `ttl` seconds without waiting with a single conditional update, returns whether `holder` holds it"""
+        now = timezone.now()
+
+        cls.objects.get_or_create(name=name, defaults={"expires_at": now})
+
+        return (
+            cls.objects.filter(models.Q(holder="") | models.Q(holder=holder) | models.Q(expires_at__lt=now), name=name).update(
+                holder=holder, expires_at=now + datetime.timedelta(seconds=ttl)
+            )
+            == 1
+        )
+
+    @classmethod
+    def release(cls, holder: str, name: str = "webhooks") -> None:
+        cls.objects.filter(name=name, holder=holder).update(holder="", expires_at=timezone.now())
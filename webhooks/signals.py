@@ -0,0 +1,33 @@
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from activities.models import Game
+from activities.signals import scores_changed
+from news.models import NewsItem
+
+from .events import enqueue_games, enqueue_news_item
+
+
+@receiver(scores_changed)
+def queue_score_updates(sender, games: list[Game], **kwargs) -> None:
+    transaction.on_commit(partial(enqueue_games, list(games)))
+
+
+@receiver(post_save, sender=Game)
+def queue_game_changes(sender, instance: Game, created: bool, **kwargs) -> None:
+    """Games changed through a form, the score updater and rinkside API update without saving and send `scores_changed` instead"""
+    if not created and any(instance.tracker.has_changed(field) for field in ["live", "score_team", "score_opponent"]):
+        transaction.on_commit(partial(enqueue_games, [instance]))
+
+
+@receiver(post_save, sender=NewsItem)
+def queue_news_release(sender, instance: NewsItem, **kwargs) -> None:
+    if (
+        instance.tracker.has_changed("status")
+        and instance.status == NewsItem.StatusChoices.RELEASED
+        and instance.type != NewsItem.NewsItemTypeChoices.INTERNAL
+    ):
+        transaction.on_commit(partial(enqueue_news_item, instance))
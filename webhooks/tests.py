@@ -0,0 +1,168 @@
+import datetime
+import json
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.utils import timezone
+
+from activities.competition.stub import StubRequestHandler, StubServer
+from activities.models import Game, GameType
+from activities.signals import scores_changed
+from news.models import NewsItem
+from teams.models import Team
+
+from .delivery import SIGNATURE_HEADER, TIMESTAMP_HEADER, WebhookWorker, sign
+from .models import WebhookEvent, WebhookSubscription
+
+
+class ReceiverRequestHandler(StubRequestHandler):
+    def do_POST(self) -> None:
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        self.server.received.append((dict(self.headers), body))
+        self.send_json(self.server.status, {})
+
+
+class Receiver(StubServer):
+    """A local webhook receiver, answers every request with `status`"""
+
+    def __init__(self, status: int = 200):
+        super(Receiver, self).__init__(ReceiverRequestHandler)
+
+        self.status = status
+        self.received: list[tuple[dict, bytes]] = []
+
+    def get_events(self, request: int = -1) -> list[dict]:
+        return json.loads(self.received[request][1])["events"]
+
+
+class WebhookTest(TestCase):
+    def setUp(self):
+        self.receiver = Receiver()
+        self.enterContext(self.receiver)
+        self.subscription = WebhookSubscription.objects.create(name="Partner", url=self.receiver.url, batch_window=0)
+
+        self.team = Team.objects.create(name="Team")
+        game_type = GameType.objects.get_or_create(name="Competition Game")[0]
+        self.games = [Game.objects.create(team=self.team, game_type=game_type, date=timezone.now()) for i in range(2)]
+
+        self.worker = WebhookWorker()
+        self.addCleanup(self.worker.close)
+
+    def change_scores(self, *games: Game) -> None:
+        # Like the score updater, payloads are built from the stored games
+        Game.objects.bulk_update(games, ["live", "score_team", "score_opponent"])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            scores_changed.send(sender=Game, games=list(games))
+
+    def test_events_are_batched_and_signed(self):
+        self.games[0].score_team = 1
+        self.change_scores(self.games[0], self.games[1])
+        self.games[0].score_team = 2
+        self.change_scores(self.games[0])
+
+        summary = self.worker.run()
+        self.assertEqual((summary.delivered, summary.superseded), (2, 1))
+
+        headers, body = self.receiver.received[0]
+        self.assertEqual(len(self.receiver.received), 1)
+        self.assertEqual(headers[SIGNATURE_HEADER], sign(self.subscription.secret, int(headers[TIMESTAMP_HEADER]), body))
+        self.assertEqual({event["data"]["id"]: event["data"]["score_team"] for event in self.receiver.get_events()}, {self.games[0].pk: 2, self.games[1].pk: 0})
+
+        self.assertEqual(self.worker.run().delivered, 0)
+
+    def test_batch_window(self):
+        self.subscription.batch_window = 60
+        self.subscription.save()
+        self.change_scores(self.games[0])
+
+        self.assertEqual(self.worker.run().delivered, 0)
+        WebhookEvent.objects.update(created=timezone.now() - datetime.timedelta(seconds=60))
+        self.assertEqual(self.worker.run().delivered, 1)
+
+    def test_failed_deliveries_are_retried_with_backoff(self):
+        self.receiver.status = 500
+        self.change_scores(self.games[0])
+
+        self.assertEqual(self.worker.run().failed, 1)
+        event = WebhookEvent.objects.get()
+        self.assertEqual((event.status, event.attempts, event.last_error), (WebhookEvent.StatusChoices.PENDING, 1, "HTTP 500"))
+        self.assertGreater(event.next_attempt, timezone.now() + datetime.timedelta(seconds=20))
+
+        self.assertEqual(self.worker.run().failed, 0)
+
+        self.receiver.status = 200
+        WebhookEvent.objects.update(next_attempt=timezone.now())
+        self.assertEqual(self.worker.run().delivered, 1)
+        self.assertEqual(WebhookEvent.objects.get().status, WebhookEvent.StatusChoices.DELIVERED)
+
+    def test_news_releases(self):
+        author = get_user_model().objects.create_user("author")
+        news_item = NewsItem.objects.create(title="Title", text="Text", author=author, type=NewsItem.NewsItemTypeChoices.EXTERNAL)
+        internal_item = NewsItem.objects.create(title="Internal", text="Text", author=author)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            for item in [news_item, internal_item]:
+                item.status = NewsItem.StatusChoices.RELEASED
+                item.publish_on = timezone.now() + datetime.timedelta(hours=1)
+                item.save()
+
+        self.assertEqual(self.worker.run().delivered, 0)
+
+        NewsItem.objects.update(publish_on=timezone.now())
+        WebhookEvent.objects.update(next_attempt=timezone.now(), created=timezone.now())
+        self.assertEqual(self.worker.run().delivered, 1)
+        self.assertEqual(self.receiver.get_events()[0]["data"]["slug"], news_item.slug)
+
+    def test_news_releases_follow_their_item(self):
+        author = get_user_model().objects.create_user("author")
+        news_items = [NewsItem.objects.create(title="Title %d" % i, text="Text", author=author, type=NewsItem.NewsItemTypeChoices.EXTERNAL) for i in range(2)]
+
+        with self.captureOnCommitCallbacks(execute=True):
+            for item in news_items:
+                item.status = NewsItem.StatusChoices.RELEASED
+                item.save()
+
+        # One item is postponed, the other one is withdrawn before the events are sent
+        publish_on = timezone.now() + datetime.timedelta(hours=1)
+        NewsItem.objects.filter(pk=news_items[0].pk).update(publish_on=publish_on)
+        NewsItem.objects.filter(pk=news_items[1].pk).update(status=NewsItem.StatusChoices.DRAFT)
+
+        summary = self.worker.run()
+        self.assertEqual((summary.delivered, summary.superseded), (0, 1))
+        self.assertEqual(WebhookEvent.objects.get(key="news:%d" % news_items[0].pk).next_attempt, publish_on)
+
+    def test_payloads_are_built_when_sent(self):
+        author = get_user_model().objects.create_user("author")
+        news_item = NewsItem.objects.create(title="Title", text="Text", author=author, type=NewsItem.NewsItemTypeChoices.EXTERNAL)
+
+        # Like the admin: the item is saved (and queued) before its teams
+        with self.captureOnCommitCallbacks(execute=True):
+            news_item.status = NewsItem.StatusChoices.RELEASED
+            news_item.save()
+
+        news_item.teams.add(self.team)
+        self.receiver.status = 500
+        self.change_scores(self.games[0])
+        self.worker.run()
+
+        # A retried event sends the current score, receivers order payloads on modified
+        self.games[0].score_team = 3
+        self.games[0].save()
+        self.receiver.status = 200
+        WebhookEvent.objects.update(next_attempt=timezone.now(), created=timezone.now())
+        self.worker.run()
+
+        payloads = {event["type"]: event["data"] for event in self.receiver.get_events()}
+        self.assertEqual(payloads["news.released"]["teams"], [self.team.slug])
+        self.assertEqual(payloads["game.updated"]["score_team"], 3)
+        self.assertEqual(payloads["game.updated"]["modified"], Game.objects.get(pk=self.games[0].pk).modified.isoformat())
+
+    def test_game_form_changes(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.games[0].live = True
+            self.games[0].save()
+            self.games[1].location = "Elsewhere"
+            self.games[1].save()
+
+        self.assertEqual(list(WebhookEvent.objects.values_list("key", flat=True)), ["game:%d" % self.games[0].pk])